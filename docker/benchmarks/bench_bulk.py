@@ -0,0 +1,86 @@
+"""
+Benchmark redeploying then deleting a fleet of zetas, one request per zeta vs the bulk endpoints.
+Reports the wall time and the container / image listings made by each approach.
+
+No docker daemon needed, the proxy runs on the fake backend in a temporary directory,
+with simulated build and start delays. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_bulk.py
+python benchmarks/bench_bulk.py --zetas 200 --workers 16
+```
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+HANDLER = b"def main_handler(params):\n    return {'ok': True}\n"
+
+
+class ListingCounter:
+    """
+    Count the listings made through the container backend.
+    """
+    def __init__(self, backend):
+        self.count = 0
+        for method in ("list_containers", "list_images"):
+            setattr(backend, method, self.counted(getattr(backend, method)))
+
+    def counted(self, method):
+        def wrapper(*args, **kwargs):
+            self.count += 1
+            return method(*args, **kwargs)
+        return wrapper
+
+
+def measure(counter: ListingCounter, label: str, action):
+    counter.count = 0
+    start = time.perf_counter()
+    action()
+    print(f"  {label:<24} {time.perf_counter() - start:>7.2f} s {counter.count:>7} listings")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zetas", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--build-delay", type=float, default=0.05)
+    parser.add_argument("--start-delay", type=float, default=0.05)
+    args = parser.parse_args()
+
+    os.environ["ZETA_CONTAINER_BACKEND"] = "fake"
+    os.environ["ZETA_FAKE_BUILD_DELAY"] = str(args.build_delay)
+    os.environ["ZETA_FAKE_START_DELAY"] = str(args.start_delay)
+    os.environ["ZETA_BULK_WORKERS"] = str(args.workers)
+    os.environ["ZETA_IMAGE_GC_INTERVAL"] = "0"
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from fastapi.testclient import TestClient
+        from services.docker.backend import get_backend
+        from services.zeta import db
+        import main as proxy
+        db.DB_PATH = os.path.join(workdir, "zeta_metadata.db")
+        with TestClient(proxy.app) as client:
+            counter = ListingCounter(get_backend())
+            names = [f"bench-bulk-{i}" for i in range(args.zetas)]
+            for fleet, prefix in ((names[:len(names) // 2], "per zeta"), (names[len(names) // 2:], "bulk")):
+                for name in fleet:
+                    client.post(f"/zeta/create/{name}", files={"file": ("handler.py", HANDLER)})
+                    client.post(f"/zeta/run/{name}", json={})
+            print(f"{len(names) // 2} zetas per approach, {args.workers} bulk workers:")
+            per_zeta, bulk = names[:len(names) // 2], names[len(names) // 2:]
+            measure(counter, "redeploy, per zeta", lambda: [
+                client.post(f"/zeta/create/{name}", files={"file": ("handler.py", HANDLER)}) for name in per_zeta
+            ])
+            measure(counter, "redeploy, bulk", lambda: client.post(
+                "/zeta/bulk/redeploy", files=[(name, ("handler.py", HANDLER)) for name in bulk]
+            ))
+            measure(counter, "delete, per zeta", lambda: [client.delete(f"/zeta/{name}") for name in per_zeta])
+            measure(counter, "delete, bulk", lambda: client.post("/zeta/bulk/delete", json={"names": bulk}))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark the response compression of the runner and the proxy, across JSON result sizes.
+
+- `identity`: the response is sent uncompressed
+- `gzip` / `zstd`: compressed once, by the runner, and passed through by the proxy
+- `proxy recompress`: what passing through saves, the proxy decompressing the runner response
+  and compressing it again (zstd)
+
+The transfer time is computed for a link of `--mbps` megabits per second.
+Requires the `zstandard` package. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_compression.py
+python benchmarks/bench_compression.py --mbps 100
+```
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+import orjson  # noqa: E402
+import zstandard  # noqa: E402
+from services.zeta import compression_service  # noqa: E402
+
+RECORD = {"id": 123456, "name": "zeta-record", "score": 0.987654321, "tags": ["a", "b", "c"], "active": True}
+SIZES = {"10 KB": 10 * 1024, "1 MB": 1024 * 1024, "10 MB": 10 * 1024 * 1024}
+
+
+def build_payload(size: int) -> bytes:
+    records = [dict(RECORD, id=i, name=f"zeta-record-{i}") for i in range(size // len(orjson.dumps(RECORD)))]
+    return orjson.dumps({"items": records})
+
+
+def timed(func, repeat: int) -> tuple:
+    """
+    Median time of `func()`, in ms, and its last result.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mbps", type=float, default=10, help="link bandwidth, in megabits per second")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    bytes_per_ms = args.mbps * 1_000_000 / 8 / 1000
+    print(f"Link: {args.mbps:g} Mbit/s")
+    print(f"  {'size':<7} {'encoding':<17} {'bytes':>10} {'ratio':>7} {'cpu (ms)':>9} {'transfer (ms)':>14}")
+    for label, size in SIZES.items():
+        payload = build_payload(size)
+        print(f"  {label:<7} {'identity':<17} {len(payload):>10} {1:>7.1f} {0:>9.2f} {len(payload) / bytes_per_ms:>14.1f}")
+        compressed = {}
+        for encoding in ("gzip", "zstd"):
+            elapsed, compressed[encoding] = timed(
+                lambda: compression_service.compress(payload, encoding), args.repeat
+            )
+            body = compressed[encoding]
+            print(
+                f"  {label:<7} {encoding:<17} {len(body):>10} {len(payload) / len(body):>7.1f} "
+                f"{elapsed:>9.2f} {len(body) / bytes_per_ms:>14.1f}"
+            )
+        elapsed, _ = timed(lambda: compression_service.compress(
+            zstandard.ZstdDecompressor().decompress(compressed["zstd"]), "zstd"
+        ), args.repeat)
+        print(f"  {label:<7} {'proxy recompress':<17} {'':>10} {'':>7} {elapsed:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark the `fork` worker mode of the docker python base runner against the other ways of running a sync handler.
+
+- `in-process`: the loaded handler is called on a thread of the runner process (`process` mode), state is shared
+- `pool`: the call is offloaded to a supervised pool worker, which loaded handler.py once (`pool` mode)
+- `fork`: the call runs in a child forked from the zygote, which loaded handler.py once (`fork` mode)
+- `fork, batch N`: calls queued together share a forked child (`ZETA_FORK_BATCH_SIZE`)
+
+The handler builds a lookup table at import, and counts its calls in a global: `leaked state` tells
+whether a call sees what the previous ones left behind.
+
+No container needed, requires the runner requirements installed locally. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_fork_mode.py
+python benchmarks/bench_fork_mode.py --requests 500 --table-mb 200
+```
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from concurrent.futures import ThreadPoolExecutor, wait
+
+RUNNER_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "src", "runner_images", "python_base_runner"
+)
+HANDLER = """
+TABLE = bytearray({table_bytes})
+CALLS = []
+
+def main_handler(params):
+    CALLS.append(params)
+    return {{"calls": len(CALLS), "byte": TABLE[params["i"] % len(TABLE)]}}
+"""
+
+
+def measure(label: str, submit, requests: int, batch: int = 1):
+    """
+    Submit `requests` calls, `batch` at a time, and report the per call latency and the leaked state.
+    """
+    latencies, calls = [], 0
+    for start in range(0, requests, batch):
+        started = time.perf_counter()
+        futures = [submit({"i": i}) for i in range(start, min(start + batch, requests))]
+        wait(futures)
+        elapsed = (time.perf_counter() - started) / len(futures)
+        latencies.extend([elapsed] * len(futures))
+        calls = max(calls, *(future.result()[0]["calls"] for future in futures))
+    latencies.sort()
+    p50 = statistics.median(latencies) * 1000
+    p99 = latencies[int(len(latencies) * 0.99) - 1] * 1000
+    print(f"  {label:<16} {p50:>9.2f} {p99:>9.2f} {'yes' if calls > batch else 'no':>13}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--table-mb", type=int, default=50, help="size of the table the handler builds at import")
+    parser.add_argument("--batch", type=int, default=8)
+    args = parser.parse_args()
+
+    sys.path.insert(0, os.path.abspath(RUNNER_DIR))
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.mkdir("handler")
+        with open(os.path.join("handler", "handler.py"), "w") as handler_file:
+            handler_file.write(HANDLER.format(table_bytes=args.table_mb * 1024 * 1024))
+        import accounting
+        import main as runner
+        from supervisor import SupervisedPool
+        from zygote import ZygotePool
+
+        print(f"{args.requests} calls, {args.table_mb} MB handler table:")
+        print(f"  {'mode':<16} {'p50 (ms)':>9} {'p99 (ms)':>9} {'leaked state':>13}")
+        main_handler = runner.load_main_handler()
+        with ThreadPoolExecutor(max_workers=1) as threads:
+            measure("in-process", lambda params: threads.submit(
+                accounting.run_accounted, main_handler, params
+            ), args.requests)
+        pool = SupervisedPool(max_workers=1, initializer=runner.init_pool_worker)
+        measure("pool", lambda params: pool.submit(
+            accounting.run_accounted, runner.call_main_handler, params
+        ), args.requests)
+        pool.shutdown()
+        for batch in (1, args.batch):
+            started = time.perf_counter()
+            zygote = ZygotePool(max_workers=1, preload=runner.preload_main_handler, batch_size=batch)
+            ready_ms = (time.perf_counter() - started) * 1000
+            measure("fork" if batch == 1 else f"fork, batch {batch}", lambda params: zygote.submit(
+                accounting.run_accounted, runner.call_main_handler, params
+            ), args.requests, batch)
+            zygote.shutdown()
+        print(f"  zygote ready in {ready_ms:.1f} ms (handler loaded once)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Benchmark the metadata database under contention: reader threads fetching zeta metadata
+(as `run_zeta` does on every request) while writer threads record heartbeats and usage.
+
+No docker daemon needed, the database is created in a temporary directory. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_metadata_db.py                              # batched writes
+python benchmarks/bench_metadata_db.py --batch-interval 0           # write-through
+python benchmarks/bench_metadata_db.py --readers 16 --writers 4 --duration 10
+```
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import threading
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+
+def percentile(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def populate(db, zetas: int):
+    for i in range(zetas):
+        name = f"bench-zeta-{i}"
+        db.insert_zeta_runner_image(image_id=f"sha256:{i:064x}", tag=f"{name}:latest")
+        db.insert_zeta_function(name=name, created_at=time.time(), runner_image_id=f"sha256:{i:064x}")
+        db.insert_zeta_runner_container(
+            function_name=name, container_name=name, container_id=f"{i:064x}",
+            host_ip="127.0.0.1", host_port=str(20000 + i)
+        )
+
+
+def reader(db, zetas: int, stop: threading.Event, latencies: list):
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        db.fetch_zeta_function_by_name(f"bench-zeta-{i % zetas}")
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+def writer(db, zetas: int, stop: threading.Event, latencies: list):
+    i = 0
+    while not stop.is_set():
+        start = time.perf_counter()
+        # Heartbeats use the short container id, as sent by the runners
+        db.update_zeta_runner_container_heartbeat(f"{i % zetas:064x}"[:12], time.time())
+        db.update_zeta_usage(f"bench-zeta-{i % zetas}", 1.5, 1.0, 0)
+        latencies.append(time.perf_counter() - start)
+        i += 1
+
+
+def report(label: str, latencies: list, duration: float):
+    print(f"{label}:")
+    print(f"  ops/s : {len(latencies) / duration:.0f}")
+    print(f"  mean  : {statistics.mean(latencies) * 1000:.3f} ms")
+    print(f"  p99   : {percentile(latencies, 0.99) * 1000:.3f} ms")
+    print(f"  max   : {max(latencies) * 1000:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--zetas", type=int, default=50)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--batch-interval", type=float, default=1.0)
+    args = parser.parse_args()
+
+    # Read by the db module at import time
+    os.environ["ZETA_DB_WRITE_BATCH_INTERVAL"] = str(args.batch_interval)
+    from services.zeta import db
+
+    with tempfile.TemporaryDirectory() as workdir:
+        db.DB_PATH = os.path.join(workdir, "zeta_metadata.db")
+        db.initialize_db()
+        populate(db, args.zetas)
+
+        stop = threading.Event()
+        read_latencies, write_latencies = [], []
+        threads = [
+            threading.Thread(target=reader, args=(db, args.zetas, stop, read_latencies))
+            for _ in range(args.readers)
+        ] + [
+            threading.Thread(target=writer, args=(db, args.zetas, stop, write_latencies))
+            for _ in range(args.writers)
+        ]
+        for thread in threads:
+            thread.start()
+        time.sleep(args.duration)
+        stop.set()
+        for thread in threads:
+            thread.join()
+        db.flush_pending_writes()
+        invocations = sum(meta["usage_invocations"] for meta in db.fetch_all_zeta_functions())
+
+    print(f"readers / writers : {args.readers} / {args.writers}")
+    print(f"batch interval    : {args.batch_interval}s")
+    report("reads", read_latencies, args.duration)
+    report("writes", write_latencies, args.duration)
+    print(f"usage recorded    : {invocations} / {len(write_latencies)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the `GET /zeta/meta` listing of a large fleet: the full listing, a page of names,
+and a poller revalidating its ETag (`If-None-Match`) while nothing changed.
+
+No docker daemon needed, the proxy runs on the fake backend in a temporary directory. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_metadata_listing.py
+python benchmarks/bench_metadata_listing.py --zetas 10000 --requests 100
+```
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+
+def populate(db, zetas: int):
+    for i in range(zetas):
+        name = f"bench-zeta-{i:05d}"
+        db.insert_zeta_runner_image(image_id=f"sha256:{i:064x}", tag=f"{name}:latest")
+        db.insert_zeta_function(name=name, created_at=time.time(), runner_image_id=f"sha256:{i:064x}")
+        if i % 2 == 0:
+            db.insert_zeta_runner_container(
+                function_name=name, container_name=name, container_id=f"{i:064x}",
+                host_ip="127.0.0.1", host_port=str(20000 + i)
+            )
+
+
+def measure(client, requests: int, url: str, headers: dict = {}) -> tuple:
+    latencies, size, status_code = [], 0, None
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = client.get(url, headers=headers)
+        latencies.append(time.perf_counter() - start)
+        size, status_code = len(response.content), response.status_code
+    return latencies, size, status_code
+
+
+def report(label: str, latencies: list, size: int, status_code: int):
+    print(f"{label}:")
+    print(f"  status : {status_code}, {size} bytes")
+    print(f"  mean   : {statistics.mean(latencies) * 1000:.2f} ms")
+    print(f"  median : {statistics.median(latencies) * 1000:.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--zetas", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--page-size", type=int, default=100)
+    args = parser.parse_args()
+
+    os.environ["ZETA_CONTAINER_BACKEND"] = "fake"
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from fastapi.testclient import TestClient
+        from services.zeta import db
+        import main as proxy
+        db.DB_PATH = os.path.join(workdir, "zeta_metadata.db")
+        with TestClient(proxy.app) as client:
+            populate(db, args.zetas)
+            report("full listing", *measure(client, args.requests, "/zeta/meta"))
+            page = f"/zeta/meta?limit={args.page_size}&fields=name,state"
+            report(f"page of {args.page_size} names / states", *measure(client, args.requests, page))
+            etag = client.get("/zeta/meta").headers["etag"]
+            report("full listing, unchanged ETag", *measure(client, args.requests, "/zeta/meta", {"If-None-Match": etag}))
+
+
+if __name__ == "__main__":
+    main()
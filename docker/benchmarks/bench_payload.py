@@ -0,0 +1,80 @@
+"""
+Benchmark the handler result encoding path between the runner and the proxy, across payload sizes.
+
+- `legacy`: the runner lets FastAPI encode the result, the proxy `json.loads` it,
+  then FastAPI encodes it again in the proxy response envelope.
+- `passthrough`: the runner encodes the result once with orjson,
+  the proxy splices the bytes into its response envelope.
+
+Run from the `docker/` directory:
+```sh
+python benchmarks/bench_payload.py
+```
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+import orjson  # noqa: E402
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from services.zeta.zeta_utils import wrap_runner_json_response  # noqa: E402
+
+RECORD = {"id": 123456, "name": "zeta-record", "score": 0.987654321, "tags": ["a", "b", "c"], "active": True}
+RECORD_SIZE = len(json.dumps(RECORD))
+
+
+def fastapi_encode(content) -> bytes:
+    # What FastAPI's JSONResponse does for a returned dict
+    return json.dumps(
+        jsonable_encoder(content),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
+
+
+def legacy(result) -> bytes:
+    runner_body = fastapi_encode(result)
+    proxied = json.loads(runner_body.decode())
+    return fastapi_encode({"status": "Success", "response": proxied})
+
+
+def passthrough(result) -> bytes:
+    runner_body = orjson.dumps(result)
+    return wrap_runner_json_response(runner_body)
+
+
+def timeit(func, payload, budget: float) -> float:
+    runs, start = 0, time.perf_counter()
+    while True:
+        func(payload)
+        runs += 1
+        elapsed = time.perf_counter() - start
+        if elapsed > budget and runs >= 3:
+            return elapsed / runs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budget", type=float, default=0.5, help="seconds spent per measurement")
+    args = parser.parse_args()
+
+    print(f"{'payload':>10} {'legacy (ms)':>12} {'passthrough (ms)':>17} {'speedup':>8}")
+    for size in (1_000, 10_000, 100_000, 1_000_000, 10_000_000):
+        payload = {"records": [RECORD] * max(1, size // RECORD_SIZE)}
+        assert json.loads(legacy(payload)) == json.loads(passthrough(payload))
+        legacy_time = timeit(legacy, payload, args.budget)
+        passthrough_time = timeit(passthrough, payload, args.budget)
+        print(
+            f"{size:>10} {legacy_time * 1000:>12.3f} {passthrough_time * 1000:>17.3f} "
+            f"{legacy_time / passthrough_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
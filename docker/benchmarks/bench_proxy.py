@@ -0,0 +1,72 @@
+"""
+Benchmark the docker proxy hot paths against the in-process fake container backend.
+
+No docker daemon needed. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_proxy.py --calls 500
+python benchmarks/bench_proxy.py --calls 500 --profile   # cProfile the run loop
+```
+"""
+import os
+import sys
+import time
+import argparse
+import cProfile
+import pstats
+import statistics
+
+os.environ.setdefault("ZETA_CONTAINER_BACKEND", "fake")
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+from fastapi.testclient import TestClient  # noqa: E402
+from main import app  # noqa: E402
+
+HANDLER = b"""
+def main_handler(params):
+    return {"echo": params}
+"""
+
+
+def percentile(samples: list, p: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=200)
+    parser.add_argument("--zeta", default="bench-zeta")
+    parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    with TestClient(app) as client:
+        response = client.post(f"/zeta/create/{args.zeta}", files={"file": ("handler.py", HANDLER)})
+        response.raise_for_status()
+        # Cold start
+        start = time.perf_counter()
+        client.post(f"/zeta/run/{args.zeta}", json={"key": "value"}).raise_for_status()
+        cold_start = time.perf_counter() - start
+        # Warm calls
+        profiler = cProfile.Profile() if args.profile else None
+        samples = []
+        if profiler:
+            profiler.enable()
+        for _ in range(args.calls):
+            start = time.perf_counter()
+            client.post(f"/zeta/run/{args.zeta}", json={"key": "value"}).raise_for_status()
+            samples.append(time.perf_counter() - start)
+        if profiler:
+            profiler.disable()
+        client.delete(f"/zeta/{args.zeta}")
+
+    print(f"cold start : {cold_start * 1000:.2f} ms")
+    print(f"warm calls : {args.calls}")
+    print(f"  mean     : {statistics.mean(samples) * 1000:.2f} ms")
+    print(f"  p50      : {percentile(samples, 0.50) * 1000:.2f} ms")
+    print(f"  p99      : {percentile(samples, 0.99) * 1000:.2f} ms")
+    if profiler:
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
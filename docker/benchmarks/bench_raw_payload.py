@@ -0,0 +1,76 @@
+"""
+Benchmark binary request payloads through the proxy, across payload sizes.
+
+- `json`: the payload is base64-encoded in a JSON body to `POST /zeta/run/{zeta_name}`, parsed by FastAPI,
+  re-encoded by the proxy and parsed again by the runner, which decodes the base64.
+- `raw`: the payload is sent as is to `POST /zeta/run/{zeta_name}/raw`, and streamed to the runner.
+
+No docker daemon needed, the proxy runs on the fake backend in a temporary directory. Run from the `docker/` directory:
+```sh
+python benchmarks/bench_raw_payload.py
+```
+"""
+import os
+import sys
+import time
+import base64
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+
+HANDLER = b"""
+import base64
+def main_handler(params):
+    data = params if isinstance(params, bytes) else base64.b64decode(params["data"])
+    return {"size": len(data)}
+"""
+
+
+def measure(send, requests: int) -> float:
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        send()
+        latencies.append(time.perf_counter() - start)
+    return statistics.median(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ["ZETA_CONTAINER_BACKEND"] = "fake"
+    os.environ["ZETA_MAX_PAYLOAD_MB"] = "0"
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        from fastapi.testclient import TestClient
+        from services.zeta import db
+        import main as proxy
+        db.DB_PATH = os.path.join(workdir, "zeta_metadata.db")
+        with TestClient(proxy.app) as client:
+            client.post("/zeta/create/bench-raw", files={"file": ("handler.py", HANDLER)})
+            print(f"{'payload':>10} {'json (ms)':>10} {'raw (ms)':>9} {'speedup':>8}")
+            for size in (10_000, 100_000, 1_000_000, 10_000_000):
+                payload = os.urandom(size)
+
+                def send_json():
+                    response = client.post("/zeta/run/bench-raw", json={"data": base64.b64encode(payload).decode()})
+                    assert response.json()["response"]["size"] == size
+
+                def send_raw():
+                    response = client.post(
+                        "/zeta/run/bench-raw/raw", content=payload,
+                        headers={"content-type": "application/octet-stream"}
+                    )
+                    assert response.json()["response"]["size"] == size
+
+                json_time = measure(send_json, args.requests)
+                raw_time = measure(send_raw, args.requests)
+                print(f"{size:>10} {json_time * 1000:>10.2f} {raw_time * 1000:>9.2f} {json_time / raw_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark the runner startup time: from process spawn until the runner answers HTTP requests.
+
+The runner sources are copied to a temporary directory along with a trivial handler,
+and started with their production entrypoint. Requires the runner requirements installed locally.
+
+Run from the `docker/` directory:
+```sh
+python benchmarks/bench_runner_startup.py                 # docker python base runner
+python benchmarks/bench_runner_startup.py --runner k8s    # k8s python base runner
+```
+"""
+import os
+import sys
+import time
+import shutil
+import socket
+import argparse
+import tempfile
+import statistics
+import subprocess
+import http.client
+
+REPO_ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+RUNNERS = {
+    "docker": {
+        "source": os.path.join(REPO_ROOT, "docker", "src", "runner_images", "python_base_runner"),
+        "entrypoint": "serve.py",
+        "handler": ("handler/handler.py", "def main_handler(params):\n    return params\n"),
+    },
+    "k8s": {
+        "source": os.path.join(REPO_ROOT, "k8s", "zeta-base-runners", "python", "base-runner"),
+        "entrypoint": "zeta_serve.py",
+        "handler": (
+            "user/zeta.py",
+            "def zetaHandler(event, context):\n    return {'statusCode': 200, 'headers': {}, 'body': 'ok'}\n"
+        ),
+    },
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_until_ready(port: int, timeout: float) -> float:
+    start = time.perf_counter()
+    while time.perf_counter() - start < timeout:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            connection.request("GET", "/")
+            connection.getresponse().read()
+            return time.perf_counter()
+        except (ConnectionError, OSError):
+            time.sleep(0.005)
+    raise TimeoutError(f"Runner not ready after {timeout}s")
+
+
+def measure(runner: dict, workdir: str, timeout: float) -> float:
+    port = free_port()
+    env = {**os.environ, "ZETA_PORT": str(port), "ZETA_WORKERS": "1", "HOSTNAME": "bench"}
+    env.pop("ZETA_BOOT_TIMESTAMP", None)
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, runner["entrypoint"]],
+        cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        return wait_until_ready(port, timeout) - start
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runner", choices=RUNNERS.keys(), default="docker")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--timeout", type=float, default=30)
+    args = parser.parse_args()
+
+    runner = RUNNERS[args.runner]
+    with tempfile.TemporaryDirectory() as workdir:
+        shutil.copytree(runner["source"], workdir, dirs_exist_ok=True)
+        handler_path, handler_source = runner["handler"]
+        os.makedirs(os.path.join(workdir, os.path.dirname(handler_path)), exist_ok=True)
+        with open(os.path.join(workdir, handler_path), "w") as f:
+            f.write(handler_source)
+        if args.runner == "k8s":
+            open(os.path.join(workdir, "user", "__init__.py"), "w").close()
+        # Same as the image build: precompile the runner and user code
+        subprocess.run([sys.executable, "-m", "compileall", "-q", workdir], check=True)
+        samples = [measure(runner, workdir, args.timeout) for _ in range(args.runs)]
+
+    print(f"runner  : {args.runner}")
+    print(f"runs    : {args.runs}")
+    print(f"  mean  : {statistics.mean(samples) * 1000:.1f} ms")
+    print(f"  min   : {min(samples) * 1000:.1f} ms")
+    print(f"  max   : {max(samples) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
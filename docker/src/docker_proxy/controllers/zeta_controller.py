@@ -1,46 +1,111 @@
-from fastapi import APIRouter, HTTPException, File, UploadFile, status
-from services.zeta import zeta_service, zeta_metadata
+from fastapi import APIRouter, Body, HTTPException, File, UploadFile, Request, Response, status
+from services.zeta import zeta_service, zeta_metadata, zeta_utils, invocation_service, payload_service, bulk_service
+from services.zeta import compression_service
+from starlette.concurrency import run_in_threadpool
 import logging
+import orjson
 
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
+MAX_METADATA_PAGE_SIZE = 1000
+# Form field of the requirements.txt of a zeta, in a bulk redeploy
+BULK_REQUIREMENTS_SUFFIX = ":requirements"
 
 
-def check_if_zeta_exists_or_404(zeta_name: str):
-    # Check if the zeta exists
-    is_zeta_created = zeta_service.is_zeta_created(zeta_name)
-    if not is_zeta_created:
+def get_zeta_metadata_or_404(zeta_name: str) -> dict:
+    # Read once, and passed down to the invocation
+    zeta_meta = zeta_metadata.get_zeta_metadata(zeta_name)
+    if len(zeta_meta) == 0:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail=f"Zeta function '{zeta_name}' not found."
         )
+    return zeta_meta
 
 
 @router.get("/meta")
-async def get_all_zeta_metadata():
+def get_all_zeta_metadata(
+    request: Request,
+    limit: int = None,
+    cursor: str = None,
+    fields: str = None,
+    state: str = None,
+    prefix: str = None
+):
+    """
+    List the zeta metadata, ordered by name.
+    - `limit` / `cursor`: page size, and the cursor of the page, from the `X-Zeta-Next-Cursor` header
+      of the previous one
+    - `fields`: comma separated fields to return, `name` is always returned
+    - `state`: comma separated states to filter on: `cold`, `warm`, `busy`
+    - `prefix`: name prefix to filter on
+
+    Answers `304` if the metadata didn't change since the `ETag` given in `If-None-Match`.
+    """
     logger.info("Retrieving all zeta function metadata ...")
-    meta = zeta_metadata.get_all_zeta_metadata()
-    return meta
+    if limit is not None and not 0 < limit <= MAX_METADATA_PAGE_SIZE:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Page size needs to be between 1 and {MAX_METADATA_PAGE_SIZE}."
+        )
+    field_list = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+    state_list = [s.strip() for s in state.split(",") if s.strip()] if state else None
+    etag = zeta_metadata.get_metadata_etag(field_list, cursor, limit, prefix, state_list)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and (if_none_match.strip() == "*" or etag in [
+        tag.strip().removeprefix("W/") for tag in if_none_match.split(",")
+    ]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    try:
+        page, next_cursor = zeta_metadata.list_zeta_metadata(field_list, cursor, limit, prefix, state_list)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    headers = {"ETag": etag}
+    if next_cursor is not None:
+        headers["X-Zeta-Next-Cursor"] = next_cursor
+    return compression_service.encode_response(
+        orjson.dumps(page), "application/json", request.headers.get("accept-encoding"), headers=headers
+    )
+
+
+@router.get("/images/gc")
+def get_image_gc_stats():
+    """
+    Totals of the runner image garbage collector: removed images and reclaimed bytes, overall and last run.
+    """
+    return zeta_metadata.get_image_gc_stats()
+
+
+@router.get("/runners/reconciliation")
+def get_runner_reconciliation_stats():
+    """
+    Outcome of the runner reconciliation at the proxy starts: warm runners kept and reaped, overall and last start.
+    """
+    return zeta_metadata.get_runner_reconciliation_stats()
 
 
 @router.get("/meta/{zeta_name}")
-async def get_zeta_metadata(zeta_name: str):
+def get_zeta_metadata(zeta_name: str):
     logger.info(f"Retrieving zeta function metadata for: {zeta_name} ...")
-    # Check if the zeta exists
-    check_if_zeta_exists_or_404(zeta_name)
-    # retrieve zeta metadata
-    meta = zeta_metadata.get_zeta_metadata(zeta_name)
-    if len(meta) == 0:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Unable to find the zeta function {zeta_name}"
-        )
-    return meta
+    return get_zeta_metadata_or_404(zeta_name)
 
 
 @router.post("/create/{zeta_name}", status_code=status.HTTP_201_CREATED)
-async def create_zeta(zeta_name: str, file: UploadFile = File(...)):
+async def create_zeta(
+    zeta_name: str,
+    file: UploadFile = File(...),
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout: float = None,
+    requirements: UploadFile = File(None)
+):
+    """
+    Deploy the zeta function. `timeout` (seconds) and `memory_limit_mb` are hard limits
+    of a single invocation, enforced by the runner.
+    `idle_timeout` (seconds) overrides the adaptive idle timeout of the zeta runner.
+    `requirements` is an optional requirements.txt, installed in a dependency image shared across zetas.
+    """
     logger.info(f"Creating the zeta function: {zeta_name} ...")
     # Check name length
     if len(zeta_name) <= 1:
@@ -48,9 +113,22 @@ async def create_zeta(zeta_name: str, file: UploadFile = File(...)):
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Zeta name ('{zeta_name}') length needs to be 2 or more characters in length."
         )
+    # Check limits
+    if (timeout is not None and timeout <= 0) or (memory_limit_mb is not None and memory_limit_mb <= 0):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Zeta timeout and memory limit need to be positive."
+        )
+    if idle_timeout is not None and idle_timeout <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Zeta idle timeout needs to be positive."
+        )
     # Create the zeta
     try:
-        zeta_metadata = await zeta_service.create_zeta(zeta_name, file)
+        zeta_metadata = await zeta_service.create_zeta(
+            zeta_name, file, timeout, memory_limit_mb, idle_timeout, requirements
+        )
         return {
             "status": "success",
             "message": f"successfully created the zeta function '{zeta_name}'",
@@ -65,20 +143,97 @@ async def create_zeta(zeta_name: str, file: UploadFile = File(...)):
 
 
 @router.post("/run/{zeta_name}")
-async def run_function(zeta_name: str, params: dict = {}):
+def run_function(request: Request, zeta_name: str, params: dict = {}, mode: str = "sync"):
     """
     Start the function and proxy the request to it.
+    Runs on the threadpool: a slow or hung zeta only holds its own thread, not the event loop.
+    With `mode=async`, queue the invocation and answer its id right away, see `GET /invocations/{invocation_id}`.
+    The response is compressed as negotiated on `Accept-Encoding`, by the runner or by the proxy.
     """
     logger.info(f"Running the zeta function: {zeta_name} ...")
+    if mode not in ("sync", "async"):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown invocation mode '{mode}', expected 'sync' or 'async'."
+        )
     # Check if the zeta exists
-    check_if_zeta_exists_or_404(zeta_name)
+    zeta_meta = get_zeta_metadata_or_404(zeta_name)
+    if mode == "async":
+        try:
+            invocation_id = invocation_service.enqueue_invocation(zeta_name, params)
+        except invocation_service.InvocationQueueFullError as e:
+            logger.error(f"Unable to queue the invocation: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many queued invocations, retry later"
+            )
+        return Response(
+            content=orjson.dumps({"status": invocation_service.STATUS_QUEUED, "invocationId": invocation_id}),
+            media_type="application/json",
+            status_code=status.HTTP_202_ACCEPTED
+        )
     # Cold start the zeta if it is not up
-    if not zeta_service.is_zeta_up(zeta_name):
-        zeta_service.cold_start_zeta(zeta_name)
+    zeta_meta = zeta_service.ensure_zeta_up(zeta_name, zeta_meta)
     # Run the zeta
     try:
-        json_content = zeta_service.run_zeta(zeta_name, params)
-        return {"status": "Success", "response": json_content}
+        accept_encoding = request.headers.get("accept-encoding", "")
+        content, content_type, content_encoding = zeta_service.run_zeta(
+            zeta_name, params, accept_encoding, zeta_meta
+        )
+        # Pass the runner response through, as is
+        return compression_service.encode_response(content, content_type, accept_encoding, content_encoding)
+    except zeta_service.ZetaInvocationTimeoutError as e:
+        logger.error(f"Zeta invocation timed out: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"The zeta '{zeta_name}' timed out"
+        )
+    except Exception as e:
+        logger.error(f"An Exception has occured: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An error occurred while running the zeta '{zeta_name}'"
+        )
+
+
+@router.post("/run/{zeta_name}/raw")
+async def run_function_raw(zeta_name: str, request: Request):
+    """
+    Start the function and stream the request body to it, as is: any content type, the handler receiving bytes.
+    Bodies over the payload size limit are answered `413`, without being read further.
+    """
+    logger.info(f"Running the zeta function on a raw payload: {zeta_name} ...")
+    content_length = request.headers.get("content-length")
+    try:
+        payload_service.check_content_length(content_length)
+    except payload_service.PayloadTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    # Check if the zeta exists, off the event loop: the metadata database is synchronous
+    zeta_meta = await run_in_threadpool(get_zeta_metadata_or_404, zeta_name)
+    # Cold start the zeta if it is not up
+    zeta_meta = await run_in_threadpool(zeta_service.ensure_zeta_up, zeta_name, zeta_meta)
+    # Run the zeta, the body being read from the event loop as the runner consumes it
+    content_type = request.headers.get("content-type", payload_service.DEFAULT_CONTENT_TYPE)
+    accept_encoding = request.headers.get("accept-encoding", "")
+    try:
+        content, content_type, content_encoding = await run_in_threadpool(
+            zeta_service.run_zeta_raw, zeta_name, payload_service.iter_request_body(request),
+            content_type, content_length, accept_encoding, zeta_meta
+        )
+        return await run_in_threadpool(
+            compression_service.encode_response, content, content_type, accept_encoding, content_encoding
+        )
+    except payload_service.PayloadTooLargeError as e:
+        logger.error(f"Zeta payload rejected: {e}")
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    except zeta_service.ZetaInvocationTimeoutError as e:
+        logger.error(f"Zeta invocation timed out: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+            detail=f"The zeta '{zeta_name}' timed out"
+        )
     except Exception as e:
         logger.error(f"An Exception has occured: {e}")
         raise HTTPException(
@@ -87,11 +242,112 @@ async def run_function(zeta_name: str, params: dict = {}):
         )
 
 
+def get_invocation_or_404(invocation_id: str) -> dict:
+    invocation = invocation_service.get_invocation(invocation_id)
+    if len(invocation) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Invocation '{invocation_id}' not found, or its result expired."
+        )
+    return invocation
+
+
+@router.get("/invocations/{invocation_id}")
+def get_invocation(request: Request, invocation_id: str):
+    """
+    Status of an asynchronous invocation, with the zeta JSON response once it succeeded.
+    Other responses are served as is by `GET /invocations/{invocation_id}/result`.
+    """
+    invocation = get_invocation_or_404(invocation_id)
+    body = orjson.dumps({
+        "invocationId": invocation["id"],
+        "zeta": invocation["function_name"],
+        "status": invocation["status"],
+        "createdAt": invocation["created_at"],
+        "startedAt": invocation["started_at"],
+        "finishedAt": invocation["finished_at"],
+        "attempts": invocation["attempts"],
+        "error": invocation["error"],
+    })
+    result, content_type = invocation["result"], invocation["content_type"] or ""
+    if result is not None and content_type.startswith("application/json"):
+        # Embed the runner JSON response without decoding it
+        body = body[:-1] + b',"response":' + result + b'}'
+    return compression_service.encode_response(body, "application/json", request.headers.get("accept-encoding"))
+
+
+@router.get("/invocations/{invocation_id}/result")
+def get_invocation_result(request: Request, invocation_id: str):
+    """
+    Response of a succeeded asynchronous invocation, as returned by the zeta runner.
+    """
+    invocation = get_invocation_or_404(invocation_id)
+    if invocation["status"] != invocation_service.STATUS_SUCCEEDED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"Invocation '{invocation_id}' is {invocation['status']}, no result available."
+        )
+    return compression_service.encode_response(
+        invocation["result"], invocation["content_type"], request.headers.get("accept-encoding")
+    )
+
+
+@router.post("/bulk/delete")
+def delete_zetas(names: list[str] = Body(..., embed=True)):
+    """
+    Delete the zetas in parallel, with a result per zeta.
+    """
+    logger.info(f"Deleting {len(names)} zeta functions ...")
+    return bulk_service.summarize(bulk_service.delete_many(names))
+
+
+@router.post("/bulk/redeploy")
+async def redeploy_zetas(request: Request):
+    """
+    Redeploy the zetas in parallel, with a result per zeta, keeping their limits and idle timeout.
+    The multipart form holds a handler file per zeta, named after the zeta,
+    and optionally its requirements.txt, named `<zeta_name>:requirements`.
+    """
+    handlers, requirements = {}, {}
+    try:
+        async with request.form() as form:
+            for field, file in form.multi_items():
+                if not hasattr(file, "read"):
+                    raise ValueError(f"Form field '{field}' is not a file")
+                if field.endswith(BULK_REQUIREMENTS_SUFFIX):
+                    requirements[field[:-len(BULK_REQUIREMENTS_SUFFIX)]] = await zeta_utils.extract_handler_data(file)
+                else:
+                    handlers[field] = await zeta_utils.extract_handler_data(file)
+    except Exception as e:
+        logger.error(f"Unable to read the bulk redeploy form: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart form with a handler file per zeta name"
+        )
+    if len(handlers) == 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Expected a multipart form with a handler file per zeta name"
+        )
+    logger.info(f"Redeploying {len(handlers)} zeta functions ...")
+    results = await run_in_threadpool(bulk_service.redeploy_many, handlers, requirements)
+    return bulk_service.summarize(results)
+
+
+@router.post("/bulk/prune")
+def prune_runners():
+    """
+    Remove the exited and orphan runner containers in parallel, then the dangling image layers.
+    """
+    results, reclaimed_bytes = bulk_service.prune_runners()
+    return {**bulk_service.summarize(results), "reclaimedBytes": reclaimed_bytes}
+
+
 @router.delete("/{zeta_name}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_zeta(zeta_name: str):
     logger.info(f"Deleting the zeta function: {zeta_name} ...")
     # Check if the zeta exists
-    check_if_zeta_exists_or_404(zeta_name)
+    get_zeta_metadata_or_404(zeta_name)
     # Delete the zeta
     try:
         zeta_service.delete_zeta(zeta_name)
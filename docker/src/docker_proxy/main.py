@@ -2,8 +2,9 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 # from controllers import container_controller
 from controllers import zeta_controller
-from services.zeta import zeta_environment, zeta_service, zeta_metadata
-import threading
+from services.zeta import zeta_environment, zeta_service, zeta_metadata, prewarm_service, image_gc_service
+from services.zeta import invocation_service, reconcile_service
+from services import log_service, election_service
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,39 +13,43 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Setup logger
-    logging.basicConfig(
-        format='%(asctime)s %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] : %(message)s',
-        datefmt='%m/%d/%Y %I:%M:%S %p',
-        filename='docker_proxy.log',
-        encoding='utf-8',
-        level=logging.INFO
-    )
-    # Create sql file
-    zeta_metadata.initialize_metadata_db()
-    # Setup zeta environment
-    logger.info("Setup env")
-    global_network = zeta_environment.setup_environment()
-    # Start heartbeat thread
+    log_listener = log_service.setup_logging(filename='docker_proxy.log')
+    # Create sql file and setup zeta environment, one worker at a time
+    with election_service.exclusive("setup"):
+        zeta_metadata.initialize_metadata_db()
+        logger.info("Setup env")
+        global_network = zeta_environment.setup_environment()
+    # Adopt the warm runners left by the previous run, once per proxy start
+    if reconcile_service.RECONCILE_RUNNERS:
+        try:
+            election_service.run_once_per_start("runner-reconciliation", reconcile_service.reconcile_runners)
+        except Exception as e:
+            logger.error(f"Runner reconciliation failed, the zetas will cold start: {e}")
+    # Background singletons run in a single worker
     logger.info("starting hearbeat thread ...")
-    heartbeat_thread = threading.Thread(
-            target=zeta_metadata.accept_heartbeat_connection,
-            daemon=True
-            )
-    heartbeat_thread.start()
-    # Start termination thread
+    election_service.run_when_elected("heartbeat-listener", zeta_metadata.accept_heartbeat_connection)
     logger.info("starting idle termination thread ...")
-    container_termination_thread = threading.Thread(
-        target=zeta_metadata.terminate_idle_containers,
-        daemon=True
-    )
-    container_termination_thread.start()
+    election_service.run_when_elected("idle-reaper", zeta_metadata.terminate_idle_containers)
+    if prewarm_service.PREWARM_INTERVAL > 0:
+        logger.info("starting pre-warming scheduler thread ...")
+        election_service.run_when_elected("prewarm-scheduler", prewarm_service.prewarm_forever)
+    if image_gc_service.GC_INTERVAL > 0:
+        logger.info("starting image garbage collector thread ...")
+        election_service.run_when_elected("image-gc", image_gc_service.collect_images_forever)
+    # Asynchronous invocations are drained by every worker
+    logger.info("starting asynchronous invocation workers ...")
+    invocation_service.start_invocation_workers()
     yield
     # Cleanup running zetas
     # logger.info("Pre-shutdown cleanup ...")
-    # zeta_service.exterminate_all_zeta()
+    # bulk_service.exterminate_all_zeta()
     # Cleanup zeta environment
     # logger.info("clearing up env ...")
     # zeta_environment.clean_environment(global_network)
+    # Flush pending metadata writes
+    zeta_metadata.shutdown_metadata_db()
+    # Flush pending log records
+    log_listener.stop()
 
 # Define fastapi app
 app = FastAPI(lifespan=lifespan)
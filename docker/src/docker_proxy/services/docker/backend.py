@@ -0,0 +1,129 @@
+"""
+Container backend interface. The image, container and network services go through
+the backend returned by `get_backend()` instead of talking to a DockerClient directly.
+
+Available backends, selected with the `ZETA_CONTAINER_BACKEND` environment variable:
+- `docker` (default): the local docker daemon, see `docker_backend.DockerBackend`
+- `fake`: in-process simulation, see `fake_backend.FakeBackend`
+"""
+from abc import ABC, abstractmethod
+import threading
+import logging
+import os
+logger = logging.getLogger(__name__)
+
+BACKEND_ENV_VAR = "ZETA_CONTAINER_BACKEND"
+DEFAULT_BACKEND = "docker"
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class ContainerBackend(ABC):
+    """
+    Minimal set of container engine operations needed by the docker proxy.
+
+    Returned objects follow the docker SDK models:
+    - images expose `id`, `short_id`, `tags` and `attrs`
+    - containers expose `id`, `short_id`, `name`, `status`, `image`, `ports`, `attrs`,
+      and the `stop()`, `restart()`, `remove(force=...)` methods
+    - networks expose `id`, `name` and `remove()`
+    """
+
+    # Networks ================================================================
+    @abstractmethod
+    def create_network(self, network_name: str):
+        ...
+
+    @abstractmethod
+    def list_networks(self, names: list = None) -> list:
+        ...
+
+    # Images ==================================================================
+    @abstractmethod
+    def list_images(self) -> list:
+        ...
+
+    @abstractmethod
+    def build_image(self, image_name: str, dockerfile_path: str):
+        ...
+
+    @abstractmethod
+    def get_image(self, image_name_or_id: str):
+        ...
+
+    @abstractmethod
+    def remove_image(self, image_id: str, force: bool = False):
+        ...
+
+    @abstractmethod
+    def prune_images(self) -> int:
+        """
+        Remove the dangling images (untagged and unused layers), returns the reclaimed bytes.
+        """
+        ...
+
+    # Containers ==============================================================
+    @abstractmethod
+    def list_containers(self, all: bool = False) -> list:
+        ...
+
+    @abstractmethod
+    def get_container(self, container_name_or_id: str):
+        ...
+
+    @abstractmethod
+    def run_container(
+        self,
+        image_id: str,
+        container_name: str,
+        ports: dict,
+        network: str,
+        volumes: dict,
+        environment: dict = None
+    ):
+        ...
+
+
+def create_backend(name: str) -> ContainerBackend:
+    """
+    Instanciate the backend registered under `name`
+
+    Attributes
+    ---
+    - name: str
+        One of `docker`, `fake`
+    """
+    if name == "docker":
+        from .docker_backend import DockerBackend
+        return DockerBackend()
+    if name == "fake":
+        from .fake_backend import FakeBackend
+        return FakeBackend()
+    raise ValueError(f"Unknown container backend '{name}'")
+
+
+def get_backend() -> ContainerBackend:
+    """
+    Return the active container backend, creating it from `ZETA_CONTAINER_BACKEND` on first use.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                name = os.environ.get(BACKEND_ENV_VAR, DEFAULT_BACKEND)
+                logger.info(f"Using the '{name}' container backend")
+                _backend = create_backend(name)
+    return _backend
+
+
+def set_backend(backend: ContainerBackend):
+    """
+    Replace the active container backend. Useful for benchmarks and profiling.
+
+    Attributes
+    ---
+    - backend: ContainerBackend
+    """
+    global _backend
+    with _backend_lock:
+        _backend = backend
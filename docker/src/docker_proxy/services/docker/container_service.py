@@ -0,0 +1,271 @@
+"""
+Container management service, backed by the active container backend.
+"""
+from .backend import get_backend
+import logging
+import shutil
+import os
+logger = logging.getLogger(__name__)
+
+SOCKET_DIR = os.path.join(os.getcwd(), "src/docker_proxy/tmp")
+# The directory of the heartbeat socket is mounted, rather than the socket itself:
+# the socket re-created by a restarted proxy stays reachable from the running runners
+HEARTBEAT_SOCKET_DIR = os.path.join(SOCKET_DIR, "heartbeat")
+HEARTBEAT_SOCKET_MOUNT = "/zeta/tmp"                                 # synced with the runner's main.py
+SOCKET_PATH = os.path.join(HEARTBEAT_SOCKET_DIR, "docker_proxy.sock")  # synced with the runner's main.py
+# Per-container directories, shared with the runners serving HTTP on a Unix socket
+RUNNER_SOCKET_DIR = os.path.join(SOCKET_DIR, "runners")
+RUNNER_SOCKET_MOUNT = "/zeta/run"
+RUNNER_SOCKET_NAME = "runner.sock"
+
+
+def runner_socket_dir(container_name: str) -> str:
+    return os.path.join(RUNNER_SOCKET_DIR, container_name)
+
+
+def runner_socket_path(container_name: str) -> str:
+    """
+    Host path of the Unix socket the runner container `container_name` serves HTTP on.
+    """
+    return os.path.join(runner_socket_dir(container_name), RUNNER_SOCKET_NAME)
+
+
+def remove_runner_socket_dir(container_name: str):
+    shutil.rmtree(runner_socket_dir(container_name), ignore_errors=True)
+
+
+def instanciate_container_from_image(
+    container_name: str,
+    image_id: str,
+    ports: dict,
+    network: str,
+    uds: bool = False
+):
+    """
+    Instanciate a container for the image with id `image_id`, exposed on ports described in `ports`.
+
+    Attributes
+    ---
+    - container_name: str
+    - image_name: str
+    - ports: dict
+        Port specification to publish the container following this format: `{"<container_port>" : <host_port>}`.
+        for example: `ports = {"8000": 9090}`
+    - uds: bool
+        Have the runner serve HTTP on a Unix socket, at `runner_socket_path(container_name)` on the host
+    """
+    backend = get_backend()
+    # Check image exists, without listing all the images
+    try:
+        backend.get_image(image_id)
+    except Exception:
+        raise Exception("Unable to find the specified image")
+    # Check if network exists
+    if len(network) > 0:
+        filtered_net_list = backend.list_networks(names=[network])
+        if len(filtered_net_list) == 0:
+            raise Exception(f"Unable to find the network {network}")
+    os.makedirs(HEARTBEAT_SOCKET_DIR, exist_ok=True)
+    volumes = {
+        HEARTBEAT_SOCKET_DIR: {
+            'bind': HEARTBEAT_SOCKET_MOUNT,
+            'mode': 'ro'
+        }
+    }
+    environment = {}
+    if uds:
+        os.makedirs(runner_socket_dir(container_name), exist_ok=True)
+        volumes[runner_socket_dir(container_name)] = {'bind': RUNNER_SOCKET_MOUNT, 'mode': 'rw'}
+        environment["ZETA_UDS"] = f"{RUNNER_SOCKET_MOUNT}/{RUNNER_SOCKET_NAME}"
+    # Instanciate the container
+    return backend.run_container(
+        image_id=image_id,
+        container_name=container_name,
+        ports=ports,
+        network=network,
+        volumes=volumes,
+        environment=environment,
+    )
+
+
+def does_container_exist(container_name: str):
+    """
+    Checks if the container exists, whatever the state it is in
+
+    Attributes
+    ---
+    - container_name: str
+    """
+    return find_container(container_name) is not None
+
+
+def is_container_running(container_name: str):
+    """
+    Checks if the container is in a `RUNNING` state
+
+    Attributes
+    ---
+    - container_name: str
+    """
+    container = find_container(container_name)
+    return container is not None and container.status == "running"
+
+
+def find_container(container_name: str):
+    """
+    The container named `container_name`, looked up without listing all the containers, or `None`
+
+    Attributes
+    ---
+    - container_name: str
+    """
+    try:
+        container = get_backend().get_container(container_name)
+    except Exception:
+        return None
+    # Lookups also match on id prefixes
+    return container if container.name == container_name else None
+
+
+def get_running_container_names() -> list:
+    """
+    Names of the containers in a `RUNNING` state
+    """
+    return [container.name for container in get_backend().list_containers()]
+
+
+def get_image_ids_in_use() -> set:
+    """
+    Ids of the images of all the containers, running or not, from a single listing
+    """
+    return {container.attrs.get("Image") for container in get_backend().list_containers(all=True)}
+
+
+def get_containers_by_name(all: bool = True) -> dict:
+    """
+    Containers by name, from a single listing
+
+    Attributes
+    ---
+    - all: bool
+        Include the containers that are not running
+    """
+    return {container.name: container for container in get_backend().list_containers(all=all)}
+
+
+def discard_container(container):
+    """
+    Stop and remove a container from a listing, without looking it up again
+
+    Attributes
+    ---
+    - container: docker.models.containers.Container
+    """
+    try:
+        logger.info(f"Removing container: {container.name}")
+        if container.status == "running":
+            container.stop()
+        container.remove()
+    except Exception:
+        logger.info(f"Forcefully Removing container: {container.name}")
+        try:
+            container.remove(force=True)
+        except Exception as err:
+            raise RuntimeError("Unable to remove the container", container.name, ":", err)
+
+
+def get_container(container_name_or_id: str):
+    """
+    Retrieve the specified container
+
+    Attributes
+    ---
+    - container_name_or_id: str
+        Can be either the container name or id
+    """
+    try:
+        return get_backend().get_container(container_name_or_id)
+    except Exception as err:
+        raise RuntimeError("Unable to retrieve the container: ", err)
+
+
+def get_containers_of_image(image_id: str):
+    """
+    Get containers instanciated from an image of id `image_id`
+
+    Attributes
+    ---
+    - image_id: str
+    """
+    container_list = []
+    for container in get_backend().list_containers(all=True):
+        if container.image.id == image_id:
+            container_list.append(container)
+    return container_list
+
+
+def restart_container(container_name_or_id: str):
+    """
+    Restart the specified container
+
+    Attributes
+    ---
+    - container_name_or_id: str
+        Can be either the container name or id
+    """
+    try:
+        get_backend().get_container(container_name_or_id).restart()
+    except Exception as err:
+        raise RuntimeError("Unable to restart the container of id " + container_name_or_id + " : ", err)
+
+
+def stop_container(container_name_or_id: str):
+    """
+    Stop the specified container
+
+    Attributes
+    ---
+    - container_name_or_id: str
+        Can be either the container name or id
+    """
+    try:
+        get_backend().get_container(container_name_or_id).stop()
+    except Exception as err:
+        raise RuntimeError("Unable to stop the container of id", container_name_or_id, ":", err)
+
+
+def remove_container(container_name_or_id: str):
+    """
+    Remove the specified container
+
+    Attributes
+    ---
+    - container_name_or_id: str
+        Can be either the container name or id
+    """
+    backend = get_backend()
+    try:
+        try:
+            logger.info(f"Removing container: {container_name_or_id}")
+            backend.get_container(container_name_or_id).remove()
+        except Exception:
+            logger.info(f"Forcefully Removing container: {container_name_or_id}")
+            backend.get_container(container_name_or_id).remove(force=True)
+    except Exception as err:
+        raise RuntimeError("Unable to remove the container of id", container_name_or_id, ":", err)
+
+
+def prune_containers() -> list:
+    """
+    Remove all containers, whathever the state they are in.
+    """
+    removed = []
+    for name in list(map(lambda x: x.name, get_backend().list_containers(all=True))):
+        try:
+            stop_container(name)
+            remove_container(name)
+            removed.append(name)
+        except Exception:
+            logger.warning(f"Can't remove container: {name}")
+            continue
+    return removed
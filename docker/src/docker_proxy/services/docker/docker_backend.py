@@ -0,0 +1,68 @@
+"""
+Docker backend, wrapping the DockerClient instance. To be used to execute container engine specific commands.
+"""
+from docker import DockerClient
+from .backend import ContainerBackend
+import logging
+logger = logging.getLogger(__name__)
+
+DOCKER_SOCK = 'unix://var/run/docker.sock'
+DOCKER_HOST = DOCKER_SOCK
+DOCKER_PORT = 2373
+
+
+class DockerBackend(ContainerBackend):
+    def __init__(self, docker_host: str = DOCKER_HOST):
+        self.client = DockerClient(docker_host)
+
+    # Network Mangement =======================================================
+    def create_network(self, network_name: str):
+        return self.client.networks.create(network_name, driver="bridge")
+
+    def list_networks(self, names: list = None) -> list:
+        return self.client.networks.list(names=names)
+
+    # Image Management ========================================================
+    def list_images(self) -> list:
+        return self.client.images.list()
+
+    def build_image(self, image_name: str, dockerfile_path: str):
+        image, _ = self.client.images.build(tag=image_name, path=dockerfile_path)
+        return image
+
+    def get_image(self, image_name_or_id: str):
+        return self.client.images.get(image_name_or_id)
+
+    def remove_image(self, image_id: str, force: bool = False):
+        self.client.images.remove(image=image_id, force=force)
+
+    def prune_images(self) -> int:
+        return self.client.images.prune(filters={"dangling": True}).get("SpaceReclaimed") or 0
+
+    # Container Management ====================================================
+    def list_containers(self, all: bool = False) -> list:
+        return self.client.containers.list(all=all)
+
+    def get_container(self, container_name_or_id: str):
+        return self.client.containers.get(container_name_or_id)
+
+    def run_container(
+        self,
+        image_id: str,
+        container_name: str,
+        ports: dict,
+        network: str,
+        volumes: dict,
+        environment: dict = None
+    ):
+        container = self.client.containers.run(
+            image=image_id,
+            name=container_name,
+            detach=True,
+            ports=ports,
+            network=network,
+            volumes=volumes,
+            environment=environment,
+        )
+        logger.debug(container.attrs['NetworkSettings']['Networks'])
+        return container
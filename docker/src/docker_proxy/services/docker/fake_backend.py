@@ -0,0 +1,361 @@
+"""
+In-process fake container backend, to benchmark and profile the docker proxy without a docker daemon.
+
+- Images are built from the build context: the handler copied to `handler/handler.py` is kept in memory.
+- Containers run the handler in-process, behind a loopback HTTP server on the published host port
+  (or on the Unix socket given in `ZETA_UDS`, translated to its mounted host path),
+  mimicking the python base runner's `/is-running`, `/run` and `/run/raw` endpoints
+  (response envelope and compression included).
+- Start / build delays are configurable, to simulate cold starts deterministically.
+  Defaults come from the `ZETA_FAKE_START_DELAY` and `ZETA_FAKE_BUILD_DELAY` environment variables (seconds).
+"""
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from socketserver import ThreadingUnixStreamServer
+from services.zeta import compression_service
+from .backend import ContainerBackend
+import threading
+import hashlib
+import logging
+import types
+import json
+import time
+import uuid
+import os
+logger = logging.getLogger(__name__)
+
+HANDLER_DESTINATION = "handler/handler.py"
+
+
+class FakeImage:
+    def __init__(self, tag: str, files: dict):
+        digest = hashlib.sha256(tag.encode())
+        for name in sorted(files):
+            digest.update(files[name])
+        self.id = "sha256:" + digest.hexdigest()
+        self.short_id = self.id[:17]
+        self.tags = [tag]
+        self.files = files
+        self.attrs = {"Id": self.id, "RepoTags": self.tags, "Size": sum(map(len, files.values()))}
+
+    def handler_source(self):
+        """
+        Return the source of the handler file COPY'ed to `handler/handler.py`, if any.
+        """
+        dockerfile = self.files.get("Dockerfile", b"").decode()
+        for line in dockerfile.splitlines():
+            parts = line.split()
+            if len(parts) == 3 and parts[0].upper() == "COPY" and parts[2].endswith(HANDLER_DESTINATION):
+                source = self.files.get(parts[1])
+                return None if source is None else source.decode()
+        return None
+
+
+class FakeNetwork:
+    def __init__(self, backend, name: str):
+        self._backend = backend
+        self.id = uuid.uuid4().hex
+        self.name = name
+
+    def remove(self):
+        self._backend._networks.pop(self.name, None)
+
+
+class _UnixHTTPServer(ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class _RunnerRequestHandler(BaseHTTPRequestHandler):
+    """
+    Mimics the python base runner endpoints.
+    """
+    def log_message(self, format, *args):
+        pass
+
+    def address_string(self):
+        # Unix socket clients have no address
+        return str(self.client_address)
+
+    def _send_json(self, status_code: int, payload, headers: dict = {}, encode: bool = False):
+        """
+        With `encode`, wrap a JSON body in the proxy envelope and compress the body, when asked.
+        """
+        headers = dict(headers)
+        content_type = "application/json"
+        if isinstance(payload, (bytes, bytearray)):
+            body, content_type = bytes(payload), "application/octet-stream"
+        else:
+            body = json.dumps(payload).encode()
+            if encode and self.headers.get("X-Zeta-Envelope"):
+                body = b'{"status":"Success","response":' + body + b'}'
+                headers["X-Zeta-Envelope"] = "1"
+        encoding = compression_service.negotiate(self.headers.get("Accept-Encoding"), len(body)) if encode else None
+        if encoding is not None:
+            body = compression_service.compress(body, encoding)
+            headers["Content-Encoding"] = encoding
+        self.send_response(status_code)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path != "/is-running":
+            return self._send_json(404, {"detail": "Not Found"})
+        self._send_json(200, {"status": "UP", "timestamp": time.time()})
+
+    def _read_body(self) -> bytes:
+        """
+        Request body, `None` when the client aborted the upload.
+        """
+        if self.headers.get("Transfer-Encoding", "").lower() != "chunked":
+            length = int(self.headers.get("Content-Length", 0))
+            return self.rfile.read(length) if length > 0 else b""
+        chunks = []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return None
+            size = int(line.split(b";")[0], 16)
+            if size == 0:
+                # Trailers, up to the final empty line
+                while self.rfile.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return b"".join(chunks)
+            chunks.append(self.rfile.read(size))
+            self.rfile.readline()
+
+    def do_POST(self):
+        if self.path not in ("/run", "/run/raw"):
+            return self._send_json(404, {"detail": "Not Found"})
+        raw = self._read_body()
+        if raw is None:
+            return
+        main_handler = self.server.main_handler
+        if main_handler is None:
+            return self._send_json(404, {"detail": "main_handler function not found in handler.py"})
+        try:
+            # Raw payloads are given to the handler as bytes
+            if self.path == "/run/raw":
+                params = raw
+            else:
+                params = json.loads(raw) if raw else {}
+            wall_start, cpu_start = time.perf_counter(), time.thread_time()
+            result = main_handler(params)
+            usage = {
+                "wallTimeMs": (time.perf_counter() - wall_start) * 1000,
+                "cpuTimeMs": (time.thread_time() - cpu_start) * 1000,
+                "peakRssDeltaKb": 0,
+            }
+            self._send_json(200, result, headers={"X-Zeta-Usage": json.dumps(usage)}, encode=True)
+        except Exception as e:
+            self._send_json(500, {"detail": str(e)})
+
+
+class FakeContainer:
+    def __init__(
+        self,
+        backend,
+        name: str,
+        image: FakeImage,
+        ports: dict,
+        network: str,
+        volumes: dict = None,
+        environment: dict = None
+    ):
+        self._backend = backend
+        self._port_spec = ports
+        self._socket_path = self._host_path((environment or {}).get("ZETA_UDS"), volumes or {})
+        self._server = None
+        self._start_timer = None
+        self.id = uuid.uuid4().hex + uuid.uuid4().hex
+        self.short_id = self.id[:12]
+        self.name = name
+        self.image = image
+        self.network = network
+        self.status = "created"
+
+    @property
+    def ports(self):
+        if self.status != "running":
+            return {}
+        return {
+            f"{container_port}/tcp": [{"HostIp": "127.0.0.1", "HostPort": str(host_port)}]
+            for container_port, host_port in self._port_spec.items()
+        }
+
+    @property
+    def attrs(self):
+        return {
+            "Id": self.id,
+            "Name": "/" + self.name,
+            "Image": self.image.id,
+            "State": {"Status": self.status},
+            "NetworkSettings": {"Ports": self.ports, "Networks": {self.network: {}} if self.network else {}},
+        }
+
+    def reload(self):
+        pass
+
+    @staticmethod
+    def _host_path(container_path: str, volumes: dict):
+        """
+        Translate a path inside the container to its host path, through the bind mounts.
+        """
+        if not container_path:
+            return None
+        for host_path, bind in volumes.items():
+            mount = bind["bind"].rstrip("/")
+            if container_path.startswith(mount + "/"):
+                return host_path + container_path[len(mount):]
+        return None
+
+    def _serve(self):
+        main_handler = None
+        source = self.image.handler_source()
+        if source is not None:
+            module = types.ModuleType("handler")
+            exec(compile(source, HANDLER_DESTINATION, "exec"), module.__dict__)
+            main_handler = getattr(module, "main_handler", None)
+        if self._socket_path is not None:
+            if os.path.exists(self._socket_path):
+                os.remove(self._socket_path)
+            server = _UnixHTTPServer(self._socket_path, _RunnerRequestHandler)
+        else:
+            host_port = int(self._port_spec.get("8000", next(iter(self._port_spec.values()))))
+            server = ThreadingHTTPServer(("127.0.0.1", host_port), _RunnerRequestHandler)
+            server.daemon_threads = True
+        server.main_handler = main_handler
+        self._server = server
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    def start(self):
+        self.status = "running"
+        if len(self._port_spec) == 0 and self._socket_path is None:
+            return
+        # The app only answers once the simulated start delay has elapsed
+        self._start_timer = threading.Timer(self._backend.start_delay, self._serve)
+        self._start_timer.daemon = True
+        self._start_timer.start()
+
+    def stop(self):
+        if self._start_timer is not None:
+            self._start_timer.cancel()
+            self._start_timer.join()
+            self._start_timer = None
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+            if self._socket_path is not None and os.path.exists(self._socket_path):
+                os.remove(self._socket_path)
+        self.status = "exited"
+
+    def restart(self):
+        self.stop()
+        self.start()
+
+    def remove(self, force: bool = False):
+        if self.status == "running":
+            if not force:
+                raise RuntimeError(f"Cannot remove running container {self.name}, stop it first or use force")
+            self.stop()
+        self._backend._containers.pop(self.id, None)
+
+
+class FakeBackend(ContainerBackend):
+    def __init__(self, start_delay: float = None, build_delay: float = None):
+        if start_delay is None:
+            start_delay = float(os.environ.get("ZETA_FAKE_START_DELAY", 0))
+        if build_delay is None:
+            build_delay = float(os.environ.get("ZETA_FAKE_BUILD_DELAY", 0))
+        self.start_delay = start_delay
+        self.build_delay = build_delay
+        self._lock = threading.Lock()
+        self._networks = {}
+        self._images = {}
+        self._containers = {}
+
+    # Network Mangement =======================================================
+    def create_network(self, network_name: str):
+        with self._lock:
+            if network_name not in self._networks:
+                self._networks[network_name] = FakeNetwork(self, network_name)
+            return self._networks[network_name]
+
+    def list_networks(self, names: list = None) -> list:
+        with self._lock:
+            return [n for n in self._networks.values() if names is None or n.name in names]
+
+    # Image Management ========================================================
+    def list_images(self) -> list:
+        with self._lock:
+            return list(self._images.values())
+
+    def build_image(self, image_name: str, dockerfile_path: str):
+        files = {}
+        for name in os.listdir(dockerfile_path):
+            path = os.path.join(dockerfile_path, name)
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    files[name] = f.read()
+        if "Dockerfile" not in files:
+            raise RuntimeError(f"No Dockerfile found in {dockerfile_path}")
+        time.sleep(self.build_delay)
+        image = FakeImage(image_name, files)
+        with self._lock:
+            self._images[image.id] = image
+        return image
+
+    def get_image(self, image_name_or_id: str):
+        with self._lock:
+            for image in self._images.values():
+                if image_name_or_id in image.tags or image.id.startswith(image_name_or_id):
+                    return image
+        raise RuntimeError(f"No such image: {image_name_or_id}")
+
+    def remove_image(self, image_id: str, force: bool = False):
+        with self._lock:
+            if image_id not in self._images:
+                raise RuntimeError(f"No such image: {image_id}")
+            in_use = any(c.image.id == image_id for c in self._containers.values())
+            if in_use and not force:
+                raise RuntimeError(f"Image {image_id} is being used by a container")
+            del self._images[image_id]
+
+    def prune_images(self) -> int:
+        # Fake images are always tagged and don't share layers
+        return 0
+
+    # Container Management ====================================================
+    def list_containers(self, all: bool = False) -> list:
+        with self._lock:
+            return [c for c in self._containers.values() if all or c.status == "running"]
+
+    def get_container(self, container_name_or_id: str):
+        with self._lock:
+            for container in self._containers.values():
+                if container.name == container_name_or_id or container.id.startswith(container_name_or_id):
+                    return container
+        raise RuntimeError(f"No such container: {container_name_or_id}")
+
+    def run_container(
+        self,
+        image_id: str,
+        container_name: str,
+        ports: dict,
+        network: str,
+        volumes: dict,
+        environment: dict = None
+    ):
+        with self._lock:
+            image = self._images.get(image_id)
+            if image is None:
+                raise RuntimeError(f"No such image: {image_id}")
+            if any(c.name == container_name for c in self._containers.values()):
+                raise RuntimeError(f"Conflict. The container name '{container_name}' is already in use")
+            container = FakeContainer(self, container_name, image, ports, network, volumes, environment)
+            self._containers[container.id] = container
+        container.start()
+        return container
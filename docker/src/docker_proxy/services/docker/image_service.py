@@ -0,0 +1,170 @@
+"""
+Image management service, backed by the active container backend.
+"""
+from .backend import get_backend
+import logging
+logger = logging.getLogger(__name__)
+
+
+def list_images():
+    """
+    List all docker images images
+    """
+    return get_backend().list_images()
+
+
+def get_image_from_tag(image_tag: str):
+    """
+    Retrieve the image tagged `image_tag`
+
+    Attributes
+    ---
+    - image_tag: str
+    """
+    return list(filter(
+        lambda image: image_tag in image.tags,
+        list_images()
+    ))[0]
+
+
+def get_image_from_id(image_id: str):
+    """
+    Retrieve the image with id `image_id`
+
+    Attributes
+    ---
+    - image_id: str
+    """
+    return list(filter(
+        lambda image: (image.id == image_id) or (image.short_id in image_id),
+        list_images()
+    ))[0]
+
+
+def get_image(image_name_or_id: str):
+    """
+    Retrieve an image by name or id, without listing all the images
+
+    Attributes
+    ---
+    - image_name_or_id: str
+    """
+    return get_backend().get_image(image_name_or_id)
+
+
+def image_exists(image_name: str) -> bool:
+    """
+    Checks if an image is tagged `image_name`, with any tag version
+
+    Attributes
+    ---
+    - image_name: str
+    """
+    return is_tagged(image_name, get_image_tags())
+
+
+def get_image_tags() -> set:
+    """
+    Tags of all the images, from a single listing
+    """
+    return {tag for image in list_images() for tag in image.tags}
+
+
+def is_tagged(image_name: str, tags: set) -> bool:
+    """
+    Checks if one of `tags` is `image_name`, with any tag version
+
+    Attributes
+    ---
+    - image_name: str
+    - tags: set
+    """
+    return any(tag.rsplit(":", 1)[0] == image_name or tag == image_name for tag in tags)
+
+
+def get_images_from_prefix(prefix: str):
+    """
+    Return a list of images given a string prefix. The matching is done to the `image.tags` elements.
+
+    Attributes
+    ---
+    - prefix: str
+    """
+    found_images = []
+    for image in list_images():
+        for tag in image.tags:
+            if tag.startswith(prefix) and "base-runner" not in tag:
+                found_images.append(image)
+                break
+    return found_images
+
+
+def build_image(image_name: str, dockerfile_path: str):
+    """
+    Build an image of `image_name`, using the dockerfile specified at `dockerfile_path`
+
+    Attributes
+    ---
+    - image_name: str
+        The image name to be used
+    - dockerfile_path: str
+        Dockerfile to use for the build
+    """
+    try:
+        return get_backend().build_image(image_name, dockerfile_path)
+    except Exception:
+        raise Exception("Unable to build the image '" + image_name + "': " + dockerfile_path)
+
+
+def delete_images_from_prefix(prefix: str):
+    """
+    Delete the images prefixed with `prefix`
+
+    Attributes
+    ---
+    - prefix: str
+        Prefix to check the image tag on.
+
+    Return Value
+    ---
+    - removed_images: List
+    """
+    backend = get_backend()
+    removed_images = []
+    for image in backend.list_images():
+        for tag in image.tags:
+            if tag.startswith(prefix) and "base-runner" not in tag:
+                try:
+                    logger.info(f"Removing image: {tag}...")
+                    backend.remove_image(image.id)
+                except Exception:
+                    logger.info(f"Forcefully removing image: {tag}...")
+                    backend.remove_image(image.id, force=True)
+                finally:
+                    removed_images.append(image.id)
+                break
+    return removed_images
+
+
+def prune_images() -> int:
+    """
+    Remove the dangling images and layers, returns the reclaimed bytes
+    """
+    return get_backend().prune_images()
+
+
+def delete_image(image_id: str):
+    """
+    Delete the image with id `image_id`
+
+    Attributes
+    ---
+    - image_id: str
+    """
+    backend = get_backend()
+    try:
+        logger.info(f"Removing image: {image_id}...")
+        backend.remove_image(image_id)
+    except Exception:
+        logger.info(f"Forcefully removing image: {image_id}...")
+        backend.remove_image(image_id, force=True)
@@ -0,0 +1,42 @@
+"""
+Network management service, backed by the active container backend.
+"""
+from .backend import get_backend
+import logging
+logger = logging.getLogger(__name__)
+
+
+def create_network(network_name: str):
+    """
+    Create a bridge network named `network_name`
+
+    Attributes
+    ---
+    - network_name: str
+    """
+    return get_backend().create_network(network_name)
+
+
+def get_network(network_name: str):
+    """
+    Retrieve the network named `network_name`
+
+    Attributes
+    ---
+    - network_name: str
+    """
+    network_list = get_backend().list_networks(names=[network_name])
+    if len(network_list) == 0:
+        raise RuntimeError(f"Unable to find the network {network_name}")
+    return network_list[0]
+
+
+def does_network_exist(network_name: str) -> bool:
+    """
+    Checks if the network named `network_name` exists
+
+    Attributes
+    ---
+    - network_name: str
+    """
+    return len(get_backend().list_networks(names=[network_name])) > 0
@@ -0,0 +1,99 @@
+"""
+Coordination of the proxy worker processes (`fastapi run --workers N`), backed by file locks.
+
+- `exclusive(name)`: critical section shared by every worker (and thread)
+- `run_when_elected(name, target)`: run a background singleton in exactly one worker.
+  The other workers wait on the lock, one of them takes over if the elected worker dies.
+- `run_once_per_start(name, target)`: run a startup step in a single worker per proxy start.
+
+The locks are released by the kernel when their holder exits, even on a crash.
+"""
+from contextlib import contextmanager
+import multiprocessing
+import threading
+import logging
+import fcntl
+import os
+
+
+LOCK_DIR = os.path.join(os.getcwd(), "src/docker_proxy/tmp/locks")
+logger = logging.getLogger(__name__)
+
+
+def lock_path(name: str) -> str:
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    return os.path.join(LOCK_DIR, f"{name}.lock")
+
+
+@contextmanager
+def exclusive(name: str):
+    """
+    Hold the `name` lock for the enclosed block, waiting for it if needed.
+
+    Attributes
+    ---
+    - name: str
+    """
+    with open(lock_path(name), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def run_when_elected(name: str, target) -> threading.Thread:
+    """
+    Run `target` in a daemon thread once this worker holds the `name` lock.
+
+    Attributes
+    ---
+    - name: str
+    - target: callable
+        Background loop, expected to run forever. The lock is released if it returns or fails.
+    """
+    def campaign():
+        with exclusive(name):
+            logger.info(f"Worker {os.getpid()} elected to run '{name}'")
+            try:
+                target()
+            except Exception as e:
+                logger.error(f"Singleton '{name}' stopped: {e}")
+
+    thread = threading.Thread(target=campaign, name=f"zeta-{name}", daemon=True)
+    thread.start()
+    return thread
+
+
+def proxy_start_id() -> str:
+    """
+    Identifies the current proxy start: the pid of the process supervising the workers, or of the single worker.
+    """
+    parent = multiprocessing.parent_process()
+    return str(parent.pid if parent is not None else os.getpid())
+
+
+def run_once_per_start(name: str, target) -> bool:
+    """
+    Run `target` in the first worker to get there, once per proxy start. The other workers wait for it to be done.
+    Returns `False` if it already ran for this start.
+
+    Attributes
+    ---
+    - name: str
+    - target: callable
+        Startup step, run again by the next worker if it fails
+    """
+    start_id = proxy_start_id()
+    done_path = os.path.join(LOCK_DIR, f"{name}.done")
+    with exclusive(name):
+        try:
+            with open(done_path) as done_file:
+                if done_file.read() == start_id:
+                    return False
+        except FileNotFoundError:
+            pass
+        target()
+        with open(done_path, "w") as done_file:
+            done_file.write(start_id)
+    return True
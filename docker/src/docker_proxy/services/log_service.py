@@ -0,0 +1,93 @@
+"""
+Non-blocking logging setup, and sampled / truncated payload logging.
+
+Records are put on an in-memory queue by the logging call, and written by a background
+`QueueListener` thread: the request path never waits on a log write.
+
+Environment variables:
+- `ZETA_LOG_LEVEL`: root log level (default `INFO`)
+- `ZETA_LOG_LEVELS`: per-module levels, e.g. `services.zeta.pns_service=DEBUG,httpx=WARNING`
+- `ZETA_LOG_PAYLOAD_SAMPLE_RATE`: share of payloads (events, heartbeats...) that get logged (default `0.01`)
+- `ZETA_LOG_PAYLOAD_MAX_LENGTH`: logged payloads are truncated to this many characters (default `512`)
+"""
+from logging.handlers import QueueHandler, QueueListener
+import logging
+import reprlib
+import random
+import queue
+import os
+
+
+LOG_FORMAT = '%(asctime)s %(levelname)s [%(name)s.%(funcName)s:%(lineno)d] : %(message)s'
+LOG_DATE_FORMAT = '%m/%d/%Y %I:%M:%S %p'
+PAYLOAD_SAMPLE_RATE = float(os.environ.get("ZETA_LOG_PAYLOAD_SAMPLE_RATE", 0.01))
+PAYLOAD_MAX_LENGTH = int(os.environ.get("ZETA_LOG_PAYLOAD_MAX_LENGTH", 512))
+_payload_repr = reprlib.Repr()
+_payload_repr.maxstring = PAYLOAD_MAX_LENGTH
+_payload_repr.maxother = PAYLOAD_MAX_LENGTH
+_payload_repr.maxdict = 32
+_payload_repr.maxlist = 32
+
+
+def parse_module_levels(spec: str) -> dict:
+    """
+    Parse `module=LEVEL` pairs separated by commas.
+
+    Attributes
+    ---
+    - spec: str
+    """
+    levels = {}
+    for entry in spec.split(","):
+        if "=" not in entry:
+            continue
+        module, level = entry.split("=", 1)
+        levels[module.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging(filename: str, default_level: str = "INFO") -> QueueListener:
+    """
+    Route all log records through a queue to a file handler running in a background thread.
+    Returns the started listener, to be stopped on shutdown.
+
+    Attributes
+    ---
+    - filename: str
+        Log file to write to
+    - default_level: str
+        Root log level if `ZETA_LOG_LEVEL` isn't set
+    """
+    file_handler = logging.FileHandler(filename, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(LOG_FORMAT, datefmt=LOG_DATE_FORMAT))
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, file_handler, respect_handler_level=True)
+    root_logger = logging.getLogger()
+    for handler in list(root_logger.handlers):
+        root_logger.removeHandler(handler)
+    root_logger.addHandler(QueueHandler(log_queue))
+    root_logger.setLevel(os.environ.get("ZETA_LOG_LEVEL", default_level).upper())
+    for module, level in parse_module_levels(os.environ.get("ZETA_LOG_LEVELS", "")).items():
+        logging.getLogger(module).setLevel(level)
+    listener.start()
+    return listener
+
+
+def log_payload(logger: logging.Logger, message: str, payload, level: int = logging.INFO):
+    """
+    Log a sampled, size-truncated representation of `payload`.
+    Nothing is formatted unless the record is sampled and the level enabled.
+
+    Attributes
+    ---
+    - logger: logging.Logger
+    - message: str
+    - payload: Any
+    - level: int
+    """
+    if not logger.isEnabledFor(level) or random.random() >= PAYLOAD_SAMPLE_RATE:
+        return
+    text = _payload_repr.repr(payload)
+    if len(text) > PAYLOAD_MAX_LENGTH:
+        text = text[:PAYLOAD_MAX_LENGTH] + "...(truncated)"
+    logger.log(level, "%s: %s", message, text, stacklevel=2)
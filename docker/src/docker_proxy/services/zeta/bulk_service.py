@@ -0,0 +1,168 @@
+"""
+Bulk lifecycle operations over many zetas: delete, redeploy and prune.
+
+Items run in parallel on a pool of `ZETA_BULK_WORKERS` threads, each operation listing the containers
+(and images) once, up front, instead of once per item. Every item gets its own result:
+`{"name": str, "status": "ok" | "not_found" | "error", "error": str}`, in the order of the request.
+
+Environment variables:
+- `ZETA_BULK_WORKERS`: items processed in parallel (default `8`)
+"""
+from concurrent.futures import ThreadPoolExecutor
+from services.docker import image_service, container_service
+from . import zeta_metadata as meta
+from . import zeta_environment as zeta_env
+from . import zeta_service
+from . import runner_client
+from . import pns_service as pns
+import logging
+import os
+
+
+BULK_WORKERS = int(os.environ.get("ZETA_BULK_WORKERS", 8))
+RESULT_OK = "ok"
+RESULT_NOT_FOUND = "not_found"
+RESULT_ERROR = "error"
+# Containers being created or restarted are left alone
+STOPPED_STATES = ("exited", "dead")
+logger = logging.getLogger(__name__)
+
+
+class BulkItemNotFoundError(RuntimeError):
+    pass
+
+
+def run_bulk(names: list, operation, workers: int = BULK_WORKERS) -> list:
+    """
+    Run `operation(name)` for every name on a bounded thread pool, returns the per item results.
+
+    Attributes
+    ---
+    - names: list
+    - operation: Callable[[str], dict]
+        Returns extra fields of the item result, raises `BulkItemNotFoundError` for unknown items
+    - workers: int
+    """
+    def run_item(name: str) -> dict:
+        try:
+            return {"name": name, "status": RESULT_OK, **(operation(name) or {})}
+        except BulkItemNotFoundError as e:
+            return {"name": name, "status": RESULT_NOT_FOUND, "error": str(e)}
+        except Exception as e:
+            logger.error(f"Bulk operation failed on '{name}': {e}")
+            return {"name": name, "status": RESULT_ERROR, "error": str(e)}
+
+    if len(names) == 0:
+        return []
+    with ThreadPoolExecutor(max_workers=max(1, min(workers, len(names))), thread_name_prefix="zeta-bulk") as pool:
+        return list(pool.map(run_item, names))
+
+
+def summarize(results: list) -> dict:
+    """
+    Response of a bulk operation: the per item results, and their count per status.
+    """
+    counts = {RESULT_OK: 0, RESULT_NOT_FOUND: 0, RESULT_ERROR: 0}
+    for result in results:
+        counts[result["status"]] += 1
+    return {"results": results, "counts": counts}
+
+
+def delete_many(zeta_names: list) -> list:
+    """
+    Delete the zetas, from a single container listing.
+
+    Attributes
+    ---
+    - zeta_names: list
+    """
+    zetas = {zeta_meta["name"] for zeta_meta in meta.get_all_zeta_metadata()}
+    containers = container_service.get_containers_by_name()
+
+    def delete(zeta_name: str):
+        if zeta_name not in zetas:
+            raise BulkItemNotFoundError(f"Zeta function '{zeta_name}' not found")
+        zeta_service.delete_zeta(zeta_name, containers)
+
+    return run_bulk(list(dict.fromkeys(zeta_names)), delete)
+
+
+def exterminate_all_zeta():
+    """
+    Deletes all the zeta functions.
+    """
+    results = delete_many([zeta_meta["name"] for zeta_meta in meta.get_all_zeta_metadata()])
+    logger.info(f"Deleted {sum(1 for result in results if result['status'] == RESULT_OK)} zetas")
+
+
+def redeploy_many(handlers: dict, requirements: dict = {}) -> list:
+    """
+    Blue/green redeploy of the zetas, keeping their timeout, memory limit and idle timeout settings.
+    The containers and images are listed once for all the redeploys.
+
+    Attributes
+    ---
+    - handlers: dict
+        Handler source per zeta name
+    - requirements: dict
+        requirements.txt content per zeta name, for the zetas that have one
+    """
+    zetas = {zeta_meta["name"]: zeta_meta for zeta_meta in meta.get_all_zeta_metadata()}
+    existing_containers = set(container_service.get_containers_by_name())
+    existing_images = image_service.get_image_tags()
+
+    def redeploy(zeta_name: str) -> dict:
+        zeta_meta = zetas.get(zeta_name)
+        if zeta_meta is None:
+            raise BulkItemNotFoundError(f"Zeta function '{zeta_name}' not found")
+        redeployed = zeta_service.redeploy_runner(
+            zeta_name,
+            handlers[zeta_name],
+            timeout=zeta_meta.get("timeout_seconds"),
+            memory_limit_mb=zeta_meta.get("memory_limit_mb"),
+            idle_timeout=zeta_meta.get("idle_timeout_override"),
+            requirements_content=requirements.get(zeta_name),
+            existing_containers=existing_containers,
+            existing_images=existing_images
+        )
+        return {"redeployMs": redeployed.get("last_redeploy_ms")}
+
+    return run_bulk(list(handlers), redeploy)
+
+
+def prune_runners() -> tuple:
+    """
+    Remove, from a single container listing, the runner containers (on the zeta network) that are:
+    - Exited: their zeta, if any, cold starts a new runner on its next invocation
+    - Orphans: left over by deleted zetas
+
+    Runners being started, warmed by a redeploy or drained are left alone.
+    Then prune the dangling image layers. Returns `(results, reclaimed_bytes)`.
+    """
+    zetas = meta.get_all_zeta_metadata()
+    zeta_names = {zeta_meta["name"] for zeta_meta in zetas}
+    routed = {zeta_meta.get("runner_container_name") or zeta_meta["name"]: zeta_meta["name"] for zeta_meta in zetas}
+    containers = {
+        name: container for name, container in container_service.get_containers_by_name().items()
+        if zeta_env.GLOBAL_NETWORK_NAME in container.attrs.get("NetworkSettings", {}).get("Networks", {})
+    }
+    prunable = [
+        name for name, container in containers.items()
+        if container.status in STOPPED_STATES or zeta_service.runner_owner(name, zeta_names) is None
+    ]
+
+    def prune(container_name: str):
+        container_service.discard_container(containers[container_name])
+        runner_client.close_runner_client(container_name)
+        container_service.remove_runner_socket_dir(container_name)
+        pns.release_runner_ports(container_name)
+        if container_name in routed:
+            meta.delete_zeta_container_metadata(routed[container_name])
+
+    results = run_bulk(prunable, prune)
+    try:
+        reclaimed_bytes = image_service.prune_images()
+    except Exception as e:
+        logger.warning(f"Unable to prune the dangling images: {e}")
+        reclaimed_bytes = 0
+    return results, reclaimed_bytes
@@ -0,0 +1,112 @@
+"""
+Response compression of the proxy, negotiated on the client `Accept-Encoding` header: `zstd` (preferred) or `gzip`.
+`zstd` is only offered when the `zstandard` package is installed.
+
+Invocation responses already compressed by the runner (which negotiated on the same header, forwarded by the proxy)
+are passed through as is, without being decompressed nor compressed again.
+
+Environment variables:
+- `ZETA_COMPRESSION_MIN_SIZE`: bodies smaller than this many bytes are sent as is (default `1024`),
+  compressing them costs more than it saves
+"""
+from fastapi import Response
+import gzip
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MIN_SIZE = int(os.environ.get("ZETA_COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# In order of preference, at equal quality
+ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict:
+    """
+    Quality value of each coding of an `Accept-Encoding` header, e.g. `gzip;q=0.8, zstd` -> `{"gzip": 0.8, "zstd": 1.0}`
+    """
+    qualities = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = entry.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate(accept_encoding: str, size: int) -> str:
+    """
+    Encoding to compress a body of `size` bytes with, `None` to send it as is.
+
+    Attributes
+    ---
+    - accept_encoding: str
+        The client `Accept-Encoding` header
+    - size: int
+        Size of the body, in bytes
+    """
+    if not accept_encoding or size < MIN_SIZE:
+        return None
+    qualities = parse_accept_encoding(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+    if encoding == "gzip":
+        return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding '{encoding}'")
+
+
+def encode_response(
+    content: bytes,
+    media_type: str,
+    accept_encoding: str,
+    content_encoding: str = None,
+    headers: dict = None
+) -> Response:
+    """
+    Build a response compressed as negotiated with the client.
+    Compresses, so call it from a worker thread.
+
+    Attributes
+    ---
+    - content: bytes
+    - media_type: str
+    - accept_encoding: str
+        The client `Accept-Encoding` header
+    - content_encoding: str
+        Encoding `content` is already compressed with (by the runner), passed through as is
+    - headers: dict
+    """
+    headers = dict(headers or {})
+    if content_encoding is None:
+        content_encoding = negotiate(accept_encoding, len(content))
+        if content_encoding is not None:
+            content = compress(content, content_encoding)
+    if content_encoding is not None:
+        headers["content-encoding"] = content_encoding
+        # The compressed representation is not byte for byte the one the ETag was computed on
+        if headers.get("ETag", "").startswith('"'):
+            headers["ETag"] = "W/" + headers["ETag"]
+    headers["vary"] = "Accept-Encoding"
+    return Response(content=content, media_type=media_type, headers=headers)
@@ -0,0 +1,1245 @@
+"""
+SQLite storage for the zeta metadata.
+
+Tables:
+- `zeta_runner_image`: runner images built for the zetas
+- `zeta_function`: deployed zeta functions
+- `zeta_runner_container`: runner container of a zeta (1 container per zeta as of now)
+- `zeta_usage`: resource usage of the zeta invocations, aggregated per zeta
+- `zeta_port_reservation`: host ports reserved for the runner containers (the PNS), until they are removed
+- `zeta_inflight`: invocations being proxied, counted per runner container and per proxy worker process
+- `zeta_invocation_history`: invocation counts of the zetas, per time bucket
+- `zeta_prewarm`: predictive pre-warming outcomes, per zeta
+- `zeta_interarrival`: histogram of the times between two invocations of a zeta
+- `zeta_image_version`: runner images built for the zetas, kept for rollback until garbage collected
+- `zeta_image_gc`: runner image garbage collection totals (single row)
+- `zeta_reconciliation`: outcome of the runner reconciliation at the proxy starts (single row)
+- `zeta_invocation`: asynchronous invocations, the queue and the results store
+- `zeta_metadata_version`: change counters of the listed metadata (single row), bumped by triggers:
+  `structure` for the deployments and runner containers, `activity` for the traffic driven fields.
+  The in-flight invocations only bump `activity` when a runner container goes busy or idle,
+  the count of a busy one is not tracked by the version
+
+Concurrency:
+- The database runs in WAL mode, readers don't block the heartbeat / usage writers and vice versa
+- Each thread keeps its own connection (and its own prepared statement cache), opened on first use
+- Heartbeats, usage records and invocation counts are buffered in memory and written in one transaction
+  every `ZETA_DB_WRITE_BATCH_INTERVAL` seconds (default 1, `0` writes through).
+- So are the in-flight invocation counts, but the first in-flight invocation of a runner container in a worker
+  is written right away: the other workers never see a busy runner idle, only an idle one busy for a little longer.
+  Call `flush_pending_writes` before reading them when freshness matters.
+"""
+import threading
+import logging
+import sqlite3
+import bisect
+import time
+import os
+
+
+DB_PATH = os.path.join(os.getcwd(), "zeta_metadata.db")
+BUSY_TIMEOUT = 5
+CACHED_STATEMENTS = 256
+WRITE_BATCH_INTERVAL = float(os.environ.get("ZETA_DB_WRITE_BATCH_INTERVAL", 1.0))
+# Upper bound of the container id prefixes, for index friendly prefix lookups
+PREFIX_UPPER_BOUND = "\U0010ffff"
+HEARTBEAT_UPDATE = """
+    UPDATE zeta_runner_container SET last_heartbeat = ?
+    WHERE container_id >= ? AND container_id < ?
+"""
+USAGE_UPSERT = """
+    INSERT INTO zeta_usage (
+        function_name, invocations, total_wall_time_ms, total_cpu_time_ms, max_wall_time_ms,
+        max_peak_rss_delta_kb, last_wall_time_ms, last_cpu_time_ms, last_peak_rss_delta_kb
+    )
+    SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7, ?8, ?9
+    WHERE EXISTS (SELECT 1 FROM zeta_function WHERE name = ?1)
+    ON CONFLICT (function_name) DO UPDATE SET
+        invocations = invocations + excluded.invocations,
+        total_wall_time_ms = total_wall_time_ms + excluded.total_wall_time_ms,
+        total_cpu_time_ms = total_cpu_time_ms + excluded.total_cpu_time_ms,
+        max_wall_time_ms = MAX(max_wall_time_ms, excluded.max_wall_time_ms),
+        max_peak_rss_delta_kb = MAX(max_peak_rss_delta_kb, excluded.max_peak_rss_delta_kb),
+        last_wall_time_ms = excluded.last_wall_time_ms,
+        last_cpu_time_ms = excluded.last_cpu_time_ms,
+        last_peak_rss_delta_kb = excluded.last_peak_rss_delta_kb
+"""
+# Upper bounds (seconds) of the inter-arrival histogram buckets, the last bucket is unbounded
+INTERARRIVAL_BUCKET_EDGES = (
+    1, 2, 5, 10, 15, 20, 30, 45, 60, 90, 120, 180, 300, 600, 900, 1800, 3600, 7200, 21600, 86400
+)
+# The histograms are halved past this many inter-arrivals, so they follow the traffic changes
+INTERARRIVAL_MAX_COUNT = 1000
+# Invocation timestamps buffered per zeta between two flushes
+MAX_PENDING_ARRIVALS = 1024
+INVOCATION_HISTORY_UPSERT = """
+    INSERT INTO zeta_invocation_history (function_name, bucket, count)
+    SELECT ?1, ?2, ?3
+    WHERE EXISTS (SELECT 1 FROM zeta_function WHERE name = ?1)
+    ON CONFLICT (function_name, bucket) DO UPDATE SET count = count + excluded.count
+"""
+INFLIGHT_UPSERT = """
+    INSERT INTO zeta_inflight (container_name, worker_pid, count) VALUES (?, ?, ?)
+    ON CONFLICT (container_name, worker_pid) DO UPDATE SET count = excluded.count
+"""
+ZETA_FUNCTION_SELECT = """
+    SELECT
+        f.name AS name,
+        f.created_at AS created_at,
+        f.runner_image_id AS runner_image_id,
+        f.timeout_seconds AS timeout_seconds,
+        f.memory_limit_mb AS memory_limit_mb,
+        f.deployed_at AS deployed_at,
+        f.last_redeploy_ms AS last_redeploy_ms,
+        f.last_switch_over_ms AS last_switch_over_ms,
+        f.idle_timeout_override AS idle_timeout_override,
+        f.idle_timeout_seconds AS idle_timeout_seconds,
+        f.avg_cold_start_ms AS avg_cold_start_ms,
+        f.last_invocation_at AS last_invocation_at,
+        i.tag AS runner_image_tag,
+        c.container_id AS runner_container_id,
+        c.container_name AS runner_container_name,
+        c.host_ip AS runner_container_host_ip,
+        c.host_port AS runner_container_host_port,
+        c.socket_path AS runner_container_socket_path,
+        c.last_heartbeat AS runner_container_last_heartbeat,
+        c.prewarmed_at AS runner_container_prewarmed_at,
+        c.first_invocation_at AS runner_container_first_invocation_at,
+        COALESCE(u.invocations, 0) AS usage_invocations,
+        u.total_wall_time_ms / u.invocations AS usage_avg_wall_time_ms,
+        u.total_cpu_time_ms / u.invocations AS usage_avg_cpu_time_ms,
+        u.max_wall_time_ms AS usage_max_wall_time_ms,
+        u.max_peak_rss_delta_kb AS usage_max_peak_rss_delta_kb,
+        u.last_wall_time_ms AS usage_last_wall_time_ms,
+        u.last_cpu_time_ms AS usage_last_cpu_time_ms,
+        u.last_peak_rss_delta_kb AS usage_last_peak_rss_delta_kb,
+        (
+            SELECT COALESCE(SUM(inflight.count), 0) FROM zeta_inflight inflight
+            WHERE inflight.container_name = c.container_name
+        ) AS inflight_invocations,
+        CASE
+            WHEN c.container_id IS NULL THEN 'cold'
+            WHEN EXISTS (
+                SELECT 1 FROM zeta_inflight inflight
+                WHERE inflight.container_name = c.container_name AND inflight.count > 0
+            ) THEN 'busy'
+            ELSE 'warm'
+        END AS state,
+        COALESCE(p.prewarm_starts, 0) AS prewarm_starts,
+        COALESCE(p.prewarm_hits, 0) AS prewarm_hits,
+        COALESCE(p.cold_starts, 0) AS prewarm_cold_starts,
+        COALESCE(p.wasted_warm_seconds, 0) AS prewarm_wasted_warm_seconds,
+        CAST(p.prewarm_hits AS REAL) / NULLIF(p.prewarm_hits + p.cold_starts, 0) AS prewarm_cold_start_avoidance
+    FROM zeta_function f
+    LEFT JOIN zeta_runner_image i ON i.image_id = f.runner_image_id
+    LEFT JOIN zeta_runner_container c ON c.function_name = f.name
+    LEFT JOIN zeta_usage u ON u.function_name = f.name
+    LEFT JOIN zeta_prewarm p ON p.function_name = f.name
+"""
+ZETA_STATES = ("cold", "warm", "busy")
+# Listed fields changing with the traffic, they only change the `activity` metadata version
+ACTIVITY_FIELDS = frozenset({
+    "idle_timeout_seconds", "avg_cold_start_ms", "last_invocation_at",
+    "runner_container_last_heartbeat", "runner_container_first_invocation_at",
+    "usage_invocations", "usage_avg_wall_time_ms", "usage_avg_cpu_time_ms", "usage_max_wall_time_ms",
+    "usage_max_peak_rss_delta_kb", "usage_last_wall_time_ms", "usage_last_cpu_time_ms", "usage_last_peak_rss_delta_kb",
+    "inflight_invocations", "state",
+    "prewarm_starts", "prewarm_hits", "prewarm_cold_starts", "prewarm_wasted_warm_seconds",
+    "prewarm_cold_start_avoidance",
+})
+# Metadata version triggers: (table, event, counter, condition)
+VERSION_TRIGGERS = (
+    ("zeta_function", "INSERT", "structure", None),
+    ("zeta_function", "DELETE", "structure", None),
+    ("zeta_function", """UPDATE OF name, created_at, runner_image_id, runner_container_id, timeout_seconds,
+        memory_limit_mb, deployed_at, last_redeploy_ms, last_switch_over_ms, idle_timeout_override""", "structure", None),
+    ("zeta_function", "UPDATE OF idle_timeout_seconds, avg_cold_start_ms, last_invocation_at", "activity", None),
+    ("zeta_runner_image", "INSERT", "structure", None),
+    ("zeta_runner_image", "DELETE", "structure", None),
+    ("zeta_runner_image", "UPDATE", "structure", None),
+    ("zeta_runner_container", "INSERT", "structure", None),
+    ("zeta_runner_container", "DELETE", "structure", None),
+    ("zeta_runner_container", """UPDATE OF function_name, container_name, container_id, host_ip, host_port,
+        socket_path, prewarmed_at""", "structure", None),
+    ("zeta_runner_container", "UPDATE OF last_heartbeat, first_invocation_at", "activity", None),
+    ("zeta_usage", "INSERT", "activity", None),
+    ("zeta_usage", "UPDATE", "activity", None),
+    ("zeta_usage", "DELETE", "activity", None),
+    # Only the busy / idle transitions of the runner containers, not every in-flight count change
+    ("zeta_inflight", "INSERT", "activity", """
+        (SELECT COUNT(*) FROM zeta_inflight WHERE container_name = NEW.container_name) = 1"""),
+    ("zeta_inflight", "DELETE", "activity", """
+        NOT EXISTS (SELECT 1 FROM zeta_inflight WHERE container_name = OLD.container_name)"""),
+    ("zeta_prewarm", "INSERT", "activity", None),
+    ("zeta_prewarm", "UPDATE", "activity", None),
+    ("zeta_prewarm", "DELETE", "activity", None),
+)
+logger = logging.getLogger(__name__)
+_local = threading.local()
+_zeta_function_fields = None
+_pending_lock = threading.Lock()
+_pending_heartbeats = {}
+_pending_usage = {}
+_pending_invocations = {}
+_pending_arrivals = {}
+# In-flight invocations of this worker, and as last written: (container_name, worker_pid) -> count
+_inflight_lock = threading.Lock()
+_inflight_counts = {}
+_flushed_inflight = {}
+_flusher = None
+
+
+def get_connection():
+    """
+    Returns the connection of the current thread, opening it on first use.
+    Use it as a context manager to commit (or rollback) a transaction, never close it.
+    """
+    connection = getattr(_local, "connection", None)
+    if connection is None or _local.path != DB_PATH:
+        connection = sqlite3.connect(DB_PATH, timeout=BUSY_TIMEOUT, cached_statements=CACHED_STATEMENTS)
+        connection.row_factory = sqlite3.Row
+        connection.execute("PRAGMA journal_mode = WAL")
+        # Durable enough in WAL mode, the metadata can be rebuilt from the docker state
+        connection.execute("PRAGMA synchronous = NORMAL")
+        connection.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT * 1000}")
+        _local.connection, _local.path = connection, DB_PATH
+    return connection
+
+
+def initialize_db():
+    """
+    Create the metadata tables if they don't exist.
+    """
+    with get_connection() as connection:
+        # In-flight counters used to be kept per zeta, they are transient: recreate the table
+        inflight_columns = {row["name"] for row in connection.execute("PRAGMA table_info(zeta_inflight)")}
+        if inflight_columns and "container_name" not in inflight_columns:
+            connection.execute("DROP TABLE zeta_inflight")
+        connection.executescript("""
+            CREATE TABLE IF NOT EXISTS zeta_runner_image (
+                image_id TEXT PRIMARY KEY,
+                tag TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS zeta_function (
+                name TEXT PRIMARY KEY,
+                created_at REAL NOT NULL,
+                runner_image_id TEXT,
+                runner_container_id TEXT,
+                timeout_seconds REAL,
+                memory_limit_mb INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS zeta_runner_container (
+                function_name TEXT PRIMARY KEY,
+                container_name TEXT NOT NULL,
+                container_id TEXT NOT NULL,
+                host_ip TEXT,
+                host_port TEXT,
+                last_heartbeat REAL
+            );
+            CREATE TABLE IF NOT EXISTS zeta_usage (
+                function_name TEXT PRIMARY KEY,
+                invocations INTEGER NOT NULL,
+                total_wall_time_ms REAL NOT NULL,
+                total_cpu_time_ms REAL NOT NULL,
+                max_wall_time_ms REAL NOT NULL,
+                max_peak_rss_delta_kb INTEGER NOT NULL,
+                last_wall_time_ms REAL,
+                last_cpu_time_ms REAL,
+                last_peak_rss_delta_kb INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS zeta_port_reservation (
+                port INTEGER PRIMARY KEY,
+                function_name TEXT NOT NULL,
+                container_name TEXT
+            );
+            CREATE TABLE IF NOT EXISTS zeta_inflight (
+                container_name TEXT NOT NULL,
+                worker_pid INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (container_name, worker_pid)
+            );
+            CREATE TABLE IF NOT EXISTS zeta_invocation_history (
+                function_name TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count INTEGER NOT NULL,
+                PRIMARY KEY (function_name, bucket)
+            );
+            CREATE TABLE IF NOT EXISTS zeta_prewarm (
+                function_name TEXT PRIMARY KEY,
+                prewarm_starts INTEGER NOT NULL DEFAULT 0,
+                prewarm_hits INTEGER NOT NULL DEFAULT 0,
+                cold_starts INTEGER NOT NULL DEFAULT 0,
+                wasted_warm_seconds REAL NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS zeta_interarrival (
+                function_name TEXT NOT NULL,
+                bucket INTEGER NOT NULL,
+                count REAL NOT NULL,
+                PRIMARY KEY (function_name, bucket)
+            );
+            CREATE TABLE IF NOT EXISTS zeta_image_version (
+                image_id TEXT PRIMARY KEY,
+                function_name TEXT NOT NULL,
+                tag TEXT NOT NULL,
+                size_bytes INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                retired INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS zeta_image_gc (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                runs INTEGER NOT NULL DEFAULT 0,
+                removed_images INTEGER NOT NULL DEFAULT 0,
+                reclaimed_bytes INTEGER NOT NULL DEFAULT 0,
+                last_run_at REAL,
+                last_removed_images INTEGER,
+                last_reclaimed_bytes INTEGER
+            );
+            INSERT OR IGNORE INTO zeta_image_gc (id) VALUES (1);
+            CREATE TABLE IF NOT EXISTS zeta_reconciliation (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                runs INTEGER NOT NULL DEFAULT 0,
+                kept_runners INTEGER NOT NULL DEFAULT 0,
+                reaped_runners INTEGER NOT NULL DEFAULT 0,
+                last_run_at REAL,
+                last_duration_ms REAL,
+                last_kept_runners INTEGER,
+                last_reaped_runners INTEGER,
+                last_failed_reaps INTEGER
+            );
+            INSERT OR IGNORE INTO zeta_reconciliation (id) VALUES (1);
+            CREATE TABLE IF NOT EXISTS zeta_metadata_version (
+                id INTEGER PRIMARY KEY CHECK (id = 1),
+                structure INTEGER NOT NULL DEFAULT 0,
+                activity INTEGER NOT NULL DEFAULT 0
+            );
+            INSERT OR IGNORE INTO zeta_metadata_version (id) VALUES (1);
+            CREATE TABLE IF NOT EXISTS zeta_invocation (
+                id TEXT PRIMARY KEY,
+                function_name TEXT NOT NULL,
+                params BLOB NOT NULL,
+                status TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                worker_pid INTEGER,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                result BLOB,
+                content_type TEXT,
+                error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS zeta_invocation_status_created_at_idx
+                ON zeta_invocation (status, created_at);
+            CREATE INDEX IF NOT EXISTS zeta_invocation_finished_at_idx
+                ON zeta_invocation (finished_at);
+            CREATE INDEX IF NOT EXISTS zeta_image_version_function_name_idx
+                ON zeta_image_version (function_name);
+            CREATE INDEX IF NOT EXISTS zeta_port_reservation_function_name_idx
+                ON zeta_port_reservation (function_name);
+            CREATE INDEX IF NOT EXISTS zeta_runner_container_container_id_idx
+                ON zeta_runner_container (container_id);
+            CREATE INDEX IF NOT EXISTS zeta_runner_container_container_name_idx
+                ON zeta_runner_container (container_name);
+        """)
+        # Columns added after the table creation
+        add_missing_columns(connection, "zeta_function", {
+            "timeout_seconds": "REAL",
+            "memory_limit_mb": "INTEGER",
+            "deployed_at": "REAL",
+            "last_redeploy_ms": "REAL",
+            "last_switch_over_ms": "REAL",
+            "idle_timeout_override": "REAL",
+            "idle_timeout_seconds": "REAL",
+            "avg_cold_start_ms": "REAL",
+            "last_invocation_at": "REAL",
+        })
+        add_missing_columns(connection, "zeta_runner_container", {
+            "socket_path": "TEXT",
+            "prewarmed_at": "REAL",
+            "first_invocation_at": "REAL",
+        })
+        # Reservations made before they were owned by a runner container belong to the routed one
+        add_missing_columns(connection, "zeta_port_reservation", {"container_name": "TEXT"})
+        connection.execute("""
+            UPDATE zeta_port_reservation SET container_name = (
+                SELECT c.container_name FROM zeta_runner_container c
+                WHERE c.function_name = zeta_port_reservation.function_name
+            )
+            WHERE container_name IS NULL
+        """)
+        connection.execute("""
+            CREATE INDEX IF NOT EXISTS zeta_port_reservation_container_name_idx
+                ON zeta_port_reservation (container_name)
+        """)
+        # Recreate the version triggers, their definitions change across versions
+        for row in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE '%\\_version' ESCAPE '\\'"
+        ).fetchall():
+            connection.execute(f"DROP TRIGGER {row['name']}")
+        for table, event, counter, condition in VERSION_TRIGGERS:
+            trigger = f"{table}_{event.split()[0].lower()}_{counter}_version"
+            when = f"WHEN {condition}" if condition else ""
+            connection.execute(f"""
+                CREATE TRIGGER {trigger} AFTER {event} ON {table} {when}
+                BEGIN
+                    UPDATE zeta_metadata_version SET {counter} = {counter} + 1 WHERE id = 1;
+                END
+            """)
+    start_write_flusher()
+
+
+def add_missing_columns(connection, table: str, columns: dict):
+    existing = {row["name"] for row in connection.execute(f"PRAGMA table_info({table})")}
+    for column, column_type in columns.items():
+        if column not in existing:
+            connection.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+
+
+# Insert ======================================================================
+def insert_zeta_runner_image(image_id: str, tag: str):
+    with get_connection() as connection:
+        connection.execute(
+            "INSERT OR REPLACE INTO zeta_runner_image (image_id, tag) VALUES (?, ?)",
+            (image_id, tag)
+        )
+
+
+def insert_zeta_function(
+    name: str,
+    created_at: float,
+    runner_image_id: str,
+    runner_container_id: str = None,
+    timeout_seconds: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout_override: float = None
+):
+    with get_connection() as connection:
+        connection.execute(
+            """
+            INSERT INTO zeta_function (
+                name, created_at, deployed_at, runner_image_id, runner_container_id,
+                timeout_seconds, memory_limit_mb, idle_timeout_override
+            )
+            VALUES (?1, ?2, ?2, ?3, ?4, ?5, ?6, ?7)
+            """,
+            (name, created_at, runner_image_id, runner_container_id, timeout_seconds, memory_limit_mb,
+             idle_timeout_override)
+        )
+
+
+def insert_zeta_runner_container(
+    function_name: str,
+    container_name: str,
+    container_id: str,
+    host_ip: str,
+    host_port: str,
+    socket_path: str = None,
+    prewarmed_at: float = None
+):
+    """
+    A pre-warmed runner counts its start as its first heartbeat, so it idles out if no invocation comes.
+    """
+    with get_connection() as connection:
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO zeta_runner_container (
+                function_name, container_name, container_id, host_ip, host_port, socket_path,
+                last_heartbeat, prewarmed_at, first_invocation_at
+            )
+            VALUES (?1, ?2, ?3, ?4, ?5, ?6, ?7, ?7, NULL)
+            """,
+            (function_name, container_name, container_id, host_ip, host_port, socket_path, prewarmed_at)
+        )
+        connection.execute(
+            "UPDATE zeta_function SET runner_container_id = ? WHERE name = ?",
+            (container_id, function_name)
+        )
+
+
+def insert_zeta_image_version(
+    image_id: str,
+    function_name: str,
+    tag: str,
+    size_bytes: int,
+    created_at: float,
+    retired: bool = False
+):
+    with get_connection() as connection:
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO zeta_image_version (image_id, function_name, tag, size_bytes, created_at, retired)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (image_id, function_name, tag, size_bytes, created_at, int(retired))
+        )
+
+
+def insert_zeta_invocation(
+    invocation_id: str,
+    function_name: str,
+    params: bytes,
+    created_at: float,
+    max_queued: int
+) -> bool:
+    """
+    Queue an invocation. Returns `False` if `max_queued` invocations are already queued.
+    """
+    with get_connection() as connection:
+        cursor = connection.execute(
+            """
+            INSERT INTO zeta_invocation (id, function_name, params, status, created_at)
+            SELECT ?, ?, ?, 'queued', ?
+            WHERE (SELECT COUNT(*) FROM zeta_invocation WHERE status = 'queued') < ?
+            """,
+            (invocation_id, function_name, params, created_at, max_queued)
+        )
+    return cursor.rowcount == 1
+
+
+def insert_zeta_port_reservation(port: int, function_name: str, container_name: str) -> bool:
+    """
+    Reserve `port` for a runner container of the zeta, replacing the previous reservation of that container:
+    the other runners of the zeta (draining after a redeploy) keep theirs.
+    Returns `False` if the port is already reserved, by any proxy worker.
+    """
+    try:
+        with get_connection() as connection:
+            connection.execute("DELETE FROM zeta_port_reservation WHERE container_name = ?", (container_name,))
+            connection.execute(
+                "INSERT INTO zeta_port_reservation (port, function_name, container_name) VALUES (?, ?, ?)",
+                (port, function_name, container_name)
+            )
+    except sqlite3.IntegrityError:
+        return False
+    return True
+
+
+# Fetch =======================================================================
+def fetch_all_zeta_functions() -> list:
+    with get_connection() as connection:
+        rows = connection.execute(ZETA_FUNCTION_SELECT).fetchall()
+    return [dict(row) for row in rows]
+
+
+def zeta_function_fields() -> tuple:
+    """
+    Fields of the zeta metadata, as listed by `fetch_all_zeta_functions`.
+    """
+    global _zeta_function_fields
+    if _zeta_function_fields is None:
+        with get_connection() as connection:
+            cursor = connection.execute(ZETA_FUNCTION_SELECT + " LIMIT 0")
+            _zeta_function_fields = tuple(column[0] for column in cursor.description)
+    return _zeta_function_fields
+
+
+def fetch_zeta_functions_page(
+    fields: list = None,
+    after: str = None,
+    limit: int = None,
+    name_prefix: str = None,
+    states: list = None
+) -> list:
+    """
+    Returns the metadata of the zetas ordered by name, filtered and projected.
+
+    Attributes
+    ---
+    - fields: list
+        Fields to return, from `zeta_function_fields()`, all of them if not specified. `name` is always returned.
+    - after: str
+        Only the zetas named after it, the name of the last zeta of the previous page
+    - limit: int
+    - name_prefix: str
+    - states: list
+        Only the zetas in one of these states, from `ZETA_STATES`
+    """
+    columns = "*" if not fields else ", ".join(["name"] + [field for field in fields if field != "name"])
+    conditions, params = [], []
+    if after is not None:
+        conditions.append("name > ?")
+        params.append(after)
+    if name_prefix:
+        conditions.append("name >= ? AND name < ?")
+        params += [name_prefix, name_prefix + PREFIX_UPPER_BOUND]
+    if states:
+        conditions.append(f"state IN ({', '.join('?' * len(states))})")
+        params += states
+    query = f"SELECT {columns} FROM ({ZETA_FUNCTION_SELECT}) AS zeta"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY name"
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(limit)
+    with get_connection() as connection:
+        rows = connection.execute(query, params).fetchall()
+    return [dict(row) for row in rows]
+
+
+def fetch_zeta_metadata_version() -> tuple:
+    """
+    Returns the `(structure, activity)` metadata change counters.
+    """
+    with get_connection() as connection:
+        row = connection.execute("SELECT structure, activity FROM zeta_metadata_version WHERE id = 1").fetchone()
+    return row["structure"], row["activity"]
+
+
+def fetch_zeta_function_by_name(name: str) -> dict:
+    with get_connection() as connection:
+        row = connection.execute(ZETA_FUNCTION_SELECT + " WHERE f.name = ?", (name,)).fetchone()
+    return {} if row is None else dict(row)
+
+
+def fetch_zeta_port_reservations() -> dict:
+    with get_connection() as connection:
+        rows = connection.execute("SELECT port, function_name FROM zeta_port_reservation").fetchall()
+    return {row["port"]: row["function_name"] for row in rows}
+
+
+def fetch_zeta_port_reservation_containers() -> dict:
+    """
+    Returns the runner container name per reserved port.
+    """
+    with get_connection() as connection:
+        rows = connection.execute("SELECT port, container_name FROM zeta_port_reservation").fetchall()
+    return {row["port"]: row["container_name"] for row in rows}
+
+
+def fetch_zeta_invocation_history(function_name: str, since_bucket: int) -> dict:
+    """
+    Returns the invocation counts of the zeta per bucket, from `since_bucket` on.
+    """
+    with get_connection() as connection:
+        rows = connection.execute(
+            "SELECT bucket, count FROM zeta_invocation_history WHERE function_name = ? AND bucket >= ?",
+            (function_name, since_bucket)
+        ).fetchall()
+    return {row["bucket"]: row["count"] for row in rows}
+
+
+def fetch_zeta_interarrival(function_name: str) -> dict:
+    """
+    Returns the inter-arrival histogram of the zeta: count per bucket of `INTERARRIVAL_BUCKET_EDGES`.
+    """
+    with get_connection() as connection:
+        rows = connection.execute(
+            "SELECT bucket, count FROM zeta_interarrival WHERE function_name = ?",
+            (function_name,)
+        ).fetchall()
+    return {row["bucket"]: row["count"] for row in rows}
+
+
+def fetch_zeta_image_versions() -> list:
+    """
+    Returns the runner image versions, newest first, with `current` set on the ones the zetas are routed to.
+    """
+    with get_connection() as connection:
+        rows = connection.execute(
+            """
+            SELECT
+                v.image_id, v.function_name, v.tag, v.size_bytes, v.created_at, v.retired,
+                EXISTS (SELECT 1 FROM zeta_function f WHERE f.runner_image_id = v.image_id) AS current
+            FROM zeta_image_version v
+            ORDER BY v.created_at DESC
+            """
+        ).fetchall()
+    return [dict(row) for row in rows]
+
+
+def fetch_zeta_image_gc_stats() -> dict:
+    with get_connection() as connection:
+        row = connection.execute(
+            """
+            SELECT
+                runs, removed_images, reclaimed_bytes, last_run_at, last_removed_images, last_reclaimed_bytes,
+                (SELECT COUNT(*) FROM zeta_image_version) AS tracked_images,
+                (SELECT COALESCE(SUM(size_bytes), 0) FROM zeta_image_version) AS tracked_bytes
+            FROM zeta_image_gc WHERE id = 1
+            """
+        ).fetchone()
+    return {} if row is None else dict(row)
+
+
+def fetch_zeta_reconciliation_stats() -> dict:
+    with get_connection() as connection:
+        row = connection.execute(
+            """
+            SELECT
+                runs, kept_runners, reaped_runners, last_run_at, last_duration_ms,
+                last_kept_runners, last_reaped_runners, last_failed_reaps
+            FROM zeta_reconciliation WHERE id = 1
+            """
+        ).fetchone()
+    return {} if row is None else dict(row)
+
+
+def fetch_zeta_invocation(invocation_id: str) -> dict:
+    with get_connection() as connection:
+        row = connection.execute(
+            """
+            SELECT id, function_name, status, created_at, started_at, finished_at, attempts, result, content_type, error
+            FROM zeta_invocation WHERE id = ?
+            """,
+            (invocation_id,)
+        ).fetchone()
+    return {} if row is None else dict(row)
+
+
+def fetch_zeta_invocation_worker_pids() -> list:
+    """
+    Pids of the proxy workers running asynchronous invocations.
+    """
+    with get_connection() as connection:
+        rows = connection.execute(
+            "SELECT DISTINCT worker_pid FROM zeta_invocation WHERE status = 'running'"
+        ).fetchall()
+    return [row["worker_pid"] for row in rows]
+
+
+def fetch_zeta_inflight_count(container_name: str) -> int:
+    with get_connection() as connection:
+        row = connection.execute(
+            "SELECT COALESCE(SUM(count), 0) AS count FROM zeta_inflight WHERE container_name = ?",
+            (container_name,)
+        ).fetchone()
+    return row["count"]
+
+
+def fetch_zeta_inflight_worker_pids() -> list:
+    with get_connection() as connection:
+        rows = connection.execute("SELECT DISTINCT worker_pid FROM zeta_inflight").fetchall()
+    return [row["worker_pid"] for row in rows]
+
+
+# Update ======================================================================
+def update_zeta_runner_container_heartbeat(container_id: str, timestamp: float):
+    """
+    `container_id` can be the full id, or its short version (the runner container hostname)
+    """
+    if WRITE_BATCH_INTERVAL <= 0:
+        with get_connection() as connection:
+            connection.execute(HEARTBEAT_UPDATE, heartbeat_params(container_id, timestamp))
+        return
+    with _pending_lock:
+        # Only the latest heartbeat of a container matters
+        if timestamp > _pending_heartbeats.get(container_id, float("-inf")):
+            _pending_heartbeats[container_id] = timestamp
+
+
+def update_zeta_usage(function_name: str, wall_time_ms: float, cpu_time_ms: float, peak_rss_delta_kb: int):
+    """
+    Add an invocation resource usage to the zeta aggregates
+    """
+    if WRITE_BATCH_INTERVAL <= 0:
+        with get_connection() as connection:
+            connection.execute(USAGE_UPSERT, (
+                function_name, 1, wall_time_ms, cpu_time_ms, wall_time_ms,
+                peak_rss_delta_kb, wall_time_ms, cpu_time_ms, peak_rss_delta_kb
+            ))
+        return
+    with _pending_lock:
+        usage = _pending_usage.get(function_name)
+        if usage is None:
+            _pending_usage[function_name] = [
+                1, wall_time_ms, cpu_time_ms, wall_time_ms,
+                peak_rss_delta_kb, wall_time_ms, cpu_time_ms, peak_rss_delta_kb
+            ]
+            return
+        usage[0] += 1
+        usage[1] += wall_time_ms
+        usage[2] += cpu_time_ms
+        usage[3] = max(usage[3], wall_time_ms)
+        usage[4] = max(usage[4], peak_rss_delta_kb)
+        usage[5:] = [wall_time_ms, cpu_time_ms, peak_rss_delta_kb]
+
+
+def update_zeta_inflight(container_name: str, worker_pid: int, delta: int):
+    """
+    Add `delta` to the in-flight invocations of the runner container, as counted by the `worker_pid` proxy worker
+    """
+    key = (container_name, worker_pid)
+    with _inflight_lock:
+        count = max(_inflight_counts.get(key, 0) + delta, 0)
+        if count:
+            _inflight_counts[key] = count
+        else:
+            _inflight_counts.pop(key, None)
+        # The runner turning busy is written right away, the idle reaper and the drain must not miss it
+        if WRITE_BATCH_INTERVAL <= 0 or (count and not _flushed_inflight.get(key)):
+            with get_connection() as connection:
+                write_inflight(connection, {key: count})
+            set_flushed_inflight({key: count})
+
+
+def write_inflight(connection, inflight: dict):
+    """
+    Write the absolute in-flight counts `{(container_name, worker_pid): count}`, dropping the rows at 0
+    """
+    connection.executemany(
+        "DELETE FROM zeta_inflight WHERE container_name = ? AND worker_pid = ?",
+        [key for key, count in inflight.items() if not count]
+    )
+    connection.executemany(INFLIGHT_UPSERT, [(*key, count) for key, count in inflight.items() if count])
+
+
+def set_flushed_inflight(inflight: dict):
+    for key, count in inflight.items():
+        if count:
+            _flushed_inflight[key] = count
+        else:
+            _flushed_inflight.pop(key, None)
+
+
+def update_zeta_deployment(
+    name: str,
+    runner_image_id: str,
+    runner_image_tag: str,
+    timeout_seconds: float,
+    memory_limit_mb: int,
+    idle_timeout_override: float,
+    deployed_at: float,
+    container_name: str,
+    container_id: str,
+    host_ip: str,
+    host_port: str,
+    socket_path: str = None
+):
+    """
+    Switch the zeta to a new runner image and (warm) runner container, in a single transaction:
+    every proxy worker routes the next invocations to the new runner.
+    """
+    with get_connection() as connection:
+        connection.execute(
+            "DELETE FROM zeta_runner_image WHERE image_id IN "
+            "(SELECT runner_image_id FROM zeta_function WHERE name = ?1 AND runner_image_id != ?2)",
+            (name, runner_image_id)
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO zeta_runner_image (image_id, tag) VALUES (?, ?)",
+            (runner_image_id, runner_image_tag)
+        )
+        connection.execute(
+            """
+            UPDATE zeta_function SET
+                runner_image_id = ?, runner_container_id = ?, timeout_seconds = ?, memory_limit_mb = ?,
+                idle_timeout_override = ?, deployed_at = ?
+            WHERE name = ?
+            """,
+            (runner_image_id, container_id, timeout_seconds, memory_limit_mb, idle_timeout_override, deployed_at, name)
+        )
+        connection.execute(
+            """
+            INSERT OR REPLACE INTO zeta_runner_container
+                (function_name, container_name, container_id, host_ip, host_port, socket_path, last_heartbeat)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            """,
+            # The switch counts as a heartbeat: the new runner idles out if no invocation comes
+            (name, container_name, container_id, host_ip, host_port, socket_path, deployed_at)
+        )
+
+
+def update_zeta_redeploy_timings(name: str, redeploy_ms: float, switch_over_ms: float):
+    with get_connection() as connection:
+        connection.execute(
+            "UPDATE zeta_function SET last_redeploy_ms = ?, last_switch_over_ms = ? WHERE name = ?",
+            (redeploy_ms, switch_over_ms, name)
+        )
+
+
+def record_zeta_invocation(function_name: str, timestamp: float, bucket: int):
+    """
+    Count an invocation of the zeta in its invocation history `bucket`, and in its inter-arrival histogram
+    """
+    if WRITE_BATCH_INTERVAL <= 0:
+        with get_connection() as connection:
+            connection.execute(INVOCATION_HISTORY_UPSERT, (function_name, bucket, 1))
+            write_interarrivals(connection, function_name, [timestamp])
+        return
+    with _pending_lock:
+        key = (function_name, bucket)
+        _pending_invocations[key] = _pending_invocations.get(key, 0) + 1
+        arrivals = _pending_arrivals.setdefault(function_name, [])
+        if len(arrivals) < MAX_PENDING_ARRIVALS:
+            arrivals.append(timestamp)
+
+
+def interarrival_bucket(gap: float) -> int:
+    return bisect.bisect_left(INTERARRIVAL_BUCKET_EDGES, gap)
+
+
+def write_interarrivals(connection, function_name: str, timestamps: list):
+    """
+    Add the gaps between the invocation timestamps (and the last recorded invocation) to the zeta histogram.
+    Invocations flushed late by another proxy worker, older than the last recorded one, are ignored.
+    """
+    row = connection.execute("SELECT last_invocation_at FROM zeta_function WHERE name = ?", (function_name,)).fetchone()
+    if row is None:
+        return
+    last = row["last_invocation_at"]
+    counts = {}
+    for timestamp in sorted(timestamps):
+        if last is not None:
+            if timestamp < last:
+                continue
+            bucket = interarrival_bucket(timestamp - last)
+            counts[bucket] = counts.get(bucket, 0) + 1
+        last = timestamp
+    connection.execute("UPDATE zeta_function SET last_invocation_at = ? WHERE name = ?", (last, function_name))
+    if not counts:
+        return
+    connection.executemany(
+        """
+        INSERT INTO zeta_interarrival (function_name, bucket, count) VALUES (?, ?, ?)
+        ON CONFLICT (function_name, bucket) DO UPDATE SET count = count + excluded.count
+        """,
+        [(function_name, bucket, count) for bucket, count in counts.items()]
+    )
+    connection.execute(
+        """
+        UPDATE zeta_interarrival SET count = count / 2 WHERE function_name = ?1
+        AND (SELECT SUM(count) FROM zeta_interarrival WHERE function_name = ?1) > ?2
+        """,
+        (function_name, INTERARRIVAL_MAX_COUNT)
+    )
+
+
+def update_zeta_idle_timeout(name: str, idle_timeout_seconds: float):
+    with get_connection() as connection:
+        connection.execute(
+            "UPDATE zeta_function SET idle_timeout_seconds = ? WHERE name = ?",
+            (idle_timeout_seconds, name)
+        )
+
+
+def update_zeta_cold_start(name: str, cold_start_ms: float, alpha: float):
+    """
+    Add a cold start duration to the zeta cold start EWMA
+    """
+    with get_connection() as connection:
+        connection.execute(
+            """
+            UPDATE zeta_function
+            SET avg_cold_start_ms = COALESCE(avg_cold_start_ms * (1 - ?2) + ?1 * ?2, ?1)
+            WHERE name = ?3
+            """,
+            (cold_start_ms, alpha, name)
+        )
+
+
+def claim_zeta_invocation(worker_pid: int, timestamp: float) -> dict:
+    """
+    Mark the oldest queued invocation as run by `worker_pid`, returns it, or `{}` if the queue is empty.
+    Safe across the proxy workers: an invocation is claimed once.
+    """
+    with get_connection() as connection:
+        while True:
+            row = connection.execute(
+                "SELECT id FROM zeta_invocation WHERE status = 'queued' ORDER BY created_at LIMIT 1"
+            ).fetchone()
+            if row is None:
+                return {}
+            cursor = connection.execute(
+                """
+                UPDATE zeta_invocation SET status = 'running', started_at = ?, worker_pid = ?, attempts = attempts + 1
+                WHERE id = ? AND status = 'queued'
+                """,
+                (timestamp, worker_pid, row["id"])
+            )
+            if cursor.rowcount == 1:
+                break
+        row = connection.execute(
+            "SELECT id, function_name, params, attempts FROM zeta_invocation WHERE id = ?",
+            (row["id"],)
+        ).fetchone()
+    return dict(row)
+
+
+def update_zeta_invocation_result(
+    invocation_id: str,
+    status: str,
+    finished_at: float,
+    result: bytes = None,
+    content_type: str = None,
+    error: str = None
+):
+    with get_connection() as connection:
+        connection.execute(
+            """
+            UPDATE zeta_invocation
+            SET status = ?, finished_at = ?, result = ?, content_type = ?, error = ?, params = X''
+            WHERE id = ?
+            """,
+            (status, finished_at, result, content_type, error, invocation_id)
+        )
+
+
+def requeue_zeta_invocations_of_worker(worker_pid: int, max_attempts: int, timestamp: float) -> int:
+    """
+    Queue again the invocations a dead proxy worker was running, failing the ones out of attempts.
+    Returns the number of invocations queued again.
+    """
+    with get_connection() as connection:
+        connection.execute(
+            """
+            UPDATE zeta_invocation SET status = 'failed', finished_at = ?, error = 'Proxy worker died, out of attempts'
+            WHERE status = 'running' AND worker_pid = ? AND attempts >= ?
+            """,
+            (timestamp, worker_pid, max_attempts)
+        )
+        cursor = connection.execute(
+            """
+            UPDATE zeta_invocation SET status = 'queued', started_at = NULL, worker_pid = NULL
+            WHERE status = 'running' AND worker_pid = ?
+            """,
+            (worker_pid,)
+        )
+    return cursor.rowcount
+
+
+def update_zeta_image_gc_stats(removed_images: int, reclaimed_bytes: int, timestamp: float):
+    with get_connection() as connection:
+        connection.execute(
+            """
+            UPDATE zeta_image_gc SET
+                runs = runs + 1,
+                removed_images = removed_images + ?1,
+                reclaimed_bytes = reclaimed_bytes + ?2,
+                last_run_at = ?3,
+                last_removed_images = ?1,
+                last_reclaimed_bytes = ?2
+            WHERE id = 1
+            """,
+            (removed_images, reclaimed_bytes, timestamp)
+        )
+
+
+def update_zeta_reconciliation_stats(
+    kept_runners: int,
+    reaped_runners: int,
+    failed_reaps: int,
+    duration_ms: float,
+    timestamp: float
+):
+    with get_connection() as connection:
+        connection.execute(
+            """
+            UPDATE zeta_reconciliation SET
+                runs = runs + 1,
+                kept_runners = kept_runners + ?1,
+                reaped_runners = reaped_runners + ?2,
+                last_run_at = ?5,
+                last_duration_ms = ?4,
+                last_kept_runners = ?1,
+                last_reaped_runners = ?2,
+                last_failed_reaps = ?3
+            WHERE id = 1
+            """,
+            (kept_runners, reaped_runners, failed_reaps, duration_ms, timestamp)
+        )
+
+
+def update_zeta_prewarm_stats(
+    function_name: str,
+    prewarm_starts: int = 0,
+    prewarm_hits: int = 0,
+    cold_starts: int = 0,
+    wasted_warm_seconds: float = 0
+):
+    """
+    Add to the pre-warming outcomes of the zeta
+    """
+    with get_connection() as connection:
+        connection.execute(
+            """
+            INSERT INTO zeta_prewarm (function_name, prewarm_starts, prewarm_hits, cold_starts, wasted_warm_seconds)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (function_name) DO UPDATE SET
+                prewarm_starts = prewarm_starts + excluded.prewarm_starts,
+                prewarm_hits = prewarm_hits + excluded.prewarm_hits,
+                cold_starts = cold_starts + excluded.cold_starts,
+                wasted_warm_seconds = wasted_warm_seconds + excluded.wasted_warm_seconds
+            """,
+            (function_name, prewarm_starts, prewarm_hits, cold_starts, wasted_warm_seconds)
+        )
+
+
+def update_zeta_runner_first_invocation(container_name: str, timestamp: float) -> bool:
+    """
+    Record the first invocation of a pre-warmed runner container, and count it as a pre-warming hit.
+    Returns `False` if it was already recorded (by any proxy worker), or if the runner wasn't pre-warmed.
+    """
+    with get_connection() as connection:
+        cursor = connection.execute(
+            """
+            UPDATE zeta_runner_container SET first_invocation_at = ?1
+            WHERE container_name = ?2 AND prewarmed_at IS NOT NULL AND first_invocation_at IS NULL
+            """,
+            (timestamp, container_name)
+        )
+        if cursor.rowcount == 0:
+            return False
+        connection.execute(
+            """
+            INSERT INTO zeta_prewarm (function_name, prewarm_hits, wasted_warm_seconds)
+            SELECT function_name, 1, ?1 - prewarmed_at FROM zeta_runner_container WHERE container_name = ?2
+            ON CONFLICT (function_name) DO UPDATE SET
+                prewarm_hits = prewarm_hits + 1,
+                wasted_warm_seconds = wasted_warm_seconds + excluded.wasted_warm_seconds
+            """,
+            (timestamp, container_name)
+        )
+    return True
+
+
+def heartbeat_params(container_id: str, timestamp: float) -> tuple:
+    return timestamp, container_id, container_id + PREFIX_UPPER_BOUND
+
+
+# Batched writes ==============================================================
+def flush_pending_writes():
+    """
+    Write the buffered heartbeats, usage records, invocation counts and in-flight counts in a single transaction.
+    """
+    global _pending_heartbeats, _pending_usage, _pending_invocations, _pending_arrivals
+    with _pending_lock:
+        heartbeats, _pending_heartbeats = _pending_heartbeats, {}
+        usage, _pending_usage = _pending_usage, {}
+        invocations, _pending_invocations = _pending_invocations, {}
+        arrivals, _pending_arrivals = _pending_arrivals, {}
+    # Held until the flushed counts are recorded, a runner turning busy meanwhile must not be seen as written
+    with _inflight_lock:
+        inflight = {
+            key: _inflight_counts.get(key, 0) for key in _inflight_counts.keys() | _flushed_inflight.keys()
+            if _inflight_counts.get(key, 0) != _flushed_inflight.get(key, 0)
+        }
+        if not heartbeats and not usage and not invocations and not inflight:
+            return
+        with get_connection() as connection:
+            write_inflight(connection, inflight)
+            connection.executemany(
+                HEARTBEAT_UPDATE,
+                [heartbeat_params(container_id, timestamp) for container_id, timestamp in heartbeats.items()]
+            )
+            connection.executemany(
+                USAGE_UPSERT,
+                [(function_name, *aggregates) for function_name, aggregates in usage.items()]
+            )
+            connection.executemany(
+                INVOCATION_HISTORY_UPSERT,
+                [(function_name, bucket, count) for (function_name, bucket), count in invocations.items()]
+            )
+            for function_name, timestamps in arrivals.items():
+                write_interarrivals(connection, function_name, timestamps)
+        set_flushed_inflight(inflight)
+
+
+def flush_pending_writes_forever():
+    while True:
+        time.sleep(WRITE_BATCH_INTERVAL)
+        try:
+            flush_pending_writes()
+        except Exception as e:
+            logger.error(f"Error flushing the batched metadata writes: {e}")
+
+
+def start_write_flusher():
+    """
+    Start the background thread writing the batched updates, once.
+    """
+    global _flusher
+    with _pending_lock:
+        if WRITE_BATCH_INTERVAL <= 0 or _flusher is not None:
+            return
+        _flusher = threading.Thread(target=flush_pending_writes_forever, name="zeta-db-flusher", daemon=True)
+        _flusher.start()
+
+
+# Delete ======================================================================
+def delete_zeta_runner_container(function_name: str):
+    """
+    Forget the runner container the zeta is routed to, and release its port.
+    """
+    with get_connection() as connection:
+        connection.execute(
+            """
+            DELETE FROM zeta_port_reservation WHERE container_name IN (
+                SELECT container_name FROM zeta_runner_container WHERE function_name = ?
+            )
+            """,
+            (function_name,)
+        )
+        connection.execute("DELETE FROM zeta_runner_container WHERE function_name = ?", (function_name,))
+        connection.execute("UPDATE zeta_function SET runner_container_id = NULL WHERE name = ?", (function_name,))
+
+
+def delete_zeta_port_reservation(port: int):
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_port_reservation WHERE port = ?", (port,))
+
+
+def delete_zeta_port_reservations_of_container(container_name: str):
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_port_reservation WHERE container_name = ?", (container_name,))
+
+
+def delete_all_zeta_port_reservations():
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_port_reservation")
+
+
+def delete_zeta_inflight_of_worker(worker_pid: int):
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_inflight WHERE worker_pid = ?", (worker_pid,))
+
+
+def delete_zeta_image_version(image_id: str):
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_image_version WHERE image_id = ?", (image_id,))
+
+
+def delete_zeta_invocation_results(finished_before: float, max_results: int) -> int:
+    """
+    Drop the results finished before `finished_before`, and the oldest ones past the `max_results` latest.
+    Returns the number of dropped results.
+    """
+    with get_connection() as connection:
+        expired = connection.execute(
+            "DELETE FROM zeta_invocation WHERE finished_at < ?",
+            (finished_before,)
+        ).rowcount
+        evicted = connection.execute(
+            """
+            DELETE FROM zeta_invocation WHERE finished_at IS NOT NULL AND finished_at <= (
+                SELECT finished_at FROM zeta_invocation WHERE finished_at IS NOT NULL
+                ORDER BY finished_at DESC LIMIT 1 OFFSET ?
+            )
+            """,
+            (max_results,)
+        ).rowcount
+    return expired + evicted
+
+
+def delete_zeta_invocation_history_before(bucket: int):
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_invocation_history WHERE bucket < ?", (bucket,))
+
+
+def delete_zeta_metadata(name: str):
+    with _pending_lock:
+        _pending_usage.pop(name, None)
+        _pending_arrivals.pop(name, None)
+    with get_connection() as connection:
+        connection.execute("DELETE FROM zeta_usage WHERE function_name = ?", (name,))
+        connection.execute("DELETE FROM zeta_interarrival WHERE function_name = ?", (name,))
+        connection.execute("DELETE FROM zeta_invocation_history WHERE function_name = ?", (name,))
+        connection.execute("DELETE FROM zeta_prewarm WHERE function_name = ?", (name,))
+        # Its runner images are removed by the garbage collector
+        connection.execute("UPDATE zeta_image_version SET retired = 1 WHERE function_name = ?", (name,))
+        connection.execute("DELETE FROM zeta_port_reservation WHERE function_name = ?", (name,))
+        connection.execute("DELETE FROM zeta_runner_container WHERE function_name = ?", (name,))
+        connection.execute(
+            "DELETE FROM zeta_runner_image WHERE image_id IN (SELECT runner_image_id FROM zeta_function WHERE name = ?)",
+            (name,)
+        )
+        connection.execute("DELETE FROM zeta_function WHERE name = ?", (name,))
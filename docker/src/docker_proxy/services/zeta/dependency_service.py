@@ -0,0 +1,161 @@
+"""
+Dependencies of the zetas, declared with a `requirements.txt` at deploy time.
+
+The dependencies are installed in their own image, `python-base-runner-deps-<hash>`, built from the base runner
+and keyed by the hash of the (normalized) requirements. The zeta runner images are built on top of it:
+- Zetas with the same dependency set share the same dependency image (and its layers)
+- Redeploying a zeta without changing its dependencies only rebuilds the handler layer
+
+Packages are resolved from a wheelhouse shared across the builds: wheels matching the base runner platform
+are downloaded once on the host, then installed offline in the image. Requirements without matching wheels
+(source distributions only) are installed from the package index at build time instead.
+
+Environment variables:
+- `ZETA_WHEELHOUSE_DIR`: wheelhouse directory (default `src/docker_proxy/tmp/wheelhouse`)
+- `ZETA_RUNNER_PYTHON_VERSION`: python version of the base runner, for the wheels (default `3.9`)
+- `ZETA_RUNNER_PLATFORM`: platform of the base runner, for the wheels (default `manylinux2014_<host machine>`)
+"""
+from services.docker import image_service
+from services import election_service
+import subprocess
+import tempfile
+import platform
+import hashlib
+import logging
+import shutil
+import sys
+import os
+
+
+BASE_RUNNER = "python-base-runner:latest"
+# Contains "base-runner": not listed nor removed with the zeta runner images
+DEPS_IMAGE_PREFIX = "python-base-runner-deps-"
+WHEELHOUSE_DIR = os.environ.get("ZETA_WHEELHOUSE_DIR", os.path.join(os.getcwd(), "src/docker_proxy/tmp/wheelhouse"))
+RUNNER_PYTHON_VERSION = os.environ.get("ZETA_RUNNER_PYTHON_VERSION", "3.9")
+RUNNER_PLATFORM = os.environ.get("ZETA_RUNNER_PLATFORM", f"manylinux2014_{platform.machine()}")
+WHEEL_DOWNLOAD_TIMEOUT = 600
+logger = logging.getLogger(__name__)
+
+
+def normalize_requirements(requirements: str) -> str:
+    """
+    Strip the comments, blank lines and duplicates, and sort the requirements:
+    cosmetic changes don't change the dependency set.
+
+    Attributes
+    ---
+    - requirements: str
+        Content of the requirements.txt
+    """
+    lines = set()
+    for line in requirements.splitlines():
+        line = line.split(" #", 1)[0].strip()
+        if line and not line.startswith("#"):
+            lines.add(line)
+    return "\n".join(sorted(lines))
+
+
+def requirements_hash(requirements: str) -> str:
+    return hashlib.sha256(normalize_requirements(requirements).encode()).hexdigest()[:16]
+
+
+def deps_image_name(requirements: str) -> str:
+    return DEPS_IMAGE_PREFIX + requirements_hash(requirements)
+
+
+def get_base_image(requirements: str = None, existing_images: set = None) -> str:
+    """
+    Returns the image to build the zeta runner image from: the dependency image of the requirements,
+    built if missing, or the base runner without requirements.
+
+    Attributes
+    ---
+    - requirements: str
+        Content of the requirements.txt
+    - existing_images: set
+        Tags of the existing images, from a listing shared by a bulk redeploy, updated with the built image.
+        Listed when `None`.
+    """
+    if not requirements or not normalize_requirements(requirements):
+        return BASE_RUNNER
+    image_name = deps_image_name(requirements)
+    # Concurrent deploys of the same dependency set build it once
+    with election_service.exclusive(image_name):
+        if existing_images is None:
+            exists = image_service.image_exists(image_name)
+        else:
+            exists = image_service.is_tagged(image_name, existing_images)
+        if exists:
+            logger.info(f"Reusing the dependency image {image_name}")
+        else:
+            build_deps_image(image_name, normalize_requirements(requirements))
+            if existing_images is not None:
+                existing_images.add(image_name)
+    return image_name
+
+
+def build_deps_image(image_name: str, requirements: str):
+    """
+    Build the dependency image `image_name`, installing `requirements` on top of the base runner.
+
+    Attributes
+    ---
+    - image_name: str
+    - requirements: str
+        Normalized content of the requirements.txt
+    """
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        with open(os.path.join(tmpdirname, "requirements.txt"), "w") as f:
+            f.write(requirements + "\n")
+        wheels_dir = os.path.join(tmpdirname, "wheels")
+        if download_wheels(os.path.join(tmpdirname, "requirements.txt"), wheels_dir):
+            install = "pip install --no-cache-dir --no-index --find-links /zeta/deps/wheels -r /zeta/deps/requirements.txt"
+            copy_wheels = "COPY wheels /zeta/deps/wheels"
+        else:
+            install = "pip install --no-cache-dir -r /zeta/deps/requirements.txt"
+            copy_wheels = ""
+        dockerfile_content = f"""
+        FROM {BASE_RUNNER}
+        COPY requirements.txt /zeta/deps/requirements.txt
+        {copy_wheels}
+        RUN {install}
+        """
+        with open(os.path.join(tmpdirname, "Dockerfile"), "w") as f:
+            f.write(dockerfile_content)
+        logger.info(f"Building the dependency image {image_name}")
+        image_service.build_image(image_name=image_name, dockerfile_path=tmpdirname)
+
+
+def download_wheels(requirements_path: str, wheels_dir: str) -> bool:
+    """
+    Collect the wheels of the requirements, for the base runner platform, in `wheels_dir`.
+    Wheels already in the wheelhouse are reused, the new ones are added to it.
+    Returns `False` if some requirements have no matching wheel.
+
+    Attributes
+    ---
+    - requirements_path: str
+    - wheels_dir: str
+    """
+    os.makedirs(WHEELHOUSE_DIR, exist_ok=True)
+    command = [
+        sys.executable, "-m", "pip", "download",
+        "--quiet",
+        "--requirement", requirements_path,
+        "--dest", wheels_dir,
+        "--find-links", WHEELHOUSE_DIR,
+        "--only-binary=:all:",
+        "--implementation", "cp",
+        "--python-version", RUNNER_PYTHON_VERSION,
+        "--platform", RUNNER_PLATFORM,
+    ]
+    try:
+        subprocess.run(command, check=True, capture_output=True, timeout=WHEEL_DOWNLOAD_TIMEOUT)
+    except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+        stderr = (getattr(e, "stderr", None) or b"").decode(errors="replace").strip()
+        logger.warning(f"No wheels for some requirements, installing them from the index at build time: {stderr}")
+        return False
+    for wheel in os.listdir(wheels_dir):
+        if not os.path.exists(os.path.join(WHEELHOUSE_DIR, wheel)):
+            shutil.copy2(os.path.join(wheels_dir, wheel), WHEELHOUSE_DIR)
+    return True
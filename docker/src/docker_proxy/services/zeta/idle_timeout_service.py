@@ -0,0 +1,75 @@
+"""
+Adaptive idle timeout of the zeta runners.
+
+The idle timeout of a zeta is the one minimizing the expected cost of a gap between two of its invocations,
+over its inter-arrival histogram. A runner kept warm for `timeout` seconds costs:
+- `min(gap, timeout)` warm seconds
+- plus a cold start if the gap is longer than the timeout, weighted `ZETA_IDLE_COLD_START_WEIGHT` warm seconds
+  per second of (measured) cold start
+
+A zeta called every 45s stays warm between its calls, a zeta called once a day idles out quickly.
+
+Environment variables:
+- `ZETA_IDLE_TIMEOUT_MIN` / `ZETA_IDLE_TIMEOUT_MAX`: bounds of the idle timeout, in seconds (default `15` / `1800`)
+- `ZETA_IDLE_COLD_START_WEIGHT`: warm seconds a second of cold start is worth (default `60`)
+- `ZETA_IDLE_MIN_SAMPLES`: inter-arrivals observed before adapting the idle timeout (default `10`)
+"""
+import os
+
+
+IDLE_TIMEOUT_MIN = float(os.environ.get("ZETA_IDLE_TIMEOUT_MIN", 15))
+IDLE_TIMEOUT_MAX = float(os.environ.get("ZETA_IDLE_TIMEOUT_MAX", 1800))
+COLD_START_WEIGHT = float(os.environ.get("ZETA_IDLE_COLD_START_WEIGHT", 60))
+MIN_SAMPLES = float(os.environ.get("ZETA_IDLE_MIN_SAMPLES", 10))
+# Cold start assumed until one is measured
+DEFAULT_COLD_START_SECONDS = 1
+# Headroom over the gaps, for their jitter
+TIMEOUT_MARGIN = 1.1
+
+
+def compute_idle_timeout(histogram: dict, bucket_edges: tuple, cold_start_seconds: float = None):
+    """
+    Returns the idle timeout minimizing the expected cost of the gaps, or `None` without enough samples.
+
+    Attributes
+    ---
+    - histogram: dict
+        Inter-arrival count per bucket index
+    - bucket_edges: tuple
+        Upper bound of each bucket (seconds), the bucket past the last edge is unbounded
+    - cold_start_seconds: float
+    """
+    total = sum(histogram.values())
+    if total < MIN_SAMPLES:
+        return None
+    if cold_start_seconds is None:
+        cold_start_seconds = DEFAULT_COLD_START_SECONDS
+    cold_start_cost = cold_start_seconds * COLD_START_WEIGHT
+    # Gaps are taken at their bucket upper bound, unbounded ones at twice the last edge
+    gaps = [
+        (bucket_edges[bucket] if bucket < len(bucket_edges) else 2 * bucket_edges[-1], count)
+        for bucket, count in histogram.items()
+    ]
+    candidates = sorted({
+        min(IDLE_TIMEOUT_MAX, max(IDLE_TIMEOUT_MIN, round(edge * TIMEOUT_MARGIN))) for edge in bucket_edges
+    } | {IDLE_TIMEOUT_MIN, IDLE_TIMEOUT_MAX})
+
+    def expected_cost(timeout: float) -> float:
+        return sum(
+            count * (min(gap, timeout) + (cold_start_cost if gap > timeout else 0))
+            for gap, count in gaps
+        ) / total
+
+    return min(candidates, key=expected_cost)
+
+
+def effective_idle_timeout(zeta_meta: dict, default: float) -> float:
+    """
+    Idle timeout to apply to the zeta runner: the manual override, else the adaptive one, else `default`.
+
+    Attributes
+    ---
+    - zeta_meta: dict
+    - default: float
+    """
+    return zeta_meta.get("idle_timeout_override") or zeta_meta.get("idle_timeout_seconds") or default
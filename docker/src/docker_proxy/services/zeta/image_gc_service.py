@@ -0,0 +1,163 @@
+"""
+Runner image garbage collector, running in the background instead of the deploy / delete requests.
+
+Every deploy builds a new `<zeta>-runner-image-<uuid>` image, tracked per zeta in the metadata.
+Every `ZETA_IMAGE_GC_INTERVAL` seconds, from a single listing of the images, the collector removes:
+- The images of the deleted zetas
+- The versions of a zeta past its last `ZETA_IMAGE_GC_KEEP` ones, kept for rollback
+- The oldest kept versions while the runner images exceed the `ZETA_IMAGE_GC_BUDGET_MB` disk budget
+
+The image a zeta is routed to and the images of existing containers are never removed.
+Removals go in batches of `ZETA_IMAGE_GC_BATCH`, each followed by a prune of the dangling layers.
+The removed images and reclaimed bytes are reported in the logs and at `GET /zeta/images/gc`.
+
+Runner image sizes are the ones of their own layers, on top of the base runner or dependency image.
+"""
+from services.docker import image_service, container_service
+from . import zeta_metadata as meta
+import logging
+import time
+import os
+
+
+GC_INTERVAL = float(os.environ.get("ZETA_IMAGE_GC_INTERVAL", 300))
+KEEP_VERSIONS = int(os.environ.get("ZETA_IMAGE_GC_KEEP", 3))
+DISK_BUDGET = float(os.environ.get("ZETA_IMAGE_GC_BUDGET_MB", 10240)) * 1024 * 1024
+BATCH_SIZE = int(os.environ.get("ZETA_IMAGE_GC_BATCH", 10))
+# Pause between two batches, leaving the docker daemon to the builds and container starts
+BATCH_PAUSE = 1
+RUNNER_IMAGE_MARKER = "-runner-image-"
+BASE_RUNNER = "python-base-runner:latest"
+logger = logging.getLogger(__name__)
+
+
+def select_removals(versions: list, in_use: set, keep: int = KEEP_VERSIONS, budget: float = DISK_BUDGET) -> list:
+    """
+    Returns the image versions to remove, oldest last.
+
+    Attributes
+    ---
+    - versions: list
+        Tracked runner image versions, newest first
+    - in_use: set
+        Ids of the images used by containers
+    - keep: int
+        Versions kept per zeta, including the one it is routed to
+    - budget: float
+        Bytes the runner images can take, `0` for no budget
+    """
+    removals, kept = [], []
+    kept_per_zeta = {}
+    protected_bytes = 0
+    for version in versions:
+        if version["current"] or version["image_id"] in in_use:
+            kept_per_zeta[version["function_name"]] = kept_per_zeta.get(version["function_name"], 0) + 1
+            protected_bytes += version["size_bytes"]
+        elif version["retired"] or kept_per_zeta.get(version["function_name"], 0) >= keep:
+            removals.append(version)
+        else:
+            kept_per_zeta[version["function_name"]] = kept_per_zeta.get(version["function_name"], 0) + 1
+            kept.append(version)
+    if budget > 0:
+        total = protected_bytes + sum(version["size_bytes"] for version in kept)
+        # The budget goes before the rollback versions, oldest first
+        for version in reversed(kept):
+            if total <= budget:
+                break
+            removals.append(version)
+            total -= version["size_bytes"]
+    return removals
+
+
+def track_untracked_images(images: list, tracked: set, untracked_seen: set) -> int:
+    """
+    Track the runner images built before the collector existed, or left over by a failed deploy.
+    An image is only adopted once seen untracked twice, as a deploy may not have recorded it yet.
+    Returns the number of adopted images.
+
+    Attributes
+    ---
+    - images: list
+    - tracked: set
+        Ids of the tracked runner images
+    - untracked_seen: set
+        Ids of the untracked images seen by the previous collection, updated in place
+    """
+    zetas = {zeta_meta["name"] for zeta_meta in meta.get_all_zeta_metadata()}
+    adopted = 0
+    untracked = set()
+    for image in images:
+        tag = next((tag for tag in image.tags if RUNNER_IMAGE_MARKER in tag), None)
+        if tag is None or image.id in tracked:
+            continue
+        if image.id not in untracked_seen:
+            untracked.add(image.id)
+            continue
+        zeta_name = tag.split(RUNNER_IMAGE_MARKER)[0]
+        # Older than the tracked versions
+        meta.record_runner_image_version(
+            zeta_name, image, BASE_RUNNER, created_at=0, retired=zeta_name not in zetas
+        )
+        adopted += 1
+    untracked_seen.clear()
+    untracked_seen.update(untracked)
+    return adopted
+
+
+def collect_images(untracked_seen: set) -> tuple:
+    """
+    Run a collection, returns `(removed_images, reclaimed_bytes)`.
+
+    Attributes
+    ---
+    - untracked_seen: set
+        Ids of the untracked runner images seen by the previous collection, updated in place
+    """
+    images = {image.id: image for image in image_service.list_images()}
+    versions = meta.get_runner_image_versions()
+    if track_untracked_images(list(images.values()), {version["image_id"] for version in versions}, untracked_seen):
+        versions = meta.get_runner_image_versions()
+    # Images removed by hand
+    for version in versions:
+        if version["image_id"] not in images:
+            meta.forget_runner_image_version(version["image_id"])
+    versions = [version for version in versions if version["image_id"] in images]
+    in_use = container_service.get_image_ids_in_use()
+    removals = select_removals(versions, in_use)
+    removed_images, reclaimed_bytes = 0, 0
+    for start in range(0, len(removals), BATCH_SIZE):
+        if start > 0:
+            time.sleep(BATCH_PAUSE)
+        for version in removals[start:start + BATCH_SIZE]:
+            try:
+                image_service.delete_image(version["image_id"])
+            except Exception as e:
+                logger.warning(f"Unable to remove the runner image {version['tag']}: {e}")
+                continue
+            meta.forget_runner_image_version(version["image_id"])
+            removed_images += 1
+            reclaimed_bytes += version["size_bytes"]
+        try:
+            reclaimed_bytes += image_service.prune_images()
+        except Exception as e:
+            logger.warning(f"Unable to prune the dangling images: {e}")
+    return removed_images, reclaimed_bytes
+
+
+def collect_images_forever():
+    """
+    Image garbage collector loop, to run in a single proxy worker.
+    """
+    untracked_seen = set()
+    while True:
+        time.sleep(GC_INTERVAL)
+        try:
+            removed_images, reclaimed_bytes = collect_images(untracked_seen)
+            meta.record_image_gc(removed_images, reclaimed_bytes)
+            if removed_images:
+                logger.info(
+                    f"Image GC removed {removed_images} runner images, "
+                    f"reclaimed {reclaimed_bytes / 1024 / 1024:.1f} MB"
+                )
+        except Exception as e:
+            logger.error(f"Image GC cycle failed: {e}")
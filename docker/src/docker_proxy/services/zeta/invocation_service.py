@@ -0,0 +1,142 @@
+"""
+Asynchronous invocations: `POST /zeta/run/{zeta_name}?mode=async` queues the event and answers an invocation id
+right away, `GET /zeta/invocations/{invocation_id}` returns its status and result.
+
+- The queue is the `zeta_invocation` metadata table: queued work survives a proxy restart
+- Each proxy worker runs a pool of `ZETA_ASYNC_WORKERS` threads draining the queue against the runners.
+  An invocation is claimed by a single thread, across all the proxy workers.
+- Invocations a dead proxy worker was running are queued again, up to `MAX_ATTEMPTS` runs
+- Results are kept `ZETA_ASYNC_RESULT_TTL` seconds, and at most the `ZETA_ASYNC_MAX_RESULTS` latest ones
+
+Environment variables:
+- `ZETA_ASYNC_WORKERS`: threads draining the queue, per proxy worker (default `4`, `0` disables the pool)
+- `ZETA_ASYNC_MAX_QUEUED`: queued invocations before `POST` answers `503` (default `10000`)
+- `ZETA_ASYNC_RESULT_TTL`: seconds a result is kept (default `3600`)
+- `ZETA_ASYNC_MAX_RESULTS`: results kept (default `10000`)
+"""
+from . import zeta_metadata as meta
+from . import zeta_service
+import threading
+import logging
+import orjson
+import time
+import uuid
+import os
+
+
+ASYNC_WORKERS = int(os.environ.get("ZETA_ASYNC_WORKERS", 4))
+MAX_QUEUED = int(os.environ.get("ZETA_ASYNC_MAX_QUEUED", 10000))
+RESULT_TTL = float(os.environ.get("ZETA_ASYNC_RESULT_TTL", 3600))
+MAX_RESULTS = int(os.environ.get("ZETA_ASYNC_MAX_RESULTS", 10000))
+MAX_ATTEMPTS = 3
+# Queue polling, for the invocations queued by the other proxy workers
+POLL_INTERVAL = 0.5
+MAINTENANCE_INTERVAL = 30
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_SUCCEEDED = "succeeded"
+STATUS_FAILED = "failed"
+STATUS_TIMED_OUT = "timed_out"
+logger = logging.getLogger(__name__)
+_wakeup = threading.Event()
+_started = False
+
+
+class InvocationQueueFullError(RuntimeError):
+    pass
+
+
+def enqueue_invocation(zeta_name: str, params: dict) -> str:
+    """
+    Queue an invocation of the zeta, returns its id.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - params: dict
+    """
+    invocation_id = uuid.uuid4().hex
+    if not meta.queue_invocation(invocation_id, zeta_name, orjson.dumps(params), MAX_QUEUED):
+        raise InvocationQueueFullError(f"{MAX_QUEUED} invocations already queued")
+    _wakeup.set()
+    return invocation_id
+
+
+def get_invocation(invocation_id: str) -> dict:
+    """
+    Returns the invocation status and its result (`result` bytes and `content_type`) once it succeeded,
+    or `{}` if unknown or expired.
+
+    Attributes
+    ---
+    - invocation_id: str
+    """
+    return meta.get_invocation(invocation_id)
+
+
+def execute_invocation(invocation: dict):
+    """
+    Run a claimed invocation against the zeta runner, and store its outcome.
+    """
+    zeta_name = invocation["function_name"]
+    result, content_type, error = None, None, None
+    try:
+        zeta_meta = meta.get_zeta_metadata(zeta_name)
+        if len(zeta_meta) == 0:
+            raise RuntimeError(f"Zeta function '{zeta_name}' not found")
+        zeta_meta = zeta_service.ensure_zeta_up(zeta_name, zeta_meta)
+        # Stored uncompressed and unwrapped, embedded in the invocation status
+        result, content_type, _ = zeta_service.run_zeta(
+            zeta_name, orjson.loads(invocation["params"]), zeta_meta=zeta_meta
+        )
+        status = STATUS_SUCCEEDED
+    except zeta_service.ZetaInvocationTimeoutError as e:
+        status, error = STATUS_TIMED_OUT, str(e)
+    except Exception as e:
+        logger.error(f"Asynchronous invocation {invocation['id']} of zeta '{zeta_name}' failed: {e}")
+        status, error = STATUS_FAILED, str(e)
+    meta.finish_invocation(invocation["id"], status, result, content_type, error)
+
+
+def drain_queue_forever():
+    """
+    Worker thread loop: run the queued invocations, oldest first.
+    """
+    while True:
+        try:
+            invocation = meta.claim_invocation()
+        except Exception as e:
+            logger.error(f"Unable to claim a queued invocation: {e}")
+            invocation = {}
+        if not invocation:
+            _wakeup.wait(POLL_INTERVAL)
+            _wakeup.clear()
+            continue
+        execute_invocation(invocation)
+
+
+def maintain_queue_forever():
+    """
+    Queue the invocations of the dead proxy workers again, and expire the results.
+    """
+    while True:
+        try:
+            if meta.requeue_dead_worker_invocations(MAX_ATTEMPTS):
+                _wakeup.set()
+            meta.expire_invocation_results(RESULT_TTL, MAX_RESULTS)
+        except Exception as e:
+            logger.error(f"Asynchronous invocation queue maintenance failed: {e}")
+        time.sleep(MAINTENANCE_INTERVAL)
+
+
+def start_invocation_workers():
+    """
+    Start the worker pool of this proxy worker, and the queue maintenance.
+    """
+    global _started
+    if _started or ASYNC_WORKERS <= 0:
+        return
+    _started = True
+    for i in range(ASYNC_WORKERS):
+        threading.Thread(target=drain_queue_forever, name=f"zeta-async-{i}", daemon=True).start()
+    threading.Thread(target=maintain_queue_forever, name="zeta-async-maintenance", daemon=True).start()
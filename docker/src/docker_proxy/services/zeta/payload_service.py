@@ -0,0 +1,76 @@
+"""
+Raw invocation payloads: `POST /zeta/run/{zeta_name}/raw` takes a body of any content type (msgpack, octet-stream,
+JSON...) and streams it to the runner as it comes, without buffering nor re-encoding it in the proxy.
+
+The payload size limit is enforced while streaming: up front from the `Content-Length` header when there is one,
+and on the bytes actually received otherwise (chunked uploads, or a lying header).
+
+Environment variables:
+- `ZETA_MAX_PAYLOAD_MB`: raw payload size limit (default `100`, `0` for no limit)
+"""
+from anyio import from_thread
+import os
+
+
+MAX_PAYLOAD_BYTES = int(float(os.environ.get("ZETA_MAX_PAYLOAD_MB", 100)) * 1024 * 1024)
+DEFAULT_CONTENT_TYPE = "application/octet-stream"
+
+
+class PayloadTooLargeError(RuntimeError):
+    pass
+
+
+def check_content_length(content_length: str, limit: int = MAX_PAYLOAD_BYTES):
+    """
+    Reject a payload announced larger than the limit, before reading it.
+
+    Attributes
+    ---
+    - content_length: str
+        `Content-Length` header of the request, `None` for chunked uploads
+    - limit: int
+    """
+    if not content_length or limit <= 0:
+        return
+    try:
+        length = int(content_length)
+    except ValueError:
+        raise ValueError(f"Invalid Content-Length '{content_length}'")
+    if length > limit:
+        raise PayloadTooLargeError(f"Payload of {length} bytes exceeds the {limit} bytes limit")
+
+
+def iter_limited(chunks, limit: int = MAX_PAYLOAD_BYTES):
+    """
+    Yield the chunks, raising `PayloadTooLargeError` as soon as they exceed the limit.
+
+    Attributes
+    ---
+    - chunks: Iterable[bytes]
+    - limit: int
+    """
+    received = 0
+    for chunk in chunks:
+        received += len(chunk)
+        if limit > 0 and received > limit:
+            raise PayloadTooLargeError(f"Payload exceeds the {limit} bytes limit")
+        yield chunk
+
+
+def iter_request_body(request):
+    """
+    Sync iterator over the body of a starlette request, as it is received.
+    To use from a thread started by `run_in_threadpool`: each chunk is awaited on the event loop.
+
+    Attributes
+    ---
+    - request: starlette.requests.Request
+    """
+    stream = request.stream()
+    while True:
+        try:
+            chunk = from_thread.run(stream.__anext__)
+        except StopAsyncIteration:
+            return
+        if chunk:
+            yield chunk
@@ -0,0 +1,83 @@
+"""
+PNS - Port Name System: host ports reserved for the zeta runner containers.
+
+Reservations are stored in the metadata database, so they are shared by every proxy worker process.
+A port is reserved by a runner container until the container is removed: a runner draining after a redeploy
+keeps its port while the new one serves.
+"""
+from random import randint
+from requests.exceptions import ConnectionError, ReadTimeout
+from . import db
+import requests
+import logging
+
+
+logger = logging.getLogger(__name__)
+
+
+def get_pns() -> dict:
+    """
+    Returns the port-to-zetaName mapping.
+    """
+    return db.fetch_zeta_port_reservations()
+
+
+def get_port_containers() -> dict:
+    """
+    Returns the port-to-runnerContainerName mapping.
+    """
+    return db.fetch_zeta_port_reservation_containers()
+
+
+def set_zeta_port(zeta_name: str, container_port: int, container_name: str) -> bool:
+    """
+    Reserve the port for the runner container of the zeta. Returns `False` if it is already reserved.
+    """
+    reserved = db.insert_zeta_port_reservation(container_port, zeta_name, container_name)
+    if reserved and logger.isEnabledFor(logging.DEBUG):
+        logger.debug("PNS after update: %s", get_pns())
+    return reserved
+
+
+def purge_pns_port():
+    db.delete_all_zeta_port_reservations()
+
+
+def release_runner_ports(container_name: str):
+    """
+    Release the port reserved by a removed runner container.
+    """
+    db.delete_zeta_port_reservations_of_container(container_name)
+
+
+def delete_pns_port_entry(container_port: int):
+    db.delete_zeta_port_reservation(container_port)
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("PNS after deletion: %s", get_pns())
+
+
+def retrieve_dynamic_port(zeta_name: str, container_name: str):
+    """
+    Get dynamic port from the [1024, 49151] range, and reserve it for the runner container of the zeta.
+    The condition to retrieve a port are :
+    - Port shouldn't be in the PNS (reserved by any proxy worker)
+    - Port shouldn't be used by other apps
+    """
+    def is_port_used_by_other_app(port: int):
+        try:
+            requests.get(f"http://localhost:{port}", timeout=0.1)
+            logger.warning(f"conflicting ports : {port} already in use")
+            return True
+        except ReadTimeout:
+            logger.warning(f"conflicting ports : {port} already in use")
+            return True
+        except ConnectionError:
+            return False
+
+    port = randint(1024, 49151)
+    while True:
+        # The reservation is atomic: concurrent workers never get the same port
+        if not is_port_used_by_other_app(port) and set_zeta_port(zeta_name, port, container_name):
+            break
+        port = ((port + 1) % 49151) + 1025
+    return port
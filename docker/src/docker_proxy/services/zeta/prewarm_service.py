@@ -0,0 +1,167 @@
+"""
+Predictive pre-warming: start the zeta runners shortly before their expected invocations.
+
+Invocations are counted per zeta in one-minute buckets (the invocation history).
+Every `ZETA_PREWARM_INTERVAL` seconds, the scheduler forecasts, for each zeta without a running runner,
+whether an invocation is expected within the next `ZETA_PREWARM_LEAD_SECONDS`:
+- Periodicity: the same window one period ago (hourly, daily) had invocations, for most of the observed periods
+- EWMA: the EWMA of the gaps between the recent invocations puts the next one within the window
+
+Pre-warmed runners idle out as usual when the traffic doesn't come. The outcomes are reported in the zeta metadata:
+- `prewarm_starts` / `prewarm_hits`: runners pre-warmed / pre-warmed runners that got invoked
+- `prewarm_cold_starts`: runners started on demand
+- `prewarm_cold_start_avoidance`: share of the runner starts on demand avoided by pre-warming
+- `prewarm_wasted_warm_seconds`: time pre-warmed runners waited for their first invocation, or idled out without one
+
+Environment variables:
+- `ZETA_PREWARM_INTERVAL`: seconds between two forecasts (default `15`, `0` disables pre-warming)
+- `ZETA_PREWARM_LEAD_SECONDS`: how far ahead runners are started (default `30`)
+- `ZETA_PREWARM_HISTORY_DAYS`: retention of the invocation history (default `8`)
+"""
+from services.docker import container_service
+from . import zeta_metadata as meta
+from . import zeta_service
+import logging
+import time
+import os
+
+
+PREWARM_INTERVAL = float(os.environ.get("ZETA_PREWARM_INTERVAL", 15))
+PREWARM_LEAD = float(os.environ.get("ZETA_PREWARM_LEAD_SECONDS", 30))
+HISTORY_RETENTION = float(os.environ.get("ZETA_PREWARM_HISTORY_DAYS", 8)) * 24 * 3600
+HISTORY_PRUNE_INTERVAL = 3600
+# Periodicity model
+PERIODS = (3600, 24 * 3600)
+PERIODIC_MIN_OBSERVATIONS = 2
+PERIODIC_THRESHOLD = 0.6
+# EWMA model
+EWMA_ALPHA = 0.3
+EWMA_LOOKBACK = 24 * 3600
+EWMA_MIN_GAPS = 3
+# Tolerated EWMA deviation of the gaps, relative to their EWMA
+EWMA_MAX_DEVIATION = 0.25
+logger = logging.getLogger(__name__)
+
+
+# Forecast ====================================================================
+def window_buckets(start: float, end: float) -> range:
+    size = meta.HISTORY_BUCKET_SECONDS
+    return range(int(start // size), int(end // size) + 1)
+
+
+def periodic_forecast(history: dict, now: float, lead: float):
+    """
+    Returns the period (seconds) whose past windows predict an invocation in `[now, now + lead]`, if any.
+
+    Attributes
+    ---
+    - history: dict
+        Invocation count per bucket
+    - now: float
+    - lead: float
+    """
+    if not history:
+        return None
+    first_bucket = min(history)
+    for period in PERIODS:
+        observed, hits = 0, 0
+        k = 1
+        while True:
+            window = window_buckets(now - k * period, now + lead - k * period)
+            if window.start < first_bucket:
+                break
+            observed += 1
+            hits += any(history.get(bucket) for bucket in window)
+            k += 1
+        if observed >= PERIODIC_MIN_OBSERVATIONS and hits / observed >= PERIODIC_THRESHOLD:
+            return period
+    return None
+
+
+def ewma_forecast(history: dict, now: float, lead: float):
+    """
+    Returns the expected time of the next invocation if it falls in `[now, now + lead]` and the gaps are regular.
+
+    Attributes
+    ---
+    - history: dict
+        Invocation count per bucket
+    - now: float
+    - lead: float
+    """
+    size = meta.HISTORY_BUCKET_SECONDS
+    buckets = sorted(bucket for bucket, count in history.items() if count and bucket * size >= now - EWMA_LOOKBACK)
+    gaps = [(b - a) * size for a, b in zip(buckets, buckets[1:])]
+    if len(gaps) < EWMA_MIN_GAPS:
+        return None
+    ewma, deviation = gaps[0], 0
+    for gap in gaps[1:]:
+        deviation = EWMA_ALPHA * abs(gap - ewma) + (1 - EWMA_ALPHA) * deviation
+        ewma = EWMA_ALPHA * gap + (1 - EWMA_ALPHA) * ewma
+    if deviation > EWMA_MAX_DEVIATION * ewma:
+        return None
+    expected = buckets[-1] * size + ewma
+    # The expected bucket may have started already
+    if now - size <= expected <= now + lead:
+        return expected
+    return None
+
+
+def forecast(history: dict, now: float, lead: float = PREWARM_LEAD):
+    """
+    Returns the reason to pre-warm the zeta now, or `None`.
+    """
+    period = periodic_forecast(history, now, lead)
+    if period is not None:
+        return f"periodic ({period // 60:.0f} min)"
+    expected = ewma_forecast(history, now, lead)
+    if expected is not None:
+        return f"ewma (expected in {max(0, expected - now):.0f}s)"
+    return None
+
+
+# Scheduler ===================================================================
+def prewarm_zetas(last_prewarms: dict):
+    """
+    Pre-warm the zetas expected to be invoked soon.
+
+    Attributes
+    ---
+    - last_prewarms: dict
+        Last pre-warm time per zeta, updated in place. A zeta is pre-warmed at most once per lead window.
+    """
+    meta.flush_metadata_writes()
+    now = time.time()
+    running = set(container_service.get_running_container_names())
+    for zeta_meta in meta.get_all_zeta_metadata():
+        zeta_name = zeta_meta["name"]
+        if (zeta_meta["runner_container_name"] or zeta_name) in running:
+            continue
+        if now - last_prewarms.get(zeta_name, 0) < 2 * PREWARM_LEAD:
+            continue
+        reason = forecast(meta.get_invocation_history(zeta_name, now - HISTORY_RETENTION), now)
+        if reason is None:
+            continue
+        try:
+            if zeta_service.cold_start_zeta(zeta_name, prewarm=True):
+                logger.info(f"Pre-warmed zeta '{zeta_name}': {reason}")
+            last_prewarms[zeta_name] = now
+        except Exception as e:
+            logger.error(f"Unable to pre-warm zeta '{zeta_name}': {e}")
+
+
+def prewarm_forever():
+    """
+    Pre-warming scheduler loop, to run in a single proxy worker.
+    """
+    last_prewarms = {}
+    last_prune = 0
+    while True:
+        time.sleep(PREWARM_INTERVAL)
+        try:
+            prewarm_zetas(last_prewarms)
+            if time.time() - last_prune > HISTORY_PRUNE_INTERVAL:
+                meta.prune_invocation_history(HISTORY_RETENTION)
+                last_prune = time.time()
+        except Exception as e:
+            logger.error(f"Pre-warming cycle failed: {e}")
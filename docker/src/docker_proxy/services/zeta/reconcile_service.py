@@ -0,0 +1,146 @@
+"""
+Runner reconciliation, run once at every proxy start.
+
+The runner containers outlive the proxy: after a restart, the ones still warm are adopted back instead of
+being orphaned, so their zetas don't cold start again. From a single listing of the containers on the zeta network:
+- Adopted: running runners of a known zeta, answering on their transport, that the zeta is routed to
+  (or, for a zeta routed to no runner, that run its current image). Their metadata is restored,
+  their host port reserved again in the PNS, and their heartbeat reset so the idle timeout starts over.
+- Reaped: every other runner, stopped, orphaned, superseded by a redeploy or not answering.
+  Their metadata, PNS reservations and socket directories are cleaned up.
+
+Environment variables:
+- `ZETA_RECONCILE_RUNNERS`: `0` disables the reconciliation, the runners left over are then removed on demand
+  (see `POST /zeta/bulk/prune`) (default `1`)
+"""
+from services.docker import container_service
+from . import zeta_metadata as meta
+from . import zeta_environment as zeta_env
+from . import pns_service as pns
+from . import zeta_service
+from . import bulk_service
+from . import runner_client
+import logging
+import time
+import os
+
+
+RECONCILE_RUNNERS = os.environ.get("ZETA_RECONCILE_RUNNERS", "1") != "0"
+logger = logging.getLogger(__name__)
+
+
+def reconcile_runners() -> dict:
+    """
+    Adopt the warm runner containers left by the previous proxy run, reap the others.
+    Returns `{"keptRunners": int, "reapedRunners": int, "failedReaps": int, "durationMs": float}`.
+    """
+    started = time.perf_counter()
+    zetas = {zeta_meta["name"]: zeta_meta for zeta_meta in meta.get_all_zeta_metadata()}
+    containers = {
+        name: container for name, container in container_service.get_containers_by_name().items()
+        if zeta_env.GLOBAL_NETWORK_NAME in container.attrs.get("NetworkSettings", {}).get("Networks", {})
+    }
+    # At most one adoption candidate per zeta
+    candidates, reapable = {}, []
+    for container_name, container in sorted(containers.items()):
+        zeta_name = zeta_service.runner_owner(container_name, set(zetas))
+        if container.status != "running" or zeta_name is None or zeta_name in candidates:
+            reapable.append(container_name)
+            continue
+        routed = zetas[zeta_name].get("runner_container_name")
+        if routed is not None and routed != container_name:
+            # Left by a redeploy, or being drained by the previous run
+            reapable.append(container_name)
+        elif routed is None and container.attrs.get("Image") != zetas[zeta_name]["runner_image_id"]:
+            reapable.append(container_name)
+        else:
+            candidates[zeta_name] = container_name
+    # The runners are probed in parallel, unresponsive ones take up to the connect timeout
+    probes = bulk_service.run_bulk(
+        list(candidates.values()),
+        lambda container_name: {"up": zeta_service.is_runner_up(container_name)}
+    )
+    kept = {}
+    for (zeta_name, container_name), probe in zip(candidates.items(), probes):
+        if not probe.get("up"):
+            reapable.append(container_name)
+            continue
+        try:
+            adopt_runner(zeta_name, containers[container_name], zetas[zeta_name])
+            kept[zeta_name] = container_name
+        except Exception as e:
+            logger.warning(f"Unable to adopt the runner {container_name} of zeta '{zeta_name}': {e}")
+            reapable.append(container_name)
+
+    def reap(container_name: str):
+        container_service.discard_container(containers[container_name])
+        runner_client.close_runner_client(container_name)
+        container_service.remove_runner_socket_dir(container_name)
+
+    reaped = bulk_service.run_bulk(reapable, reap)
+    forget_unkept_runners(zetas, kept)
+    meta.flush_metadata_writes()
+    summary = {
+        "keptRunners": len(kept),
+        "reapedRunners": sum(1 for result in reaped if result["status"] == bulk_service.RESULT_OK),
+        "failedReaps": sum(1 for result in reaped if result["status"] != bulk_service.RESULT_OK),
+        "durationMs": (time.perf_counter() - started) * 1000
+    }
+    meta.record_runner_reconciliation(
+        summary["keptRunners"], summary["reapedRunners"], summary["failedReaps"], summary["durationMs"]
+    )
+    logger.info(
+        f"Runner reconciliation kept {summary['keptRunners']} warm runners, reaped {summary['reapedRunners']} "
+        f"({summary['failedReaps']} failed) in {summary['durationMs']:.0f} ms"
+    )
+    return summary
+
+
+def adopt_runner(zeta_name: str, container, zeta_meta: dict):
+    """
+    Route the zeta to its warm runner container, reserve its host port and reset its heartbeat.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - container: docker.models.containers.Container
+    - zeta_meta: dict
+        Metadata of the zeta, as of the reconciliation start
+    """
+    uds = runner_client.uses_uds()
+    if zeta_meta.get("runner_container_name") != container.name:
+        socket_path = container_service.runner_socket_path(container.name) if uds else None
+        meta.update_zeta_container_metadata(zeta_name, container.name, socket_path)
+    if not uds:
+        host_port = int(container.ports["8000/tcp"][0]["HostPort"])
+        if not pns.set_zeta_port(zeta_name, host_port, container.name):
+            # Stale reservation of another runner, it is gone since the port is taken
+            pns.delete_pns_port_entry(host_port)
+            pns.set_zeta_port(zeta_name, host_port, container.name)
+    meta.update_zeta_heartbeat(container.id, int(time.time()))
+    logger.info(f"Adopted the warm runner {container.name} of zeta '{zeta_name}'")
+
+
+def forget_unkept_runners(zetas: dict, kept: dict):
+    """
+    Clean up the metadata, PNS reservations and socket directories of the runners that weren't kept.
+
+    Attributes
+    ---
+    - zetas: dict
+        Metadata per zeta name, as of the reconciliation start
+    - kept: dict
+        Adopted runner container name per zeta name
+    """
+    for zeta_name, zeta_meta in zetas.items():
+        if zeta_name not in kept and zeta_meta.get("runner_container_name") is not None:
+            meta.delete_zeta_container_metadata(zeta_name)
+    uds = runner_client.uses_uds()
+    kept_runners = set(kept.values())
+    for port, container_name in pns.get_port_containers().items():
+        if uds or container_name not in kept_runners:
+            pns.delete_pns_port_entry(port)
+    if os.path.isdir(container_service.RUNNER_SOCKET_DIR):
+        for container_name in os.listdir(container_service.RUNNER_SOCKET_DIR):
+            if container_name not in kept_runners:
+                container_service.remove_runner_socket_dir(container_name)
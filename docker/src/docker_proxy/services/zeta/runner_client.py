@@ -0,0 +1,67 @@
+"""
+HTTP transport between the proxy and the zeta runners, selected with the `ZETA_RUNNER_TRANSPORT` environment variable:
+- `tcp` (default): the runner port 8000 is published on a host port reserved in the PNS
+- `uds`: the runner serves HTTP on a Unix socket, in a per-container directory shared with the host.
+  No host port is allocated, and the calls skip the docker userland proxy and NAT.
+
+Clients are kept open, so connections to the runners are reused across invocations.
+"""
+from services.docker import container_service
+from . import zeta_utils as utils
+import threading
+import httpx
+import os
+
+
+TRANSPORT_TCP = "tcp"
+TRANSPORT_UDS = "uds"
+TRANSPORTS = (TRANSPORT_TCP, TRANSPORT_UDS)
+RUNNER_TRANSPORT = os.environ.get("ZETA_RUNNER_TRANSPORT", TRANSPORT_TCP).lower()
+# Host part of the URLs sent over the Unix sockets, only used for the Host header
+UDS_BASE_URL = "http://zeta-runner"
+_lock = threading.Lock()
+_tcp_client = None
+_uds_clients = {}
+
+
+def uses_uds() -> bool:
+    if RUNNER_TRANSPORT not in TRANSPORTS:
+        raise ValueError(f"Unknown ZETA_RUNNER_TRANSPORT '{RUNNER_TRANSPORT}', expected one of {TRANSPORTS}")
+    return RUNNER_TRANSPORT == TRANSPORT_UDS
+
+
+def get_runner_client(container) -> tuple:
+    """
+    Returns the `(client, base_url)` to call the runner of the container with.
+
+    Attributes
+    ---
+    - container: docker.models.containers.Container
+    """
+    global _tcp_client
+    if uses_uds():
+        socket_path = container_service.runner_socket_path(container.name)
+        with _lock:
+            client = _uds_clients.get(socket_path)
+            if client is None:
+                client = httpx.Client(transport=httpx.HTTPTransport(uds=socket_path))
+                _uds_clients[socket_path] = client
+        return client, UDS_BASE_URL
+    with _lock:
+        if _tcp_client is None:
+            _tcp_client = httpx.Client()
+    return _tcp_client, utils.retrieve_container_hostname(container)
+
+
+def close_runner_client(container_name: str):
+    """
+    Close the connections to the runner of the container, once it is removed.
+
+    Attributes
+    ---
+    - container_name: str
+    """
+    with _lock:
+        client = _uds_clients.pop(container_service.runner_socket_path(container_name), None)
+    if client is not None:
+        client.close()
@@ -0,0 +1,725 @@
+"""
+Zeta metadata should be tightly linked to the current deployment.
+A change in the functions means a redeployment,
+Therfore deleting and re creating the metadata
+"""
+from services.docker import image_service, container_service
+from services import log_service
+from contextlib import contextmanager
+from datetime import timedelta
+from . import idle_timeout_service
+from . import runner_client
+from . import db
+import threading
+import hashlib
+import logging
+import base64
+import socket
+import time
+import json
+import os
+
+
+SOCKET_DIR = container_service.HEARTBEAT_SOCKET_DIR
+SOCKET_PATH = container_service.SOCKET_PATH
+# Idle timeout of the zetas without an override nor enough invocations to adapt it
+IDLE_TIMEOUT = timedelta(seconds=30).total_seconds()
+# Smoothing of the measured cold starts
+COLD_START_ALPHA = 0.3
+# Resolution of the invocation history
+HISTORY_BUCKET_SECONDS = 60
+logger = logging.getLogger(__name__)
+lock = threading.Lock()
+zeta_meta = {}
+
+
+# Zeta Heartbeat =============================================================
+def terminate_idle_containers():
+    """
+    Terminate IDLE zeta container runners if idle for more than their idle timeout (`IDLE_TIMEOUT` by default)
+    """
+    while True:
+        # Heartbeats are written in batches
+        db.flush_pending_writes()
+        prune_dead_worker_inflight()
+        zeta_meta_list = db.fetch_all_zeta_functions()
+        refresh_idle_timeouts(zeta_meta_list)
+        for zeta_meta in zeta_meta_list:
+            # TODO: Zeta supports 1 container per function as of now
+            rcn = zeta_meta["runner_container_name"]
+            rclh = zeta_meta["runner_container_last_heartbeat"]
+            if rclh is None or rclh == 0:
+                logger.warning("Zeta Container Runner still getting initialized, can't terminate.")
+                continue
+            if zeta_meta["inflight_invocations"] > 0:
+                # Still serving a (long) invocation, proxied by any of the workers
+                continue
+            if time.time() - rclh > idle_timeout_service.effective_idle_timeout(zeta_meta, IDLE_TIMEOUT):
+                if not container_service.does_container_exist(rcn):
+                    logger.warning(f"Zeta runner container {rcn} doesn't exist")
+                    continue
+                try:
+                    # Removing zeta function runner containers
+                    container_service.stop_container(rcn)
+                    container_service.remove_container(rcn)
+                    runner_client.close_runner_client(rcn)
+                    # A pre-warmed runner that never got invoked was warm for nothing
+                    if zeta_meta["runner_container_prewarmed_at"] and not zeta_meta["runner_container_first_invocation_at"]:
+                        db.update_zeta_prewarm_stats(
+                            zeta_meta["name"],
+                            wasted_warm_seconds=time.time() - zeta_meta["runner_container_prewarmed_at"]
+                        )
+                    # Removing container meta for zeta
+                    delete_zeta_container_metadata(zeta_meta["name"])
+                    logger.info(f"Terminated idle zeta runner container {rcn}")
+                except Exception as e:
+                    logger.error(f"Error terminating zeta runner container {rcn}: {e}")
+        time.sleep(15)
+
+
+def prune_dead_worker_inflight():
+    """
+    Drop the in-flight counters of proxy workers that died mid invocation.
+    """
+    for worker_pid in db.fetch_zeta_inflight_worker_pids():
+        if not is_process_alive(worker_pid):
+            logger.warning(f"Dropping in-flight invocations of dead proxy worker {worker_pid}")
+            db.delete_zeta_inflight_of_worker(worker_pid)
+
+
+def is_process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # Alive, owned by another user
+        pass
+    return True
+
+
+def accept_heartbeat_connection():
+    """
+    Heartbeat implementation using sockets.
+    """
+    # Clean up the socket file if it already exists
+    os.makedirs(SOCKET_DIR, exist_ok=True)
+    if os.path.exists(SOCKET_PATH):
+        os.remove(SOCKET_PATH)
+    # Create / bind the Unix socket
+    server_socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server_socket.bind(SOCKET_PATH)
+    server_socket.listen(1)
+    try:
+        while True:
+            connection, client_address = server_socket.accept()
+            try:
+                # Receive and process data
+                while data := connection.recv(1024):
+                    meta = json.loads(data.decode())
+                    log_service.log_payload(logger, "HEARTBEAT - Heartbeat received", meta)
+                    container_id = meta["containerId"]
+                    timestamp = int(meta["timestamp"])
+                    update_zeta_heartbeat(container_id, timestamp)
+            finally:
+                connection.close()
+    except KeyboardInterrupt:
+        logger.info("Hearbeat socket shutting down")
+    finally:
+        server_socket.close()
+        os.remove(SOCKET_PATH)
+
+
+# Zeta metadata ===============================================================
+def initialize_metadata_db():
+    db.initialize_db()
+
+
+def flush_metadata_writes():
+    """
+    Write the batched heartbeats, usage records and invocation counts now.
+    """
+    db.flush_pending_writes()
+
+
+def shutdown_metadata_db():
+    """
+    Write the batched heartbeats and usage records before exiting.
+    """
+    flush_metadata_writes()
+
+
+# Create ======================================================================
+def create_zeta_metadata(
+    zeta_name: str,
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout: float = None,
+    image_name: str = None
+):
+    """
+    Create zeta metadata for the specified zeta.
+
+    Attributes
+    ---
+    zeta_name: str
+    timeout: float
+        Hard execution timeout of an invocation, in seconds
+    memory_limit_mb: int
+        Memory ceiling of an invocation
+    idle_timeout: float
+        Manual override of the adaptive idle timeout of the runner, in seconds
+    image_name: str
+        The runner image built for the zeta, looked up by the zeta name prefix if not specified
+    """
+    if image_name is not None:
+        runner_image_list = [image_service.get_image(image_name)]
+    else:
+        runner_image_list = image_service.get_images_from_prefix(zeta_name)
+    if len(runner_image_list) > 1:
+        # Normaly, this shouldn't happen unless if manually poked
+        # around the docker images
+        errmsg = f"Found {len(runner_image_list)} runners found for zeta {zeta_name}"
+        logger.error(errmsg)
+        raise RuntimeError(errmsg)
+    elif len(runner_image_list) == 0:
+        errmsg = f"No runners found for zeta: {zeta_name}"
+        logger.error(errmsg)
+        raise RuntimeError(errmsg)
+    runner_image = runner_image_list[0]
+    # Save meta to DB
+    try:
+        db.insert_zeta_runner_image(
+            image_id=str(runner_image.id),
+            tag=str(runner_image.tags[0])
+        )
+    except Exception as e:
+        logger.error("Error inserting the zeta runner image details in DB: " + str(e))
+        raise e
+    try:
+        db.insert_zeta_function(
+            name=zeta_name,
+            created_at=time.time(),
+            runner_image_id=runner_image.id,
+            runner_container_id=None,
+            timeout_seconds=timeout,
+            memory_limit_mb=memory_limit_mb,
+            idle_timeout_override=idle_timeout
+        )
+    except Exception as e:
+        logger.error("Error inserting the zeta function metadata in DB: " + str(e))
+        raise e
+    # Retrieve the created zeta metadata
+    try:
+        meta = db.fetch_zeta_function_by_name(zeta_name)
+    except Exception as e:
+        logger.error("Couldn't fetch zeta metadata: " + str(e))
+        raise e
+    return meta
+
+
+# Read ========================================================================
+def get_all_zeta_metadata():
+    """
+    Returns a dict of the zeta names and metadata.
+    """
+    return db.fetch_all_zeta_functions()
+
+
+def list_zeta_metadata(
+    fields: list = None,
+    cursor: str = None,
+    limit: int = None,
+    name_prefix: str = None,
+    states: list = None
+) -> tuple:
+    """
+    Returns a page of the zeta metadata ordered by name, and the cursor of the next page (`None` on the last one).
+    Raises `ValueError` on unknown fields / states or an invalid cursor.
+
+    Attributes
+    ---
+    fields: list
+        Fields to return, all of them if not specified. `name` is always returned.
+    cursor: str
+        Cursor of the page, as returned for the previous one
+    limit: int
+        Page size, no pagination if not specified
+    name_prefix: str
+    states: list
+        Only the zetas in one of these states: `cold` (no runner), `warm` (runner up), `busy` (runner invoked)
+    """
+    unknown_fields = set(fields or []) - set(db.zeta_function_fields())
+    if unknown_fields:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown_fields))}")
+    unknown_states = set(states or []) - set(db.ZETA_STATES)
+    if unknown_states:
+        raise ValueError(f"Unknown states: {', '.join(sorted(unknown_states))}, expected {', '.join(db.ZETA_STATES)}")
+    after = None
+    if cursor:
+        try:
+            after = base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode()
+        except Exception:
+            raise ValueError(f"Invalid cursor '{cursor}'")
+    page = db.fetch_zeta_functions_page(fields, after, limit, name_prefix, states)
+    next_cursor = None
+    if limit is not None and len(page) == limit:
+        next_cursor = base64.urlsafe_b64encode(page[-1]["name"].encode()).decode().rstrip("=")
+    return page, next_cursor
+
+
+def get_metadata_etag(
+    fields: list = None,
+    cursor: str = None,
+    limit: int = None,
+    name_prefix: str = None,
+    states: list = None
+) -> str:
+    """
+    Entity tag of a zeta metadata listing, changing with the metadata version and the listing parameters.
+    Listings without traffic driven fields (heartbeats, usage, states...) nor state filter
+    don't change with the traffic.
+
+    Attributes
+    ---
+    fields: list
+        Listed fields, all of them if not specified
+    cursor: str
+    limit: int
+    name_prefix: str
+    states: list
+        See `list_zeta_metadata`
+    """
+    structure, activity = db.fetch_zeta_metadata_version()
+    query = hashlib.blake2b(
+        json.dumps([fields, cursor, limit, name_prefix, states]).encode(), digest_size=6
+    ).hexdigest()
+    if fields and not states and not db.ACTIVITY_FIELDS.intersection(fields):
+        return f'"{structure}-{query}"'
+    return f'"{structure}.{activity}-{query}"'
+
+
+def get_zeta_metadata(zeta_name: str):
+    """
+    Returns metadata for the specified zeta, `{}` if it isn't registered.
+
+    Attributes
+    ---
+    zeta_name: str
+    """
+    return db.fetch_zeta_function_by_name(zeta_name)
+
+
+def get_runner_container_name(zeta_name: str) -> str:
+    """
+    Returns the name of the runner container the zeta is routed to.
+    Defaults to the zeta name, the name of a first runner container.
+
+    Attributes
+    ---
+    zeta_name: str
+    """
+    return db.fetch_zeta_function_by_name(zeta_name).get("runner_container_name") or zeta_name
+
+
+def is_zeta_registered(zeta_name: str) -> bool:
+    """
+    Checks if the specified zeta is registered in the metadata.
+
+    Attributes
+    ---
+    zeta_name: str
+    """
+    meta_dict = db.fetch_zeta_function_by_name(zeta_name)
+    return len(meta_dict) > 0
+
+
+# Update ======================================================================
+def update_zeta_container_metadata(
+    zeta_name: str,
+    container_name: str = None,
+    socket_path: str = None,
+    prewarmed: bool = False
+):
+    """
+    Update the zeta container runner metadata for the specified zeta.
+
+    Attributes
+    ---
+    zeta_name: str
+    container_name: str
+        Name of the runner container, defaults to the zeta name
+    socket_path: str
+        Host path of the Unix socket the runner serves HTTP on, if it doesn't publish a port
+    prewarmed: bool
+        The runner was started ahead of the expected invocations
+    """
+    try:
+        container = container_service.get_container(container_name or zeta_name)
+    except Exception as e:
+        errmsg = f"Can't find zeta container runner: {zeta_name}"
+        logger.error(f"{errmsg}: {e}")
+        raise RuntimeError(errmsg)
+    host_ip, host_port = None, None
+    if socket_path is None:
+        logger.info(container.ports)
+        ports = container.ports["8000/tcp"][0]
+        host_ip = ports["HostIp"]
+        host_port = ports["HostPort"]
+    db.insert_zeta_runner_container(
+        function_name=zeta_name,
+        container_name=container.name,
+        container_id=container.id,
+        host_ip=host_ip,
+        host_port=host_port,
+        socket_path=socket_path,
+        prewarmed_at=time.time() if prewarmed else None
+    )
+
+
+def update_zeta_heartbeat(container_id: str, timestamp: int):
+    """
+    Update the zeta container runner Heartbeat for the specified zeta.
+
+    Attributes
+    ---
+    container_id: str
+        Full or short id of the runner container
+    """
+    if container_id:
+        # Only matches the registered runner containers: heartbeats of the ones being drained are ignored
+        db.update_zeta_runner_container_heartbeat(container_id, timestamp)
+
+
+def update_zeta_usage(zeta_name: str, usage: dict):
+    """
+    Aggregate the resource usage reported by the runner for one invocation of the specified zeta.
+
+    Attributes
+    ---
+    zeta_name: str
+    usage: dict
+        `{"wallTimeMs": float, "cpuTimeMs": float, "peakRssDeltaKb": int}`,
+        the CPU time and peak RSS delta being process-level approximations (see the runner's `accounting.py`)
+    """
+    db.update_zeta_usage(
+        function_name=zeta_name,
+        wall_time_ms=float(usage.get("wallTimeMs", 0)),
+        cpu_time_ms=float(usage.get("cpuTimeMs", 0)),
+        peak_rss_delta_kb=int(usage.get("peakRssDeltaKb", 0))
+    )
+
+
+def switch_zeta_deployment(
+    zeta_name: str,
+    runner_image,
+    container,
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    socket_path: str = None,
+    idle_timeout: float = None
+):
+    """
+    Atomically route the zeta to a new runner image and its warm runner container.
+
+    Attributes
+    ---
+    zeta_name: str
+    runner_image: docker.models.images.Image
+    container: docker.models.containers.Container
+    timeout: float
+    memory_limit_mb: int
+    socket_path: str
+        Host path of the Unix socket the runner serves HTTP on, if it doesn't publish a port
+    idle_timeout: float
+        Manual override of the adaptive idle timeout of the runner, in seconds
+    """
+    host_ip, host_port = None, None
+    if socket_path is None:
+        ports = container.ports["8000/tcp"][0]
+        host_ip = ports["HostIp"]
+        host_port = ports["HostPort"]
+    db.update_zeta_deployment(
+        name=zeta_name,
+        runner_image_id=str(runner_image.id),
+        runner_image_tag=str(runner_image.tags[0]),
+        timeout_seconds=timeout,
+        memory_limit_mb=memory_limit_mb,
+        idle_timeout_override=idle_timeout,
+        deployed_at=time.time(),
+        container_name=container.name,
+        container_id=container.id,
+        host_ip=host_ip,
+        host_port=host_port,
+        socket_path=socket_path
+    )
+
+
+def record_zeta_invocation(zeta_name: str, timestamp: float):
+    """
+    Count an invocation in the zeta invocation history.
+
+    Attributes
+    ---
+    zeta_name: str
+    timestamp: float
+    """
+    db.record_zeta_invocation(zeta_name, timestamp, int(timestamp // HISTORY_BUCKET_SECONDS))
+
+
+def record_zeta_runner_start(zeta_name: str, prewarmed: bool):
+    """
+    Count a runner start of the zeta, either pre-warmed or a cold start on demand.
+
+    Attributes
+    ---
+    zeta_name: str
+    prewarmed: bool
+    """
+    if prewarmed:
+        db.update_zeta_prewarm_stats(zeta_name, prewarm_starts=1)
+    else:
+        db.update_zeta_prewarm_stats(zeta_name, cold_starts=1)
+
+
+def record_zeta_prewarm_hit(container_name: str, timestamp: float) -> bool:
+    """
+    Record the first invocation served by a pre-warmed runner container.
+
+    Attributes
+    ---
+    container_name: str
+    timestamp: float
+    """
+    return db.update_zeta_runner_first_invocation(container_name, timestamp)
+
+
+def get_invocation_history(zeta_name: str, since: float) -> dict:
+    """
+    Returns the invocation counts of the zeta since the `since` timestamp, per history bucket.
+
+    Attributes
+    ---
+    zeta_name: str
+    since: float
+    """
+    return db.fetch_zeta_invocation_history(zeta_name, int(since // HISTORY_BUCKET_SECONDS))
+
+
+def prune_invocation_history(retention_seconds: float):
+    db.delete_zeta_invocation_history_before(int((time.time() - retention_seconds) // HISTORY_BUCKET_SECONDS))
+
+
+def record_runner_image_version(
+    zeta_name: str,
+    runner_image,
+    base_image: str,
+    created_at: float = None,
+    retired: bool = False
+):
+    """
+    Track a runner image built for the zeta, for the image garbage collector.
+    Its size is the one of its own layers, on top of the image it was built from.
+
+    Attributes
+    ---
+    zeta_name: str
+    runner_image: docker.models.images.Image
+    base_image: str
+        The base runner or dependency image the runner image was built from
+    created_at: float
+        Build time, now by default
+    retired: bool
+        To be removed, its zeta was deleted
+    """
+    try:
+        base_size = image_service.get_image(base_image).attrs.get("Size", 0)
+    except Exception:
+        base_size = 0
+    db.insert_zeta_image_version(
+        image_id=str(runner_image.id),
+        function_name=zeta_name,
+        tag=str(runner_image.tags[0]),
+        size_bytes=max(0, runner_image.attrs.get("Size", 0) - base_size),
+        created_at=time.time() if created_at is None else created_at,
+        retired=retired
+    )
+
+
+def get_runner_image_versions() -> list:
+    return db.fetch_zeta_image_versions()
+
+
+def forget_runner_image_version(image_id: str):
+    db.delete_zeta_image_version(image_id)
+
+
+def record_image_gc(removed_images: int, reclaimed_bytes: int):
+    db.update_zeta_image_gc_stats(removed_images, reclaimed_bytes, time.time())
+
+
+def get_image_gc_stats() -> dict:
+    return db.fetch_zeta_image_gc_stats()
+
+
+def record_runner_reconciliation(kept_runners: int, reaped_runners: int, failed_reaps: int, duration_ms: float):
+    db.update_zeta_reconciliation_stats(kept_runners, reaped_runners, failed_reaps, duration_ms, time.time())
+
+
+def get_runner_reconciliation_stats() -> dict:
+    return db.fetch_zeta_reconciliation_stats()
+
+
+def queue_invocation(invocation_id: str, zeta_name: str, params: bytes, max_queued: int) -> bool:
+    """
+    Queue an asynchronous invocation. Returns `False` if `max_queued` invocations are already queued.
+
+    Attributes
+    ---
+    invocation_id: str
+    zeta_name: str
+    params: bytes
+        JSON encoded event
+    max_queued: int
+    """
+    return db.insert_zeta_invocation(invocation_id, zeta_name, params, time.time(), max_queued)
+
+
+def claim_invocation() -> dict:
+    """
+    Returns the oldest queued invocation, now run by this proxy worker, or `{}` if the queue is empty.
+    """
+    return db.claim_zeta_invocation(os.getpid(), time.time())
+
+
+def finish_invocation(
+    invocation_id: str,
+    status: str,
+    result: bytes = None,
+    content_type: str = None,
+    error: str = None
+):
+    db.update_zeta_invocation_result(invocation_id, status, time.time(), result, content_type, error)
+
+
+def get_invocation(invocation_id: str) -> dict:
+    return db.fetch_zeta_invocation(invocation_id)
+
+
+def requeue_dead_worker_invocations(max_attempts: int) -> int:
+    """
+    Queue again the asynchronous invocations of the proxy workers that died running them.
+    Returns the number of invocations queued again.
+
+    Attributes
+    ---
+    max_attempts: int
+        Runs after which an invocation is failed instead
+    """
+    requeued = 0
+    for worker_pid in db.fetch_zeta_invocation_worker_pids():
+        if worker_pid != os.getpid() and not is_process_alive(worker_pid):
+            count = db.requeue_zeta_invocations_of_worker(worker_pid, max_attempts, time.time())
+            logger.warning(f"Queued {count} invocations of dead proxy worker {worker_pid} again")
+            requeued += count
+    return requeued
+
+
+def expire_invocation_results(ttl: float, max_results: int) -> int:
+    return db.delete_zeta_invocation_results(time.time() - ttl, max_results)
+
+
+def record_zeta_cold_start(zeta_name: str, cold_start_ms: float):
+    """
+    Fold a measured cold start (runner start until it answers) into the zeta cold start average.
+
+    Attributes
+    ---
+    zeta_name: str
+    cold_start_ms: float
+    """
+    db.update_zeta_cold_start(zeta_name, cold_start_ms, COLD_START_ALPHA)
+
+
+def refresh_idle_timeouts(zeta_meta_list: list):
+    """
+    Recompute the adaptive idle timeout of the zetas from their inter-arrival histograms, in place.
+
+    Attributes
+    ---
+    zeta_meta_list: list
+    """
+    for zeta_meta in zeta_meta_list:
+        try:
+            avg_cold_start_ms = zeta_meta["avg_cold_start_ms"]
+            idle_timeout = idle_timeout_service.compute_idle_timeout(
+                db.fetch_zeta_interarrival(zeta_meta["name"]),
+                db.INTERARRIVAL_BUCKET_EDGES,
+                None if avg_cold_start_ms is None else avg_cold_start_ms / 1000
+            )
+            if idle_timeout is not None and idle_timeout != zeta_meta["idle_timeout_seconds"]:
+                db.update_zeta_idle_timeout(zeta_meta["name"], idle_timeout)
+                logger.info(f"Idle timeout of zeta '{zeta_meta['name']}' adapted to {idle_timeout:.0f}s")
+                zeta_meta["idle_timeout_seconds"] = idle_timeout
+        except Exception as e:
+            logger.error(f"Unable to refresh the idle timeout of zeta '{zeta_meta['name']}': {e}")
+
+
+def update_zeta_redeploy_timings(zeta_name: str, redeploy_ms: float, switch_over_ms: float):
+    db.update_zeta_redeploy_timings(zeta_name, redeploy_ms, switch_over_ms)
+
+
+@contextmanager
+def track_inflight(container_name: str):
+    """
+    Count the enclosed invocation as in-flight for the specified runner container, across all the proxy workers.
+
+    Attributes
+    ---
+    container_name: str
+    """
+    worker_pid = os.getpid()
+    db.update_zeta_inflight(container_name, worker_pid, 1)
+    try:
+        yield
+    finally:
+        db.update_zeta_inflight(container_name, worker_pid, -1)
+
+
+def get_inflight_count(container_name: str) -> int:
+    return db.fetch_zeta_inflight_count(container_name)
+
+
+# Deletion ====================================================================
+def delete_zeta_container_metadata(zeta_name: str):
+    """
+    Delete the zeta container runner metadata for the specified zeta.
+
+    Attributes
+    ---
+    zeta_name: str
+    """
+    if not is_zeta_registered(zeta_name):
+        return
+    # Clean the metadata, along with the PNS record
+    db.delete_zeta_runner_container(zeta_name)
+
+
+def delete_zeta_metadata(zeta_name: str):
+    """
+    Delete the metadata for the zeta function
+
+    Attributes
+    ---
+    zeta_name: str
+    """
+    if not is_zeta_registered(zeta_name):
+        return
+    try:
+        delete_zeta_container_metadata(zeta_name)
+    except Exception as e:
+        logger.error(f"Unable to delete zeta container metadata: {e}")
+    try:
+        db.delete_zeta_metadata(zeta_name)
+    except Exception as e:
+        logger.error(f"Unable to delete zeta metadata: {e}")
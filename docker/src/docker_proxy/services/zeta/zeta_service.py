@@ -0,0 +1,657 @@
+from fastapi import File, UploadFile
+from starlette.concurrency import run_in_threadpool
+from services.docker import image_service, container_service
+from services import election_service
+from . import zeta_metadata as meta
+from . import pns_service as pns
+from . import zeta_utils as utils
+from . import zeta_environment as zeta_env
+from . import zeta_metadata
+from . import runner_client
+from . import payload_service as payloads
+import threading
+import httpx
+import time
+import uuid
+import logging
+import orjson
+logger = logging.getLogger(__name__)
+USAGE_HEADER = "X-Zeta-Usage"  # synced with the runner's accounting.py
+ENVELOPE_HEADER = "X-Zeta-Envelope"  # synced with the runner's main.py
+CONNECT_TIMEOUT = 5
+# Extra time given to the runner to enforce the zeta timeout itself
+RUNNER_TIMEOUT_GRACE = 5
+# Client timeout for zetas deployed without a timeout
+DEFAULT_INVOCATION_TIMEOUT = 300
+RUNNER_START_TIMEOUT = 60
+RUNNER_START_POLL_INTERVAL = 0.1
+# Blue/green redeploy: the previous runner is removed once its in-flight invocations are done
+DRAIN_GRACE = 1
+DRAIN_POLL_INTERVAL = 0.5
+# Suffix of the runners started next to another one, `<zeta_name>-<8 hex chars>`
+RUNNER_SUFFIX_LENGTH = 8
+
+
+class ZetaInvocationTimeoutError(RuntimeError):
+    pass
+
+
+async def create_zeta(
+    zeta_name: str,
+    file: UploadFile = File(...),
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout: float = None,
+    requirements: UploadFile = None
+):
+    """
+    Create/Deploy the zeta function.
+    ...
+    Attributes
+    ---
+    zeta_name : str
+        Zeta function name.
+    file : fastapi.UploadFile
+        File to use to create the runner image.
+    timeout : float
+        Hard execution timeout of an invocation, in seconds.
+    memory_limit_mb : int
+        Memory ceiling of an invocation.
+    idle_timeout : float
+        Manual override of the adaptive idle timeout of the runner, in seconds.
+    requirements : fastapi.UploadFile
+        requirements.txt of the handler, optional.
+    """
+    # Redeploy without downtime
+    if await run_in_threadpool(is_zeta_created, zeta_name):
+        logger.info("Redeploying the zeta next to its previous deployment")
+        return await redeploy_zeta(zeta_name, file, timeout, memory_limit_mb, idle_timeout, requirements)
+    # extract handler
+    logger.info("Extracting handler from input files")
+    try:
+        handler_content = await utils.extract_handler_data(file)
+        requirements_content = await utils.extract_handler_data(requirements) if requirements else None
+    except Exception as e:
+        logger.error(e)
+        raise RuntimeError("Error reading handler and extracting content")
+    # Build off the event loop: a first dependency image build takes minutes
+    return await run_in_threadpool(
+        deploy_zeta, zeta_name, handler_content, timeout, memory_limit_mb, idle_timeout, requirements_content
+    )
+
+
+def deploy_zeta(
+    zeta_name: str,
+    handler_content: str,
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout: float = None,
+    requirements_content: str = None
+) -> dict:
+    """
+    Build the runner image of a new zeta, and create its metadata, see `create_zeta`.
+    Returns the zeta metadata.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - handler_content: str
+    - timeout: float
+    - memory_limit_mb: int
+    - idle_timeout: float
+    - requirements_content: str
+    """
+    # Build runner image
+    logger.info("Build the zeta runner image")
+    try:
+        image_name, base_image = utils.build_zeta_runner_image(
+            handler_content, zeta_name, timeout, memory_limit_mb, requirements_content
+        )
+    except Exception as e:
+        logger.error(e)
+        raise RuntimeError("Error buidling runner image.")
+    # Generating zeta metadata
+    logger.info("Create zeta function metadata")
+    try:
+        zeta_meta = meta.create_zeta_metadata(zeta_name, timeout, memory_limit_mb, idle_timeout, image_name)
+        meta.record_runner_image_version(zeta_name, image_service.get_image(image_name), base_image)
+    except Exception as e:
+        logger.error("Can't create the zeta metadata: " + str(e))
+        raise RuntimeError("Error creating zeta metadata.")
+    return zeta_meta
+
+
+async def redeploy_zeta(
+    zeta_name: str,
+    file: UploadFile = File(...),
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout: float = None,
+    requirements: UploadFile = None
+):
+    """
+    Blue/green redeploy of an existing zeta:
+    - Build the new runner image and start its runner container, while the previous one keeps serving
+    - Once the new runner answers, switch the routing to it atomically (in the metadata, for every proxy worker)
+    - Drain the in-flight invocations of the previous runner in the background, then remove it and its image
+
+    The redeploy duration and the switch-over latency are recorded in the metadata
+    (`last_redeploy_ms`, `last_switch_over_ms`).
+
+    Attributes
+    ---
+    zeta_name : str
+        Zeta function name.
+    file : fastapi.UploadFile
+        File to use to create the runner image.
+    timeout : float
+        Hard execution timeout of an invocation, in seconds.
+    memory_limit_mb : int
+        Memory ceiling of an invocation.
+    idle_timeout : float
+        Manual override of the adaptive idle timeout of the runner, in seconds.
+    requirements : fastapi.UploadFile
+        requirements.txt of the handler, optional.
+    """
+    try:
+        handler_content = await utils.extract_handler_data(file)
+        requirements_content = await utils.extract_handler_data(requirements) if requirements else None
+    except Exception as e:
+        logger.error(e)
+        raise RuntimeError("Error reading handler and extracting content")
+    # Build and warm the new runner off the event loop: the previous one keeps serving
+    return await run_in_threadpool(
+        redeploy_runner, zeta_name, handler_content, timeout, memory_limit_mb, idle_timeout, requirements_content
+    )
+
+
+def redeploy_runner(
+    zeta_name: str,
+    handler_content: str,
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    idle_timeout: float = None,
+    requirements_content: str = None,
+    existing_containers: set = None,
+    existing_images: set = None
+) -> dict:
+    """
+    Blue/green redeploy of an existing zeta from its handler source, see `redeploy_zeta`.
+    Returns the zeta metadata.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - handler_content: str
+    - timeout: float
+    - memory_limit_mb: int
+    - idle_timeout: float
+    - requirements_content: str
+    - existing_containers: set
+        Names of the existing containers, from a listing shared by a bulk redeploy. Listed when `None`.
+    - existing_images: set
+        Tags of the existing images, from a listing shared by a bulk redeploy. Listed when `None`.
+    """
+    redeploy_start = time.perf_counter()
+    try:
+        image_name, base_image = utils.build_zeta_runner_image(
+            handler_content, zeta_name, timeout, memory_limit_mb, requirements_content, existing_images
+        )
+        runner_image = image_service.get_image(image_name)
+    except Exception as e:
+        logger.error(e)
+        raise RuntimeError("Error buidling runner image.")
+    container_name = next_runner_container_name(zeta_name, existing_containers)
+    try:
+        container, socket_path = start_runner_container(zeta_name, container_name, runner_image.id)
+        wait_until_runner_up(container_name)
+    except Exception as e:
+        logger.error(f"New runner of zeta '{zeta_name}' didn't start, keeping the previous deployment: {e}")
+        remove_runner(container_name, runner_image.id)
+        raise RuntimeError("Error warming the new zeta runner")
+    # Switch
+    switch_start = time.perf_counter()
+    previous = switch_runner(
+        zeta_name, runner_image, container, timeout, memory_limit_mb, socket_path, idle_timeout
+    )
+    switch_over_ms = (time.perf_counter() - switch_start) * 1000
+    meta.record_runner_image_version(zeta_name, runner_image, base_image)
+    # Drain the previous runner, its image is kept for rollback until garbage collected
+    drain_timeout = (timeout or DEFAULT_INVOCATION_TIMEOUT) + RUNNER_TIMEOUT_GRACE
+    threading.Thread(
+        target=drain_runner,
+        args=(previous.get("runner_container_name"), drain_timeout),
+        name=f"zeta-drain-{zeta_name}",
+        daemon=True
+    ).start()
+    redeploy_ms = (time.perf_counter() - redeploy_start) * 1000
+    meta.update_zeta_redeploy_timings(zeta_name, redeploy_ms, switch_over_ms)
+    logger.info(f"Redeployed zeta '{zeta_name}' in {redeploy_ms:.1f} ms, switch-over took {switch_over_ms:.3f} ms")
+    return meta.get_zeta_metadata(zeta_name)
+
+
+def switch_runner(
+    zeta_name: str,
+    runner_image,
+    container,
+    timeout: float,
+    memory_limit_mb: int,
+    socket_path: str,
+    idle_timeout: float = None
+) -> dict:
+    """
+    Route the zeta to the new runner, returns the metadata of the previous deployment.
+    """
+    # Not while a cold start of the previous deployment is in progress
+    with election_service.exclusive(f"runner-{zeta_name}"):
+        previous = meta.get_zeta_metadata(zeta_name)
+        meta.switch_zeta_deployment(
+            zeta_name, runner_image, container, timeout, memory_limit_mb, socket_path, idle_timeout
+        )
+    return previous
+
+
+def drain_runner(container_name: str, drain_timeout: float):
+    """
+    Wait for the in-flight invocations of a runner that no longer gets routed to, then remove it.
+
+    Attributes
+    ---
+    - container_name: str
+        `None` if the previous deployment had no runner container
+    - drain_timeout: float
+        Seconds after which the remaining invocations are abandoned
+    """
+    if container_name is not None:
+        # Invocations routed right before the switch may not be counted yet
+        time.sleep(DRAIN_GRACE)
+        deadline = time.monotonic() + drain_timeout
+        while meta.get_inflight_count(container_name) > 0:
+            if time.monotonic() > deadline:
+                logger.warning(f"Runner {container_name} still busy after {drain_timeout}s, removing it anyway")
+                break
+            time.sleep(DRAIN_POLL_INTERVAL)
+    remove_runner(container_name)
+    logger.info(f"Drained and removed the previous runner {container_name}")
+
+
+def remove_runner(container_name: str, image_id: str = None):
+    """
+    Remove a runner container (if any), releasing its port, and an untracked image (if any). Failures are logged.
+    """
+    if container_name is not None and container_service.does_container_exist(container_name):
+        try:
+            container_service.stop_container(container_name)
+            container_service.remove_container(container_name)
+        except Exception as e:
+            logger.warning(f"Unable to stop and remove the container {container_name}: {e}")
+    if container_name is not None:
+        runner_client.close_runner_client(container_name)
+        container_service.remove_runner_socket_dir(container_name)
+        pns.release_runner_ports(container_name)
+    if image_id is not None:
+        try:
+            image_service.delete_image(image_id)
+        except Exception as e:
+            logger.warning(f"Unable to remove the runner image {image_id}: {e}")
+
+
+# Get zeta function
+def get_zeta_metadata(zeta_name: str) -> dict:
+    return meta.get_zeta_metadata(zeta_name)
+
+
+# Delete the function(s)
+def delete_zeta(zeta_name: str, containers: dict = None):
+    """
+    Delete the specified zeta.
+    The steps to do so are as follow :
+    - Check if it exists in the metadata registry
+    - Shutdown any up containers with related images
+    - Delete metadata, retiring its images for the image garbage collector
+
+    Attributes
+    ---
+    - zeta_name: str
+    - containers: dict
+        Existing containers by name, from a listing shared by a bulk delete. Listed when `None`.
+    """
+    # Check it is in the meta registery
+    if not is_zeta_created(zeta_name):
+        raise RuntimeError("Zeta function not found")
+    if containers is None:
+        containers = container_service.get_containers_by_name()
+    # Down the container
+    for container_name in {zeta_name, meta.get_runner_container_name(zeta_name)}:
+        container = containers.get(container_name)
+        if container is not None:
+            try:
+                container_service.discard_container(container)
+                logger.info(f"Successfully removed zeta runner container: {container_name}")
+            except Exception as e:
+                logger.warning(f"Unable to stop and remove the container: {e}")
+        else:
+            logger.info(f"No container {container_name} found for {zeta_name}")
+        runner_client.close_runner_client(container_name)
+        container_service.remove_runner_socket_dir(container_name)
+    # Delete its metadata, its images are removed by the image garbage collector
+    try:
+        meta.delete_zeta_metadata(zeta_name)
+    except Exception as e:
+        logger.error(f"Unable to delete zeta metadata: {e}")
+        raise RuntimeError("Unable to delete zeta metadata")
+
+
+# Run the function ============================================================
+def cold_start_zeta(zeta_name: str, prewarm: bool = False) -> bool:
+    """
+    Cold start the zeta function.
+    Returns `False` if its runner is already running.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - prewarm: bool
+        Started ahead of the expected invocations, rather than on demand
+    """
+    # Only one proxy worker starts the runner, the others wait for it
+    with election_service.exclusive(f"runner-{zeta_name}"):
+        zeta_meta = meta.get_zeta_metadata(zeta_name)
+        if container_service.is_container_running(zeta_meta.get("runner_container_name") or zeta_name):
+            logger.info(f"Zeta runner of {zeta_name} already started by another worker")
+            return False
+        try:
+            container_name = next_runner_container_name(zeta_name)
+            start = time.perf_counter()
+            _, socket_path = start_runner_container(zeta_name, container_name, zeta_meta["runner_image_id"])
+            # Update container metadata
+            meta.update_zeta_container_metadata(zeta_name, container_name, socket_path, prewarmed=prewarm)
+        except Exception as e:
+            logger.error(e)
+            raise RuntimeError(f"Unable to run the zeta function '{zeta_name}'")
+    meta.record_zeta_runner_start(zeta_name, prewarmed=prewarm)
+    # The cold start cost feeds the adaptive idle timeout
+    threading.Thread(
+        target=measure_cold_start,
+        args=(zeta_name, container_name, start),
+        name=f"zeta-cold-start-{zeta_name}",
+        daemon=True
+    ).start()
+    return True
+
+
+def measure_cold_start(zeta_name: str, container_name: str, start: float):
+    """
+    Record the time the runner took to answer, since `start` (`time.perf_counter()`).
+    """
+    try:
+        wait_until_runner_up(container_name)
+        meta.record_zeta_cold_start(zeta_name, (time.perf_counter() - start) * 1000)
+    except Exception as e:
+        logger.warning(f"Unable to measure the cold start of zeta '{zeta_name}': {e}")
+
+
+def next_runner_container_name(zeta_name: str, existing_containers: set = None) -> str:
+    """
+    The first runner container of a zeta is named after it.
+    A runner started while another one exists (blue/green redeploy, draining) gets a suffix.
+    `existing_containers` are the names of the existing containers, listed when `None`.
+    """
+    if existing_containers is None:
+        exists = container_service.does_container_exist(zeta_name)
+    else:
+        exists = zeta_name in existing_containers
+    if not exists:
+        return zeta_name
+    return f"{zeta_name}-{uuid.uuid4().hex[:RUNNER_SUFFIX_LENGTH]}"
+
+
+def runner_owner(container_name: str, zeta_names: set) -> str:
+    """
+    Zeta a runner container belongs to, from its name (see `next_runner_container_name`), or `None`.
+    """
+    if container_name in zeta_names:
+        return container_name
+    zeta_name, _, suffix = container_name.rpartition("-")
+    if zeta_name in zeta_names and len(suffix) == RUNNER_SUFFIX_LENGTH:
+        return zeta_name
+    return None
+
+
+def start_runner_container(zeta_name: str, container_name: str, image_id: str) -> tuple:
+    """
+    Start a runner container, published on a port reserved in the PNS or serving on a Unix socket.
+    Returns `(container, socket_path)`, `socket_path` being `None` for the TCP transport.
+    """
+    uds = runner_client.uses_uds()
+    ports = {}
+    if not uds:
+        # Get dynamic port and reserve it for the zeta in the PNS
+        host_port = pns.retrieve_dynamic_port(zeta_name, container_name)
+        ports = {"8000": host_port}  # 8000 is the open container port
+    # Instanciate the container
+    container = container_service.instanciate_container_from_image(
+        container_name=container_name,
+        image_id=image_id,
+        ports=ports,
+        network=zeta_env.GLOBAL_NETWORK_NAME,
+        uds=uds
+    )
+    return container, container_service.runner_socket_path(container_name) if uds else None
+
+
+def ensure_zeta_up(zeta_name: str, zeta_meta: dict) -> dict:
+    """
+    Cold start the zeta if the runner it is routed to is not up.
+    Returns the zeta metadata, read again after a cold start: it routes to the new runner.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - zeta_meta: dict
+        The zeta metadata, read once for the invocation
+    """
+    if is_zeta_up(zeta_name, zeta_meta):
+        return zeta_meta
+    cold_start_zeta(zeta_name)
+    return meta.get_zeta_metadata(zeta_name)
+
+
+def run_zeta(zeta_name: str, params: dict = {}, accept_encoding: str = None, zeta_meta: dict = None):
+    """
+    Proxy the request to the zeta runner.
+    Returns the runner response body untouched, along with its content type and content encoding, see `invoke_runner`.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - params: dict
+    - accept_encoding: str
+        The client `Accept-Encoding` header, for a response served to the client as is
+    - zeta_meta: dict
+        The zeta metadata, when already read for the invocation
+    """
+    return invoke_runner(
+        zeta_name, "/run", orjson.dumps(params), {"content-type": "application/json"}, accept_encoding, zeta_meta
+    )
+
+
+def run_zeta_raw(
+    zeta_name: str,
+    body,
+    content_type: str,
+    content_length: str = None,
+    accept_encoding: str = None,
+    zeta_meta: dict = None
+):
+    """
+    Stream a raw body to the zeta runner, chunk by chunk, the handler receiving it as bytes.
+    Returns the runner response body untouched, along with its content type and content encoding, see `invoke_runner`.
+    Raises `PayloadTooLargeError` once the body exceeds the payload size limit.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - body: Iterable[bytes]
+    - content_type: str
+    - content_length: str
+        Forwarded when known, the body is sent chunked otherwise
+    - accept_encoding: str
+        The client `Accept-Encoding` header, for a response served to the client as is
+    - zeta_meta: dict
+        The zeta metadata, when already read for the invocation
+    """
+    headers = {"content-type": content_type}
+    if content_length:
+        headers["content-length"] = content_length
+    return invoke_runner(zeta_name, "/run/raw", payloads.iter_limited(body), headers, accept_encoding, zeta_meta)
+
+
+def invoke_runner(
+    zeta_name: str,
+    path: str,
+    content,
+    headers: dict,
+    accept_encoding: str = None,
+    zeta_meta: dict = None
+):
+    """
+    Send the invocation to the runner the zeta is routed to, and record its activity.
+    Returns `(content, content_type, content_encoding)`.
+
+    Without `accept_encoding`, the runner response is the bare handler result, uncompressed.
+    With it, the response is ready to be served to the client as is: compressed by the runner as negotiated
+    on `accept_encoding`, and a JSON one wrapped in the proxy response envelope.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - path: str
+        Runner invocation route
+    - content: bytes | Iterable[bytes]
+    - headers: dict
+    - accept_encoding: str
+        The client `Accept-Encoding` header
+    - zeta_meta: dict
+        The zeta metadata, when already read for the invocation. Read when `None`.
+    """
+    if zeta_meta is None:
+        zeta_meta = meta.get_zeta_metadata(zeta_name)
+    try:
+        container = container_service.get_container(zeta_meta.get("runner_container_name") or zeta_name)
+    except Exception:
+        raise RuntimeError(f"Unable to run the zeta function '{zeta_name}'")
+    client, base_url = runner_client.get_runner_client(container)
+    # Wait until the container is up
+    wait_until_runner_up(container.name)
+    # Apply a client timeout matching the zeta one
+    zeta_timeout = zeta_meta.get("timeout_seconds")
+    if zeta_timeout:
+        read_timeout = zeta_timeout + RUNNER_TIMEOUT_GRACE
+    else:
+        read_timeout = DEFAULT_INVOCATION_TIMEOUT
+    headers = {**headers, "accept-encoding": "identity"}
+    if accept_encoding is not None:
+        headers["accept-encoding"] = accept_encoding or "identity"
+        headers[ENVELOPE_HEADER] = "1"
+    # Proxy the request to the zeta
+    logger.info(f"Proxying request to: {zeta_name}")
+    try:
+        with meta.track_inflight(container.name), client.stream(
+            "POST",
+            url=base_url+path,
+            content=content,
+            headers=headers,
+            timeout=httpx.Timeout(read_timeout, connect=CONNECT_TIMEOUT)
+        ) as response:
+            # Raw body: a compressed response is passed through, not decoded
+            content = b"".join(response.iter_raw())
+        if response.status_code == 504:
+            raise ZetaInvocationTimeoutError(f"Zeta '{zeta_name}' timed out after {zeta_timeout}s")
+        if response.status_code == 413:
+            raise payloads.PayloadTooLargeError(f"Payload rejected by the zeta '{zeta_name}' runner")
+        if not response.is_success:
+            raise RuntimeError(f"Error running the zeta: ZETA_FUNCTION_STATUS_CODE={response.status_code}")
+        content_type = response.headers.get("content-type", "application/json")
+        content_encoding = response.headers.get("content-encoding")
+        # Runners built before the envelope support answer the bare (uncompressed) JSON result
+        if (
+            accept_encoding is not None
+            and content_type.startswith("application/json")
+            and not response.headers.get(ENVELOPE_HEADER)
+        ):
+            content = utils.wrap_runner_json_response(content)
+    except httpx.ReadTimeout:
+        raise ZetaInvocationTimeoutError(f"No response from zeta '{zeta_name}' after {read_timeout}s")
+    # Update heartbeat
+    container_id = container.id
+    now = time.time()
+    zeta_metadata.update_zeta_heartbeat(container_id, now)
+    # Feed the pre-warming forecasts
+    meta.record_zeta_invocation(zeta_name, now)
+    if zeta_meta.get("runner_container_prewarmed_at") and not zeta_meta.get("runner_container_first_invocation_at"):
+        meta.record_zeta_prewarm_hit(container.name, now)
+    # Aggregate the invocation resource usage
+    usage_header = response.headers.get(USAGE_HEADER)
+    if usage_header:
+        try:
+            meta.update_zeta_usage(zeta_name, orjson.loads(usage_header))
+        except Exception as e:
+            logger.warning(f"Unable to record the zeta usage: {e}")
+    return content, content_type, content_encoding
+
+
+# utils =======================================================================
+def is_zeta_created(zeta_name: str) -> bool:
+    is_zeta_registered = meta.is_zeta_registered(zeta_name)
+    return is_zeta_registered
+
+
+def is_zeta_up(zeta_name: str, zeta_meta: dict = None) -> bool:
+    """
+    Checks if the runner the zeta function is routed to is up and running.
+
+    Attributes
+    ---
+    - zeta_name: str
+    - zeta_meta: dict
+        The zeta metadata, when already read. Read when `None`.
+    """
+    if zeta_meta is None:
+        return is_runner_up(meta.get_runner_container_name(zeta_name))
+    return is_runner_up(zeta_meta.get("runner_container_name") or zeta_name)
+
+
+def is_runner_up(container_name: str) -> bool:
+    """
+    Checks if the runner container is up and running.
+    This verification is done in 2 steps:
+    - Verify that the container is up and in `RUNNING` state.
+    - Verify if the zeta application inside the container has started.
+
+    Attributes
+    ---
+    - container_name: str
+    """
+    # Checks if the container is running
+    if not container_service.is_container_running(container_name):
+        logger.warning("Zeta container is not RUNNING")
+        return False
+    # Checks if the app has successfully started
+    container = container_service.get_container(container_name)
+    try:
+        client, base_url = runner_client.get_runner_client(container)
+        response = client.get(base_url+"/is-running", timeout=CONNECT_TIMEOUT)
+        logger.info("Zeta container is UP")
+        return response.status_code == 200
+    except Exception:
+        logger.warning("Zeta container is not UP")
+        return False
+
+
+def wait_until_runner_up(container_name: str):
+    start_time = time.time()
+    while not is_runner_up(container_name):
+        if time.time() - start_time > RUNNER_START_TIMEOUT:
+            raise RuntimeError("Zeta function is not up. Exit due to timeout")
+        time.sleep(RUNNER_START_POLL_INTERVAL)
@@ -0,0 +1,145 @@
+from fastapi import File, UploadFile
+from services.docker import image_service, container_service
+from . import dependency_service
+import subprocess
+import tempfile
+import logging
+import uuid
+import time
+import os
+
+
+logger = logging.getLogger(__name__)
+
+
+def build_zeta_runner_image(
+    function: str,
+    zeta_name: str = "",
+    timeout: float = None,
+    memory_limit_mb: int = None,
+    requirements: str = None,
+    existing_images: set = None
+):
+    """
+    Build the runner image `<zeta_name>-zeta-runner-image-<uuid>:latest`
+    from the base image `python-base-runner:latest`, or from the dependency image of its requirements.
+    Returns `(image_name, base_image)`
+
+    Attributes
+    ---
+    - function: str
+        The handler file strigified, to be baked in the runner image.
+        (TODO: Make sure it can handle multi-file support)
+    - zeta_name: str
+        The Zeta function to be deployed
+    - timeout: float
+        Hard execution timeout of an invocation, in seconds, enforced by the runner
+    - memory_limit_mb: int
+        Memory ceiling of an invocation, enforced by the runner
+    - requirements: str
+        The requirements.txt of the handler, installed in a dependency image shared across the zetas
+    - existing_images: set
+        Tags of the existing images, from a listing shared by a bulk redeploy. Listed when `None`.
+    """
+    BASE_RUNNER = dependency_service.get_base_image(requirements, existing_images)
+    with tempfile.TemporaryDirectory() as tmpdirname:
+        # Define file paths
+        function_file_path = os.path.join(tmpdirname, "function.py")
+        dockerfile_path = os.path.join(tmpdirname, "Dockerfile")
+        # Write the function to a Python file
+        with open(function_file_path, "w") as f:
+            f.write(function)
+        # Generate a Dockerfile
+        img_uuid = uuid.uuid4()
+        dockerfile_content = f"""
+        FROM {BASE_RUNNER}
+        WORKDIR /zeta
+        ENV UNIQUE_VAR={img_uuid}
+        ENV ZETA_TIMEOUT_SECONDS={timeout or ""}
+        ENV ZETA_MEMORY_LIMIT_MB={memory_limit_mb or ""}
+        COPY function.py /zeta/handler/handler.py
+        RUN python -m compileall -q /zeta/handler
+        """
+        with open(dockerfile_path, "w") as f:
+            f.write(dockerfile_content)
+        # Build the Docker image
+        image_name = f"{zeta_name}-runner-image-{img_uuid}"
+        try:
+            image_service.build_image(
+                image_name=image_name,
+                dockerfile_path=tmpdirname
+            )
+        except subprocess.CalledProcessError as e:
+            logger.error(e)
+            raise RuntimeError("Error occurred while building the Docker image:")
+    # Return the image name, and the image it was built from
+    return image_name, BASE_RUNNER
+
+
+async def process_file(file: UploadFile = File(...)):
+    content = await file.read()
+    text = content.decode("utf-8")
+    return {"filename": file.filename, "content": text}
+
+
+def retrieve_runner_image(zeta_name: str):
+    """
+    Retrieve Image runner from the zeta function name
+    """
+    image_list = image_service.list_images()
+    for image in image_list:
+        image_tags = image.tags
+        for tag in image_tags:
+            if tag.startswith(zeta_name):
+                return image
+    return None
+
+
+def retrieve_container_hostname(container):
+    """
+    Retrieve the container hostname in the form:
+    - `http://{host_ip}:{host_port}`
+    """
+    TIMEOUT = 60
+    start_time = time.time()
+    while len(container.ports) == 0:
+        container = container_service.get_container(container.name)
+        if time.time() - start_time > TIMEOUT:
+            raise RuntimeError(
+                "Unable to retreive container hostname. Exit due to timeout"
+            )
+        time.sleep(0.5)
+    ports = container.ports["8000/tcp"][0]
+    host_ip = ports["HostIp"]
+    host_port = ports["HostPort"]
+    host_name = f"http://{host_ip}:{host_port}"
+    return host_name
+
+
+async def extract_handler_data(file: UploadFile = File(...)):
+    """
+    Read the file and extract the handler content.
+    Also used to read the requirements.txt of the handler.
+    """
+    try:
+        file_data = await process_file(file)
+        if file_data is None:
+            raise Exception("Error reading the file")
+        func = file_data["content"]
+    except Exception as e:
+        logger.error(e)
+        raise RuntimeError("Error reading file data.")
+    return func
+
+
+def wrap_runner_json_response(content: bytes) -> bytes:
+    """
+    Wrap the runner JSON response in the proxy `{"status": "Success", "response": ...}` envelope,
+    without decoding and re-encoding it.
+
+    Attributes
+    ---
+    - content: bytes
+        The runner JSON response body
+    """
+    return b'{"status":"Success","response":' + content + b'}'
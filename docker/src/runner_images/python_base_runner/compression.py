@@ -0,0 +1,73 @@
+"""
+Response compression negotiated on the `Accept-Encoding` request header: `zstd` (preferred) or `gzip`.
+`zstd` is only offered when the `zstandard` package is installed.
+
+Environment variables:
+- `ZETA_COMPRESSION_MIN_SIZE`: bodies smaller than this many bytes are sent as is (default `1024`),
+  compressing them costs more than it saves
+"""
+import gzip
+import os
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+MIN_SIZE = int(os.environ.get("ZETA_COMPRESSION_MIN_SIZE", 1024))
+GZIP_LEVEL = 6
+ZSTD_LEVEL = 3
+# In order of preference, at equal quality
+ENCODINGS = ("zstd", "gzip") if zstandard is not None else ("gzip",)
+
+
+def parse_accept_encoding(accept_encoding: str) -> dict:
+    """
+    Quality value of each coding of an `Accept-Encoding` header, e.g. `gzip;q=0.8, zstd` -> `{"gzip": 0.8, "zstd": 1.0}`
+    """
+    qualities = {}
+    for entry in accept_encoding.split(","):
+        coding, *params = entry.split(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def negotiate(accept_encoding: str, size: int) -> str:
+    """
+    Encoding to compress a body of `size` bytes with, `None` to send it as is.
+
+    Attributes
+    ---
+    - accept_encoding: str
+        The `Accept-Encoding` request header
+    - size: int
+        Size of the body, in bytes
+    """
+    if not accept_encoding or size < MIN_SIZE:
+        return None
+    qualities = parse_accept_encoding(accept_encoding)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(content: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+    if encoding == "gzip":
+        return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+    raise ValueError(f"Unsupported encoding '{encoding}'")
@@ -1,15 +1,31 @@
-from fastapi import FastAPI, HTTPException
-import socket
 import time
+IMPORT_STARTED = time.perf_counter()
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from starlette.concurrency import run_in_threadpool
+from workers import get_handler_pool, handler_timeout
+from supervisor import InvocationTimeoutError
+import logs
+import accounting
+import payloads
+import compression
+import logging
+import socket
 import importlib.util
+import inspect
+import asyncio
 import os 
 import json
+import orjson
+
+logger = logging.getLogger(__name__)
+logs.setup_logging()
 
 # Heartbeat Definition =============================================
 SOCKET_DIR = os.path.join(os.getcwd(), "tmp")
 SOCKET_PATH = os.path.join(SOCKET_DIR, "docker_proxy.sock")
 def send_heartbeat():
-    print("Sending heartbeat")
+    logger.debug("Sending heartbeat")
     try:
         container_id = os.environ['HOSTNAME']
         container_meta = {"containerId": container_id, "timestamp": time.time()}
@@ -20,13 +36,28 @@ def send_heartbeat():
         try:
             meta_bytes = json.dumps(container_meta).encode("utf-8")
             client_socket.sendall(meta_bytes)
-            print(f"[HEARTBEAT] - Heartbeat sent")
+            logger.debug("[HEARTBEAT] - Heartbeat sent")
         finally:
             client_socket.close()
     except Exception as e:
-        print(f"[HEARTBEAT] - Failed to send heartbeat: {e}")
+        logger.warning(f"[HEARTBEAT] - Failed to send heartbeat: {e}")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ready_in = time.perf_counter() - IMPORT_STARTED
+    boot_timestamp = float(os.environ.get("ZETA_BOOT_TIMESTAMP", 0))
+    since_boot = f", {(time.time() - boot_timestamp) * 1000:.1f} ms since boot" if boot_timestamp else ""
+    logger.info(f"Runner ready: {ready_in * 1000:.1f} ms from import{since_boot}")
+    # Load the handler the calls are dispatched with, once
+    try:
+        await run_in_threadpool(get_dispatch_handler)
+    except Exception:
+        logger.exception("Unable to load main_handler, retrying on the first invocation")
+    # Start the handler pool / zygote before the first request, the zygote loads the handler once
+    get_handler_pool(preload=preload_main_handler, initializer=init_pool_worker)
+    yield
 
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 @app.get("/is-running")
 def is_running():
@@ -35,24 +66,192 @@ def is_running():
         "timestamp": time.time()
     }
 
-@app.post("/run")
-def run_handler(params: dict = {}):
+class MainHandlerNotFoundError(Exception):
+    pass
+
+
+# Response Encoding ================================================
+# Synced with the proxy's zeta_service.py and zeta_utils.py
+ENVELOPE_HEADER = "X-Zeta-Envelope"
+ENVELOPE_PREFIX = b'{"status":"Success","response":'
+
+
+async def encode_response(request: Request, content: bytes, media_type: str, headers: dict) -> Response:
+    """
+    Wrap a JSON body in the proxy response envelope when the proxy asks for it,
+    and compress the body as negotiated: the proxy passes it to its client as is.
+    """
+    if media_type == "application/json" and request.headers.get(ENVELOPE_HEADER):
+        content = ENVELOPE_PREFIX + content + b"}"
+        headers[ENVELOPE_HEADER] = "1"
+    encoding = compression.negotiate(request.headers.get("accept-encoding"), len(content))
+    if encoding is not None:
+        content = await run_in_threadpool(compression.compress, content, encoding)
+        headers["content-encoding"] = encoding
+    headers["vary"] = "Accept-Encoding"
+    return Response(content=content, media_type=media_type, headers=headers)
+
+
+HANDLER_PATH = os.path.join("handler", "handler.py")
+# Set in the zygote only, in `fork` mode
+_preloaded_main_handler = None
+# (main_handler, handler.py version) loaded by this process
+_main_handler = None
+# (main_handler, is coroutine, wants stream), loaded once by the runner process
+_dispatch_handler = None
+
+
+def load_main_handler():
+    """
+    Load handler.py and return its `main_handler`.
+    """
+    # Load the handler module dynamically
+    spec = importlib.util.spec_from_file_location("handler", HANDLER_PATH)
+    handler_module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(handler_module)
+
+    # Return main_handler if it exists in handler.py
+    if not hasattr(handler_module, "main_handler"):
+        raise MainHandlerNotFoundError("main_handler function not found in handler.py")
+    return handler_module.main_handler
+
+
+def handler_version() -> tuple:
+    stat = os.stat(HANDLER_PATH)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_main_handler():
+    """
+    `main_handler`, loaded once by this process: handler.py is only loaded again when it changes.
+    """
+    global _main_handler
+    version = handler_version()
+    if _main_handler is None or _main_handler[1] != version:
+        _main_handler = (load_main_handler(), version)
+    return _main_handler[0]
+
+
+def get_dispatch_handler() -> tuple:
+    """
+    Returns `(main_handler, is_coroutine, wants_stream)`, to dispatch a call with.
+
+    The runner process loads handler.py once (see `get_main_handler`): to call it in `process` mode,
+    to await coroutine handlers and to inspect the others in `pool` and `fork` modes,
+    where sync handlers run in the workers / forked children.
+    """
+    global _dispatch_handler
+    main_handler = get_main_handler()
+    if _dispatch_handler is None or _dispatch_handler[0] is not main_handler:
+        _dispatch_handler = (
+            main_handler, inspect.iscoroutinefunction(main_handler), payloads.wants_stream(main_handler)
+        )
+    return _dispatch_handler
+
+
+async def resolve_dispatch_handler() -> tuple:
+    """
+    `get_dispatch_handler`, loading handler.py on a worker thread when it is not loaded yet or changed.
+    """
+    if _dispatch_handler is not None and _main_handler[1] == handler_version():
+        return _dispatch_handler
+    return await run_in_threadpool(get_dispatch_handler)
+
+
+def preload_main_handler():
+    """
+    Load `main_handler` once, in the zygote: the children it forks inherit it.
+    The zygote reuses the handler the runner process loaded before forking it.
+    """
+    global _preloaded_main_handler
+    logs.setup_logging(threaded=False)
+    _preloaded_main_handler = _dispatch_handler[0] if _dispatch_handler else load_main_handler()
+
+
+def init_pool_worker():
+    """
+    Set up a `pool` worker process, forked without the log listener thread of the runner process,
+    and load `main_handler` before its first call.
+    """
+    logs.setup_logging(threaded=False)
     try:
-        print("python_runner params:",params)
-        # Define the path to handler.py
-        handler_path = os.path.join("handler", "handler.py")
-        
-        # Load the handler module dynamically
-        spec = importlib.util.spec_from_file_location("handler", handler_path)
-        handler_module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(handler_module)
-        
-        # Call main_handler if it exists in handler.py
-        if hasattr(handler_module, "main_handler"):
-            response = handler_module.main_handler(params)
-            send_heartbeat()
-            return response
+        get_main_handler()
+    except Exception:
+        logger.exception("Unable to load main_handler, retrying on the first call")
+
+
+def call_main_handler(params: dict):
+    """
+    Call the (sync) `main_handler` preloaded by the zygote, or the one loaded by this (pool worker) process.
+    Defined at module level so it can be offloaded to the handler pool.
+    """
+    return (_preloaded_main_handler or get_main_handler())(params)
+
+async def invoke_main_handler(request: Request, payload, handler: tuple = None):
+    """
+    Call `main_handler` with the payload, and build the runner response.
+
+    Attributes
+    ---
+    - request: fastapi.Request
+    - payload: dict | bytes | AsyncIterator[bytes]
+    - handler: tuple
+        From `get_dispatch_handler`, resolved when `None`
+    """
+    try:
+        if handler is None:
+            handler = await resolve_dispatch_handler()
+        main_handler, is_coroutine, _ = handler
+        handler_pool = get_handler_pool()
+        # Coroutine handlers are awaited on the event loop,
+        # sync handlers run on the thread pool (or the handler pool) to keep the loop free
+        if is_coroutine:
+            with accounting.account(time.process_time) as usage:
+                response = await asyncio.wait_for(main_handler(payload), timeout=handler_timeout())
+        elif handler_pool is None:
+            response, usage = await run_in_threadpool(accounting.run_accounted, main_handler, payload)
         else:
-            raise HTTPException(status_code=404, detail="main_handler function not found in handler.py")
+            response, usage = await asyncio.wrap_future(
+                handler_pool.submit(accounting.run_accounted, call_main_handler, payload)
+            )
+        if inspect.isawaitable(response):
+            response = await response
+        await run_in_threadpool(send_heartbeat)
+        headers = {accounting.USAGE_HEADER: orjson.dumps(usage).decode()}
+        # Raw bytes are passed through untouched, anything else is encoded once, with orjson
+        if isinstance(response, (bytes, bytearray)):
+            return await encode_response(request, bytes(response), "application/octet-stream", headers)
+        return await encode_response(request, orjson.dumps(response), "application/json", headers)
+    except MainHandlerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except payloads.PayloadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except (InvocationTimeoutError, asyncio.TimeoutError):
+        raise HTTPException(status_code=504, detail=f"main_handler timed out after {handler_timeout()}s")
     except Exception as e:
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/run")
+async def run_handler(request: Request, params: dict = {}):
+    logs.log_payload(logger, "python_runner params", params)
+    return await invoke_main_handler(request, params)
+
+@app.post("/run/raw")
+async def run_handler_raw(request: Request):
+    """
+    Call `main_handler` with the raw request body: as bytes, or as a stream for the handlers asking for one.
+    """
+    try:
+        payloads.check_content_length(request.headers.get("content-length"))
+        handler = await resolve_dispatch_handler()
+        if handler[2]:
+            return await invoke_main_handler(request, payloads.iter_limited(request.stream()), handler)
+        body = await payloads.read_limited(request.stream())
+    except MainHandlerNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except payloads.PayloadTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    logs.log_payload(logger, "python_runner raw payload", body)
+    return await invoke_main_handler(request, body, handler)
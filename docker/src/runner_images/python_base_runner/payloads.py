@@ -0,0 +1,66 @@
+"""
+Raw payloads of `POST /run/raw`, read with a size limit enforced as the body streams in.
+
+`main_handler` receives the body as `bytes`. A coroutine handler whose parameter is annotated as an async iterator
+(`AsyncIterator[bytes]`, `AsyncIterable[bytes]`) receives the body stream instead, and consumes it as it arrives.
+
+Environment variables:
+- `ZETA_MAX_PAYLOAD_MB`: raw payload size limit (default `100`, `0` for no limit)
+"""
+import collections.abc
+import inspect
+import typing
+import os
+
+MAX_PAYLOAD_BYTES = int(float(os.environ.get("ZETA_MAX_PAYLOAD_MB", 100)) * 1024 * 1024)
+STREAM_ANNOTATIONS = (
+    collections.abc.AsyncIterator, collections.abc.AsyncIterable, typing.AsyncIterator, typing.AsyncIterable
+)
+
+
+class PayloadTooLargeError(Exception):
+    pass
+
+
+def check_content_length(content_length: str, limit: int = MAX_PAYLOAD_BYTES):
+    if content_length and limit > 0 and int(content_length) > limit:
+        raise PayloadTooLargeError(f"Payload of {content_length} bytes exceeds the {limit} bytes limit")
+
+
+async def iter_limited(stream, limit: int = MAX_PAYLOAD_BYTES):
+    """
+    Yield the chunks of the body stream, raising `PayloadTooLargeError` as soon as they exceed the limit.
+    """
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if limit > 0 and received > limit:
+            raise PayloadTooLargeError(f"Payload exceeds the {limit} bytes limit")
+        if chunk:
+            yield chunk
+
+
+async def read_limited(stream, limit: int = MAX_PAYLOAD_BYTES) -> bytes:
+    """
+    Read the whole body stream, within the limit.
+    """
+    chunks = []
+    async for chunk in iter_limited(stream, limit):
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+def wants_stream(handler) -> bool:
+    """
+    Whether the handler consumes the body as an async stream, from its parameter annotation.
+    """
+    if not inspect.iscoroutinefunction(handler):
+        return False
+    try:
+        parameters = list(inspect.signature(handler).parameters.values())
+    except (TypeError, ValueError):
+        return False
+    if not parameters:
+        return False
+    annotation = parameters[0].annotation
+    return (typing.get_origin(annotation) or annotation) in STREAM_ANNOTATIONS
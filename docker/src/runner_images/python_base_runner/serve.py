@@ -0,0 +1,24 @@
+"""
+Production entrypoint of the runner: serves `main:app` with the configured worker model.
+Imports are kept to the minimum, the app is only imported by the uvicorn worker(s).
+"""
+import time
+import os
+# Boot timestamp, used by the workers to log their import-to-ready time
+os.environ.setdefault("ZETA_BOOT_TIMESTAMP", str(time.time()))
+from workers import uvicorn_worker_count  # noqa: E402
+import uvicorn  # noqa: E402
+
+
+if __name__ == "__main__":
+    # Serve on a Unix socket shared with the proxy, instead of the TCP port, when set
+    uds = os.environ.get("ZETA_UDS") or None
+    if uds and os.path.exists(uds):
+        os.remove(uds)
+    uvicorn.run(
+        "main:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("ZETA_PORT", 8000)),
+        uds=uds,
+        workers=uvicorn_worker_count(),
+    )
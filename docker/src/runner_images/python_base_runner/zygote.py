@@ -0,0 +1,277 @@
+"""
+Fork server handler executor: an `Executor` running each call in a child forked from a pre-initialized zygote.
+
+The zygote process runs `preload` once (importing the runtime and the handler), then forks a child per call,
+or per batch of up to `batch_size` calls queued together. Children start warm, in a few milliseconds,
+and share the zygote memory copy-on-write: the state a call leaves behind (globals, caches...) dies with its child.
+
+- At most `max_workers` children run at once, the other calls queue in the zygote
+- Calls running longer than `timeout` seconds raise `InvocationTimeoutError`
+- Children whose RSS goes over `memory_limit_mb` raise `MemoryLimitExceededError`
+
+In both cases the child is killed, the zygote is left untouched. A dead zygote is replaced by a fresh one.
+"""
+from concurrent.futures import Executor, Future
+from multiprocessing.connection import wait
+from supervisor import InvocationTimeoutError, MemoryLimitExceededError, WorkerCrashedError, POLL_INTERVAL, PAGE_SIZE
+from collections import deque
+import multiprocessing
+import itertools
+import threading
+import atexit
+import logging
+import pickle
+import signal
+import time
+import sys
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def _rss_bytes(pid: int) -> int:
+    try:
+        with open(f"/proc/{pid}/statm") as f:
+            return int(f.read().split()[1]) * PAGE_SIZE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _run_tasks(connection, tasks: list):
+    """
+    Body of a forked child: run the tasks in order, sending each result as soon as it is ready.
+    """
+    for task_id, func, args in tasks:
+        try:
+            data = pickle.dumps((task_id, True, func(*args)))
+        except Exception as e:
+            try:
+                data = pickle.dumps((task_id, False, e))
+            except Exception:
+                # Unpicklable exception
+                data = pickle.dumps((task_id, False, RuntimeError(repr(e))))
+        connection.send_bytes(data)
+
+
+class _Child:
+    def __init__(self, pid: int, connection, tasks: list):
+        self.pid = pid
+        self.connection = connection
+        # Tasks not answered yet, the first one is running
+        self.tasks = tasks
+        self.task_started = time.monotonic()
+
+    def kill(self):
+        try:
+            os.kill(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        self.reap()
+
+    def reap(self) -> int:
+        self.connection.close()
+        _, status = os.waitpid(self.pid, 0)
+        return os.waitstatus_to_exitcode(status)
+
+
+def _zygote_main(
+    control,
+    parent_end,
+    preload,
+    max_children: int,
+    timeout: float,
+    memory_limit: int,
+    batch_size: int
+):
+    """
+    Zygote loop: single threaded, so forking it is safe.
+    Results are relayed to the parent as pickled by the children, without being decoded.
+    """
+    # Inherited end of the parent, closed so the zygote sees the parent go away
+    parent_end.close()
+    if preload is not None:
+        try:
+            preload()
+        except Exception:
+            logger.exception("Zygote preload failed, the children load the handler on each call")
+    control.send_bytes(b"ready")
+    children = {}
+    pending = deque()
+    stopping = False
+
+    def fork(tasks: list):
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        pid = os.fork()
+        if pid == 0:
+            exit_code = 0
+            try:
+                reader.close()
+                control.close()
+                for connection in children:
+                    connection.close()
+                _run_tasks(writer, tasks)
+            except BaseException:
+                exit_code = 1
+            finally:
+                sys.stdout.flush()
+                sys.stderr.flush()
+                os._exit(exit_code)
+        writer.close()
+        children[reader] = _Child(pid, reader, tasks)
+
+    def fail(child: _Child, error: Exception):
+        """
+        Answer the running task of a dead / killed child with `error`, fork the rest of its batch again.
+        """
+        del children[child.connection]
+        try:
+            control.send_bytes(pickle.dumps((child.tasks[0][0], False, error)))
+        except OSError:
+            # The parent is gone
+            pass
+        if len(child.tasks) > 1:
+            pending.extendleft(reversed(child.tasks[1:]))
+
+    # On shutdown, the queued and running calls are done first
+    while not stopping or children or pending:
+        limited = timeout is not None or memory_limit is not None
+        ready = wait(
+            ([] if stopping else [control]) + list(children),
+            timeout=POLL_INTERVAL if limited and children else None
+        )
+        for connection in ready:
+            if connection is control:
+                try:
+                    while True:
+                        task = control.recv()
+                        if task is None:
+                            stopping = True
+                            break
+                        pending.append(task)
+                        if not control.poll():
+                            break
+                except EOFError:
+                    stopping = True
+                continue
+            child = children[connection]
+            try:
+                control.send_bytes(connection.recv_bytes())
+                child.tasks.pop(0)
+                child.task_started = time.monotonic()
+            except EOFError:
+                exit_code = child.reap()
+                if child.tasks:
+                    fail(child, WorkerCrashedError(f"Handler child died (exit code {exit_code})"))
+                else:
+                    del children[connection]
+        now = time.monotonic()
+        for child in list(children.values()):
+            if not child.tasks:
+                # Done, exiting
+                continue
+            if timeout is not None and now - child.task_started > timeout:
+                child.kill()
+                fail(child, InvocationTimeoutError(f"Handler timed out after {timeout}s"))
+            elif memory_limit is not None and _rss_bytes(child.pid) > memory_limit:
+                child.kill()
+                fail(child, MemoryLimitExceededError(
+                    f"Handler exceeded its memory limit of {memory_limit // (1024 * 1024)}MB"
+                ))
+        while pending and len(children) < max_children:
+            fork([pending.popleft() for _ in range(min(batch_size, len(pending)))])
+
+
+class ZygotePool(Executor):
+    def __init__(
+        self,
+        max_workers: int,
+        preload=None,
+        timeout: float = None,
+        memory_limit_mb: int = None,
+        batch_size: int = 1
+    ):
+        self.max_workers = max_workers
+        self.preload = preload
+        self.timeout = timeout
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self.batch_size = max(1, batch_size)
+        self._context = multiprocessing.get_context()
+        self._futures = {}
+        self._task_ids = itertools.count()
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._start_zygote()
+        # Don't replace the zygote stopped on exit
+        atexit.register(self.shutdown, wait=False)
+
+    def _start_zygote(self):
+        self._connection, child_connection = self._context.Pipe()
+        self._process = self._context.Process(
+            target=_zygote_main,
+            args=(
+                child_connection, self._connection, self.preload,
+                self.max_workers, self.timeout, self.memory_limit, self.batch_size
+            ),
+            daemon=True
+        )
+        self._process.start()
+        child_connection.close()
+        # Ready once the runtime and the handler are loaded
+        started = time.perf_counter()
+        self._connection.recv_bytes()
+        logger.info(f"Zygote {self._process.pid} ready in {(time.perf_counter() - started) * 1000:.1f} ms")
+        threading.Thread(
+            target=self._read_results,
+            args=(self._connection, self._process),
+            name="zeta-zygote-reader",
+            daemon=True
+        ).start()
+
+    def submit(self, fn, /, *args, **kwargs):
+        if kwargs:
+            raise TypeError("ZygotePool.submit doesn't support keyword arguments")
+        future = Future()
+        with self._lock:
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+            task_id = next(self._task_ids)
+            self._futures[task_id] = future
+            try:
+                self._connection.send((task_id, fn, args))
+            except Exception as e:
+                del self._futures[task_id]
+                future.set_exception(e)
+        return future
+
+    def _read_results(self, connection, process):
+        while True:
+            try:
+                task_id, ok, value = pickle.loads(connection.recv_bytes())
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self._futures.pop(task_id, None)
+            if future is None:
+                continue
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
+        process.join()
+        with self._lock:
+            pending, self._futures = self._futures, {}
+            if not self._shutdown:
+                logger.warning(f"Zygote {process.pid} died (exit code {process.exitcode}), starting a new one")
+                self._start_zygote()
+        for future in pending.values():
+            future.set_exception(WorkerCrashedError(f"Zygote died (exit code {process.exitcode})"))
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        with self._lock:
+            self._shutdown = True
+            try:
+                self._connection.send(None)
+            except OSError:
+                pass
+        if wait:
+            self._process.join()
@@ -15,6 +15,25 @@ import (
 	"github.com/zeta/constants"
 )
 
+var requirementsPath string
+
+// Add the file at `path` to the multipart form, as the `field` form file
+func writeFormFile(writer *multipart.Writer, field string, path string) error {
+	file, err := os.Open(path)
+	if err != nil {
+		return fmt.Errorf("unable to read content of file '%v'", path)
+	}
+	defer file.Close()
+	part, err := writer.CreateFormFile(field, path)
+	if err != nil {
+		return fmt.Errorf("unable to initialize multipart form file: %v", err)
+	}
+	if _, err = io.Copy(part, file); err != nil {
+		return fmt.Errorf("unable to copy file content to multipart form file: %v", err)
+	}
+	return nil
+}
+
 func createHandler(cmd *cobra.Command, args []string) {
 	zetaName := args[0]
 	filepath := args[1]
@@ -23,28 +42,19 @@ func createHandler(cmd *cobra.Command, args []string) {
 		return
 	}
 
-	// read file
-	file, err := os.Open(filepath)
-	if err != nil {
-		fmt.Printf("Unable to read content of file '%v'\n", filepath)
-		return
-	}
-	defer file.Close()
-
 	// Create the multipart/form-data to send
 	var requestBody bytes.Buffer
 	writer := multipart.NewWriter(&requestBody)
-	part, err := writer.CreateFormFile("file", filepath)
-	if err != nil {
-		fmt.Printf("Unable to initialize multipart form file\n")
+	if err := writeFormFile(writer, "file", filepath); err != nil {
 		fmt.Println(err)
 		return
 	}
-	_, err = io.Copy(part, file)
-	if err != nil {
-		fmt.Printf("Unable to copy file content to multipart form file\n")
-		fmt.Println(err)
-		return
+	// Dependencies of the handler, installed in a shared dependency image
+	if requirementsPath != "" {
+		if err := writeFormFile(writer, "requirements", requirementsPath); err != nil {
+			fmt.Println(err)
+			return
+		}
 	}
 	writer.Close() // sets the boundary
 
@@ -81,3 +91,7 @@ var CreateCmd = &cobra.Command{
 	Args: cobra.ExactArgs(2),
 	Run:  createHandler,
 }
+
+func init() {
+	CreateCmd.Flags().StringVarP(&requirementsPath, "requirements", "r", "", "requirements.txt of the handler")
+}
@@ -1,39 +1,32 @@
 package cmd
 
 import (
-	"encoding/json"
 	"fmt"
-	"io"
-	"net/http"
+	"net/url"
 
 	"github.com/spf13/cobra"
-	"github.com/zeta/constants"
 )
 
+var listState string
+var listPrefix string
+
 func ListHandler(cmd *cobra.Command, args []string) {
-	url := constants.Url
-	path := "/zeta/meta"
-	resp, err := http.Get(url + path)
-	if err != nil {
-		fmt.Printf("Unable to retrieve zeta information\n")
-		return
+	query := url.Values{"fields": {"name"}}
+	if listState != "" {
+		query.Set("state", listState)
 	}
-	body, err := io.ReadAll(resp.Body)
-	if err != nil {
-		fmt.Printf("Unable to read response body\n")
+	if listPrefix != "" {
+		query.Set("prefix", listPrefix)
 	}
-
-	var myBody []map[string]interface{}
-	errjson := json.Unmarshal(body, &myBody)
-	if errjson != nil {
-		fmt.Printf("Unable to parse json\n")
-		fmt.Println(errjson)
+	zetas, err := fetchZetaMetadata(query)
+	if err != nil {
+		fmt.Println(err)
 		return
 	}
 
 	fmt.Println("List of the created zetas")
 	fmt.Println("=========================")
-	for _, zeta := range myBody {
+	for _, zeta := range zetas {
 		name := zeta["name"]
 		fmt.Printf("- %v\n", name)
 	}
@@ -46,3 +39,8 @@ var ListCmd = &cobra.Command{
 	Long:    "List the created zeta function names",
 	Run:     ListHandler,
 }
+
+func init() {
+	ListCmd.Flags().StringVar(&listState, "state", "", "only the zetas in these states (cold, warm, busy), comma separated")
+	ListCmd.Flags().StringVar(&listPrefix, "prefix", "", "only the zetas whose name starts with the prefix")
+}
@@ -0,0 +1,44 @@
+package cmd
+
+import (
+	"encoding/json"
+	"fmt"
+	"io"
+	"net/http"
+	"net/url"
+
+	"github.com/zeta/constants"
+)
+
+// Zetas fetched per metadata page
+const metaPageSize = "500"
+
+// Fetch the zeta metadata matching `query`, following the pages of the listing
+func fetchZetaMetadata(query url.Values) ([]map[string]interface{}, error) {
+	var zetas []map[string]interface{}
+	query.Set("limit", metaPageSize)
+	for {
+		resp, err := http.Get(constants.Url + "/zeta/meta?" + query.Encode())
+		if err != nil {
+			return nil, fmt.Errorf("unable to retrieve zeta information: %v", err)
+		}
+		body, err := io.ReadAll(resp.Body)
+		resp.Body.Close()
+		if err != nil {
+			return nil, fmt.Errorf("unable to read response body: %v", err)
+		}
+		if resp.StatusCode != http.StatusOK {
+			return nil, fmt.Errorf("unable to retrieve zeta information: %v %v", resp.Status, string(body))
+		}
+		var page []map[string]interface{}
+		if err := json.Unmarshal(body, &page); err != nil {
+			return nil, fmt.Errorf("unable to parse json: %v", err)
+		}
+		zetas = append(zetas, page...)
+		cursor := resp.Header.Get("X-Zeta-Next-Cursor")
+		if cursor == "" {
+			return zetas, nil
+		}
+		query.Set("cursor", cursor)
+	}
+}
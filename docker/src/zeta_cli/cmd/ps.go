@@ -6,6 +6,7 @@ import (
 	"fmt"
 	"io"
 	"net/http"
+	"net/url"
 
 	"github.com/spf13/cobra"
 	"github.com/zeta/constants"
@@ -16,21 +17,33 @@ func PsHandler(cmd *cobra.Command, args []string) {
 	if len(args) >= 1 {
 		specifiedZeta = args[0]
 	}
-	url := constants.Url
-	path := "/zeta/meta/" + specifiedZeta
-	resp, err := http.Get(url + path)
-	if err != nil {
-		fmt.Printf("Unable to retrieve zeta information\n")
-		return
-	}
-	body, err := io.ReadAll(resp.Body)
-	if err != nil {
-		fmt.Printf("Unable to read response body\n")
+	var body []byte
+	if specifiedZeta == "" {
+		// All the zetas, page by page
+		zetas, err := fetchZetaMetadata(url.Values{})
+		if err != nil {
+			fmt.Println(err)
+			return
+		}
+		if zetas == nil {
+			zetas = []map[string]interface{}{}
+		}
+		body, _ = json.Marshal(zetas)
+	} else {
+		resp, err := http.Get(constants.Url + "/zeta/meta/" + specifiedZeta)
+		if err != nil {
+			fmt.Printf("Unable to retrieve zeta information\n")
+			return
+		}
+		body, err = io.ReadAll(resp.Body)
+		if err != nil {
+			fmt.Printf("Unable to read response body\n")
+		}
 	}
 
 	// Pretty print json body
 	var indentedJsonBody bytes.Buffer
-	err = json.Indent(&indentedJsonBody, body, "", "  ")
+	err := json.Indent(&indentedJsonBody, body, "", "  ")
 	if err != nil {
 		fmt.Printf("Unable to format json\n")
 		fmt.Println(err)
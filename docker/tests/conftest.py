@@ -0,0 +1,24 @@
+"""
+The docker proxy tests run against the fake container backend, each on a fresh metadata database.
+Run from the `docker/` directory: `python -m pytest tests`
+"""
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "docker_proxy"))
+os.environ.setdefault("ZETA_CONTAINER_BACKEND", "fake")
+# Write through, the tests read what they just wrote
+os.environ.setdefault("ZETA_DB_WRITE_BATCH_INTERVAL", "0")
+
+import pytest  # noqa: E402
+from services.zeta import db  # noqa: E402
+
+
+@pytest.fixture
+def metadata_db(tmp_path, monkeypatch):
+    monkeypatch.setattr(db, "DB_PATH", str(tmp_path / "zeta_metadata.db"))
+    # The in-flight counts of this process, as written in the previous database
+    monkeypatch.setattr(db, "_inflight_counts", {})
+    monkeypatch.setattr(db, "_flushed_inflight", {})
+    db.initialize_db()
+    return db
@@ -0,0 +1,52 @@
+from services.zeta import idle_timeout_service
+from services.zeta.db import INTERARRIVAL_BUCKET_EDGES
+
+
+def histogram(gap: float, count: int = 20) -> dict:
+    """
+    `count` inter-arrivals of `gap` seconds
+    """
+    return {INTERARRIVAL_BUCKET_EDGES.index(gap): count}
+
+
+def test_not_enough_samples():
+    samples = int(idle_timeout_service.MIN_SAMPLES) - 1
+    assert idle_timeout_service.compute_idle_timeout(histogram(45, samples), INTERARRIVAL_BUCKET_EDGES) is None
+
+
+def test_frequent_zeta_stays_warm_between_calls():
+    timeout = idle_timeout_service.compute_idle_timeout(histogram(45), INTERARRIVAL_BUCKET_EDGES)
+    assert timeout == round(45 * idle_timeout_service.TIMEOUT_MARGIN)
+
+
+def test_rare_zeta_idles_out_quickly():
+    timeout = idle_timeout_service.compute_idle_timeout(histogram(86400), INTERARRIVAL_BUCKET_EDGES)
+    assert timeout == idle_timeout_service.IDLE_TIMEOUT_MIN
+
+
+def test_unbounded_gaps_idle_out_quickly():
+    timeout = idle_timeout_service.compute_idle_timeout({len(INTERARRIVAL_BUCKET_EDGES): 20}, INTERARRIVAL_BUCKET_EDGES)
+    assert timeout == idle_timeout_service.IDLE_TIMEOUT_MIN
+
+
+def test_slow_cold_start_keeps_the_runner_warm_longer():
+    fast = idle_timeout_service.compute_idle_timeout(histogram(600), INTERARRIVAL_BUCKET_EDGES, cold_start_seconds=1)
+    slow = idle_timeout_service.compute_idle_timeout(histogram(600), INTERARRIVAL_BUCKET_EDGES, cold_start_seconds=20)
+    assert fast == idle_timeout_service.IDLE_TIMEOUT_MIN
+    assert slow == round(600 * idle_timeout_service.TIMEOUT_MARGIN)
+
+
+def test_timeout_is_bounded():
+    timeout = idle_timeout_service.compute_idle_timeout(
+        histogram(1800), INTERARRIVAL_BUCKET_EDGES, cold_start_seconds=60
+    )
+    # Not the gap with its margin
+    assert timeout == idle_timeout_service.IDLE_TIMEOUT_MAX
+
+
+def test_effective_idle_timeout_precedence():
+    assert idle_timeout_service.effective_idle_timeout(
+        {"idle_timeout_override": 120, "idle_timeout_seconds": 50}, 30
+    ) == 120
+    assert idle_timeout_service.effective_idle_timeout({"idle_timeout_seconds": 50}, 30) == 50
+    assert idle_timeout_service.effective_idle_timeout({}, 30) == 30
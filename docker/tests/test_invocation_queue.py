@@ -0,0 +1,45 @@
+WORKER_PID = 4242
+
+
+def queue(metadata_db, *invocation_ids, max_queued: int = 100) -> list:
+    return [
+        metadata_db.insert_zeta_invocation(invocation_id, "zqueue", b"{}", created_at, max_queued)
+        for created_at, invocation_id in enumerate(invocation_ids)
+    ]
+
+
+def test_claims_the_oldest_invocation_once(metadata_db):
+    queue(metadata_db, "first", "second")
+    first = metadata_db.claim_zeta_invocation(WORKER_PID, 10)
+    second = metadata_db.claim_zeta_invocation(WORKER_PID + 1, 11)
+    assert (first["id"], first["attempts"]) == ("first", 1)
+    assert second["id"] == "second"
+    assert metadata_db.claim_zeta_invocation(WORKER_PID, 12) == {}
+    assert metadata_db.fetch_zeta_invocation("first")["status"] == "running"
+
+
+def test_queue_is_bounded(metadata_db):
+    assert queue(metadata_db, "first", "second", "third", max_queued=2) == [True, True, False]
+    # Claimed invocations no longer count
+    metadata_db.claim_zeta_invocation(WORKER_PID, 10)
+    assert queue(metadata_db, "third", max_queued=2) == [True]
+
+
+def test_requeues_the_invocations_of_a_dead_worker(metadata_db):
+    queue(metadata_db, "first", "second")
+    metadata_db.claim_zeta_invocation(WORKER_PID, 10)
+    metadata_db.claim_zeta_invocation(WORKER_PID + 1, 10)
+    assert metadata_db.requeue_zeta_invocations_of_worker(WORKER_PID, 3, 20) == 1
+    assert metadata_db.fetch_zeta_invocation("first")["status"] == "queued"
+    assert metadata_db.fetch_zeta_invocation("second")["status"] == "running"
+    claimed = metadata_db.claim_zeta_invocation(WORKER_PID + 1, 30)
+    assert (claimed["id"], claimed["attempts"]) == ("first", 2)
+
+
+def test_fails_the_invocations_out_of_attempts(metadata_db):
+    queue(metadata_db, "first")
+    metadata_db.claim_zeta_invocation(WORKER_PID, 10)
+    assert metadata_db.requeue_zeta_invocations_of_worker(WORKER_PID, 1, 20) == 0
+    invocation = metadata_db.fetch_zeta_invocation("first")
+    assert (invocation["status"], invocation["finished_at"]) == ("failed", 20)
+    assert metadata_db.claim_zeta_invocation(WORKER_PID, 30) == {}
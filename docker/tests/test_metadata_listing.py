@@ -0,0 +1,87 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from controllers import zeta_controller
+import pytest
+
+NAMES = ("zeta-a", "zeta-b", "zeta-c", "zeta-d", "zeta-e")
+
+
+@pytest.fixture
+def client(metadata_db):
+    for name in NAMES:
+        metadata_db.insert_zeta_function(name, 0, None)
+    app = FastAPI()
+    app.include_router(zeta_controller.router, prefix="/zeta")
+    return TestClient(app)
+
+
+def start_runner(metadata_db, name: str) -> str:
+    container_name = f"{name}-runner"
+    metadata_db.insert_zeta_runner_container(name, container_name, f"{name}-id", "127.0.0.1", "8001")
+    return container_name
+
+
+def test_pages_follow_the_cursor(client):
+    names, cursor = [], None
+    while True:
+        response = client.get("/zeta/meta", params={"limit": 2, "cursor": cursor, "fields": "name"})
+        assert response.status_code == 200
+        page = response.json()
+        assert len(page) <= 2
+        names += [zeta["name"] for zeta in page]
+        cursor = response.headers.get("X-Zeta-Next-Cursor")
+        if cursor is None:
+            break
+    assert names == list(NAMES)
+
+
+def test_invalid_cursor(client):
+    assert client.get("/zeta/meta", params={"cursor": "not a cursor"}).status_code == 400
+
+
+def test_not_modified_until_the_metadata_changes(client, metadata_db):
+    etag = client.get("/zeta/meta").headers["ETag"]
+    assert client.get("/zeta/meta", headers={"If-None-Match": etag}).status_code == 304
+    metadata_db.insert_zeta_function("zeta-f", 0, None)
+    response = client.get("/zeta/meta", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_etag_covers_the_listing_parameters(client):
+    etags = {
+        client.get("/zeta/meta", params=params).headers["ETag"]
+        for params in ({}, {"limit": 2}, {"prefix": "zeta-a"}, {"state": "warm"}, {"fields": "name"})
+    }
+    assert len(etags) == 5
+
+
+def test_structure_listing_ignores_the_traffic(client, metadata_db):
+    container_name = start_runner(metadata_db, "zeta-a")
+    params = {"fields": "name,timeout_seconds"}
+    etag = client.get("/zeta/meta", params=params).headers["ETag"]
+    metadata_db.update_zeta_inflight(container_name, 1, 1)
+    metadata_db.update_zeta_runner_container_heartbeat("zeta-a-id", 100)
+    assert client.get("/zeta/meta", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_state_listing_follows_busy_runners(client, metadata_db):
+    container_name = start_runner(metadata_db, "zeta-a")
+    params = {"fields": "name", "state": "busy"}
+    response = client.get("/zeta/meta", params=params)
+    assert response.json() == []
+    metadata_db.update_zeta_inflight(container_name, 1, 1)
+    response = client.get("/zeta/meta", params=params, headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 200
+    assert response.json() == [{"name": "zeta-a"}]
+
+
+def test_inflight_count_changes_only_bump_on_busy_idle_transitions(client, metadata_db):
+    container_name = start_runner(metadata_db, "zeta-a")
+    metadata_db.update_zeta_inflight(container_name, 1, 1)
+    etag = client.get("/zeta/meta").headers["ETag"]
+    metadata_db.update_zeta_inflight(container_name, 2, 1)
+    metadata_db.update_zeta_inflight(container_name, 1, -1)
+    assert client.get("/zeta/meta", headers={"If-None-Match": etag}).status_code == 304
+    metadata_db.update_zeta_inflight(container_name, 2, -1)
+    assert client.get("/zeta/meta", headers={"If-None-Match": etag}).status_code == 200
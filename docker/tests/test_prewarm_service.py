@@ -0,0 +1,56 @@
+from services.zeta import prewarm_service
+from services.zeta.zeta_metadata import HISTORY_BUCKET_SECONDS
+
+DAY = 24 * 3600
+# 10:00 on some day, on a bucket boundary
+NOW = 20000 * DAY + 10 * 3600
+
+
+def bucket(timestamp: float) -> int:
+    return int(timestamp // HISTORY_BUCKET_SECONDS)
+
+
+def test_periodic_forecast_daily():
+    history = {bucket(NOW - k * DAY): 1 for k in (1, 2, 3)}
+    assert prewarm_service.periodic_forecast(history, NOW, 30) == DAY
+
+
+def test_periodic_forecast_needs_observed_periods():
+    history = {bucket(NOW - DAY): 1}
+    assert prewarm_service.periodic_forecast(history, NOW, 30) is None
+    assert prewarm_service.periodic_forecast({}, NOW, 30) is None
+
+
+def test_periodic_forecast_ignores_missed_windows():
+    # Invoked one day out of three at this time
+    history = {bucket(NOW - DAY): 1, bucket(NOW - 2 * DAY + 3 * 3600): 1, bucket(NOW - 3 * DAY + 3 * 3600): 1}
+    assert prewarm_service.periodic_forecast(history, NOW, 30) is None
+
+
+def test_ewma_forecast_regular_gaps():
+    history = {bucket(NOW - k * 600): 1 for k in (1, 2, 3, 4)}
+    assert prewarm_service.ewma_forecast(history, NOW, 30) == NOW
+
+
+def test_ewma_forecast_next_invocation_out_of_the_window():
+    history = {bucket(NOW - 300 - k * 600): 1 for k in (0, 1, 2, 3)}
+    assert prewarm_service.ewma_forecast(history, NOW, 30) is None
+    assert prewarm_service.ewma_forecast(history, NOW, 300) == NOW + 300
+
+
+def test_ewma_forecast_irregular_gaps():
+    history = {bucket(NOW - gap): 1 for gap in (600, 660, 1560, 1680)}
+    assert prewarm_service.ewma_forecast(history, NOW, 30) is None
+
+
+def test_ewma_forecast_needs_enough_gaps():
+    history = {bucket(NOW - k * 600): 1 for k in (1, 2, 3)}
+    assert prewarm_service.ewma_forecast(history, NOW, 30) is None
+
+
+def test_forecast_prefers_periodicity():
+    history = {bucket(NOW - k * DAY): 1 for k in (1, 2, 3)}
+    history.update({bucket(NOW - k * 600): 1 for k in (1, 2, 3, 4)})
+    assert prewarm_service.forecast(history, NOW, 30).startswith("periodic")
+    del history[bucket(NOW - DAY)], history[bucket(NOW - 2 * DAY)]
+    assert prewarm_service.forecast(history, NOW, 30).startswith("ewma")
@@ -0,0 +1,95 @@
+from services.docker import container_service
+from services.zeta import zeta_service, zeta_environment, zeta_metadata as meta, pns_service as pns
+import threading
+import pytest
+import orjson
+import time
+
+HANDLER = """
+import time
+
+def main_handler(params):
+    time.sleep(params.get("sleep", 0))
+    return {{"version": {version}}}
+"""
+
+
+def wait_for(condition, timeout: float = 5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def invoke(zeta_name: str, params: dict = {}) -> dict:
+    content, _, _ = zeta_service.run_zeta(zeta_name, params)
+    return orjson.loads(content)
+
+
+@pytest.fixture
+def zeta(metadata_db, tmp_path, monkeypatch, request):
+    """
+    A zeta deployed with the version 1 of its handler, its runner started.
+    """
+    monkeypatch.setattr(container_service, "HEARTBEAT_SOCKET_DIR", str(tmp_path / "heartbeat"))
+    monkeypatch.setattr(zeta_service, "DRAIN_GRACE", 0)
+    monkeypatch.setattr(zeta_service, "DRAIN_POLL_INTERVAL", 0.01)
+    zeta_environment.setup_environment()
+    zeta_name = f"zredeploy{request.node.name.rpartition('_')[2]}"
+    zeta_service.deploy_zeta(zeta_name, HANDLER.format(version=1))
+    zeta_service.cold_start_zeta(zeta_name)
+    yield zeta_name
+    for container_name in container_service.get_containers_by_name():
+        if zeta_service.runner_owner(container_name, {zeta_name}):
+            zeta_service.remove_runner(container_name)
+
+
+def test_cutover_routes_to_the_new_runner(zeta):
+    previous = meta.get_runner_container_name(zeta)
+    assert invoke(zeta) == {"version": 1}
+    zeta_service.redeploy_runner(zeta, HANDLER.format(version=2))
+    current = meta.get_runner_container_name(zeta)
+    assert current != previous
+    assert invoke(zeta) == {"version": 2}
+    # Nothing in flight, the previous runner is removed right away, with its port
+    assert wait_for(lambda: not container_service.does_container_exist(previous))
+    assert set(pns.get_port_containers().values()) == {current}
+
+
+def test_inflight_invocation_finishes_on_the_previous_runner(zeta):
+    previous = meta.get_runner_container_name(zeta)
+    results = []
+    inflight = threading.Thread(target=lambda: results.append(invoke(zeta, {"sleep": 1})))
+    inflight.start()
+    assert wait_for(lambda: meta.get_inflight_count(previous) > 0)
+    zeta_service.redeploy_runner(zeta, HANDLER.format(version=2))
+    current = meta.get_runner_container_name(zeta)
+    assert invoke(zeta) == {"version": 2}
+    # Draining: the previous runner keeps its port, no other runner can be given it
+    assert container_service.does_container_exist(previous)
+    assert set(pns.get_port_containers().values()) == {previous, current}
+    inflight.join(5)
+    assert results == [{"version": 1}]
+    assert wait_for(lambda: not container_service.does_container_exist(previous))
+    assert set(pns.get_port_containers().values()) == {current}
+
+
+def test_rollback_when_the_new_runner_fails_its_health_check(zeta, monkeypatch):
+    previous = meta.get_runner_container_name(zeta)
+    wait_until_runner_up = zeta_service.wait_until_runner_up
+
+    def fail_new_runner(container_name: str):
+        if container_name != previous:
+            raise RuntimeError("Zeta function is not up. Exit due to timeout")
+        wait_until_runner_up(container_name)
+
+    monkeypatch.setattr(zeta_service, "wait_until_runner_up", fail_new_runner)
+    with pytest.raises(RuntimeError):
+        zeta_service.redeploy_runner(zeta, HANDLER.format(version=2))
+    # Still served by the previous deployment, the new runner is gone with its port
+    assert meta.get_runner_container_name(zeta) == previous
+    assert invoke(zeta) == {"version": 1}
+    assert [name for name in container_service.get_containers_by_name(all=True) if name.startswith(zeta)] == [previous]
+    assert set(pns.get_port_containers().values()) == {previous}
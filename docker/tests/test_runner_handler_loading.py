@@ -0,0 +1,74 @@
+"""
+handler.py is loaded once per runner process, not on every call.
+The runner runs in a subprocess, each load of handler.py appends a line to `loads.txt`.
+"""
+import os
+import subprocess
+import sys
+
+RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "runner_images", "python_base_runner")
+HANDLER = '''
+import os
+
+with open("loads.txt", "a") as loads:
+    loads.write(f"{os.getpid()}\\n")
+
+def main_handler(params):
+    return params
+'''
+SCRIPT = f'''
+import sys
+sys.path.insert(0, {os.path.abspath(RUNNER)!r})
+from fastapi.testclient import TestClient
+import main
+
+with TestClient(main.app) as client:
+    for call in range(3):
+        assert client.post("/run", json={{"call": call}}).status_code == 200
+'''
+
+
+def run_runner(tmp_path, **env) -> list:
+    """
+    Run 3 calls, returns the pids of the processes that loaded handler.py, once per load.
+    """
+    (tmp_path / "handler").mkdir()
+    (tmp_path / "handler" / "handler.py").write_text(HANDLER)
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=tmp_path, env=dict(os.environ, **env),
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    return (tmp_path / "loads.txt").read_text().split()
+
+
+def test_pool_worker_loads_the_handler_once(tmp_path):
+    loads = run_runner(tmp_path, ZETA_WORKER_MODE="pool", ZETA_WORKERS="1")
+    # By the runner process, the pool worker forked from it inherits the loaded handler
+    assert len(loads) == 1
+
+
+def test_process_mode_loads_the_handler_once(tmp_path):
+    assert len(run_runner(tmp_path, ZETA_WORKER_MODE="process")) == 1
+
+
+def test_changed_handler_is_loaded_again(tmp_path):
+    (tmp_path / "handler").mkdir()
+    (tmp_path / "handler" / "handler.py").write_text("def main_handler(params):\n    return 'first'\n")
+    script = f'''
+import sys, os
+sys.path.insert(0, {os.path.abspath(RUNNER)!r})
+from fastapi.testclient import TestClient
+import main
+
+with TestClient(main.app) as client:
+    assert client.post("/run", json={{}}).json() == "first"
+    with open("handler/handler.py", "w") as handler:
+        handler.write("def main_handler(params):\\n    return 'second, updated'\\n")
+    assert client.post("/run", json={{}}).json() == "second, updated"
+'''
+    result = subprocess.run(
+        [sys.executable, "-c", script], cwd=tmp_path, env=dict(os.environ, ZETA_WORKER_MODE="process"),
+        capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
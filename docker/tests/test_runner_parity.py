@@ -0,0 +1,22 @@
+"""
+The docker and k8s python base runners share their worker modules, copied in each runner build context.
+The k8s copies only differ by the `zeta_` prefix of their module names.
+"""
+import os
+import re
+
+import pytest
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..")
+DOCKER_RUNNER = os.path.join(ROOT, "docker", "src", "runner_images", "python_base_runner")
+K8S_RUNNER = os.path.join(ROOT, "k8s", "zeta-base-runners", "python", "base-runner")
+SHARED_MODULES = ("accounting", "compression", "supervisor", "workers", "zygote")
+
+
+@pytest.mark.parametrize("module", SHARED_MODULES)
+def test_k8s_runner_module_matches_docker_runner(module):
+    with open(os.path.join(DOCKER_RUNNER, f"{module}.py")) as f:
+        docker_source = f.read()
+    with open(os.path.join(K8S_RUNNER, f"zeta_{module}.py")) as f:
+        k8s_source = f.read()
+    assert re.sub(r"\bzeta_(?=(%s)\b)" % "|".join(SHARED_MODULES), "", k8s_source) == docker_source
@@ -0,0 +1,38 @@
+"""
+The records logged by a handler running in a `pool` worker get written, by the worker itself.
+The runner runs in a subprocess, its logging setup replaces the root handlers.
+"""
+import os
+import subprocess
+import sys
+
+RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src", "runner_images", "python_base_runner")
+HANDLER = '''
+import logging
+
+def main_handler(params):
+    logging.getLogger("handler").warning(f"handled call {params['call']}")
+    return {}
+'''
+SCRIPT = f'''
+import sys
+sys.path.insert(0, {os.path.abspath(RUNNER)!r})
+from fastapi.testclient import TestClient
+import main
+
+with TestClient(main.app) as client:
+    for call in range(2):
+        assert client.post("/run", json={{"call": call}}).status_code == 200
+'''
+
+
+def test_pool_worker_records_are_written(tmp_path):
+    (tmp_path / "handler").mkdir()
+    (tmp_path / "handler" / "handler.py").write_text(HANDLER)
+    env = dict(os.environ, ZETA_WORKER_MODE="pool", ZETA_WORKERS="1")
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=tmp_path, env=env, capture_output=True, text=True, timeout=60
+    )
+    assert result.returncode == 0, result.stderr
+    assert "handled call 0" in result.stderr
+    assert "handled call 1" in result.stderr
@@ -0,0 +1,32 @@
+from fastapi import UploadFile
+from services.zeta import zeta_service, zeta_utils
+import threading
+import asyncio
+import pytest
+import io
+
+HANDLER = b"def main_handler(params):\n    return params\n"
+
+
+def test_first_create_builds_off_the_event_loop(metadata_db, monkeypatch):
+    building, release = threading.Event(), threading.Event()
+
+    def build_zeta_runner_image(*args):
+        building.set()
+        release.wait(5)
+        raise RuntimeError("Build stopped by the test")
+
+    monkeypatch.setattr(zeta_utils, "build_zeta_runner_image", build_zeta_runner_image)
+
+    async def create():
+        task = asyncio.create_task(
+            zeta_service.create_zeta("zbuilding", UploadFile(io.BytesIO(HANDLER), filename="handler.py"))
+        )
+        assert await asyncio.to_thread(building.wait, 5)
+        # The event loop keeps serving while the image builds
+        assert not task.done()
+        release.set()
+        with pytest.raises(RuntimeError):
+            await task
+
+    asyncio.run(create())
@@ -0,0 +1,52 @@
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from controllers import zeta_controller
+from services.docker import container_service
+from services.zeta import zeta_service, zeta_environment, db
+import pytest
+
+HANDLER = "def main_handler(params):\n    return {'invoked': True}\n"
+
+
+@pytest.fixture
+def client(metadata_db, tmp_path, monkeypatch):
+    monkeypatch.setattr(container_service, "HEARTBEAT_SOCKET_DIR", str(tmp_path / "heartbeat"))
+    zeta_environment.setup_environment()
+    zeta_service.deploy_zeta("zinvoked", HANDLER)
+    app = FastAPI()
+    app.include_router(zeta_controller.router, prefix="/zeta")
+    yield TestClient(app)
+    zeta_service.remove_runner(metadata_db.fetch_zeta_function_by_name("zinvoked").get("runner_container_name"))
+
+
+@pytest.fixture
+def metadata_reads(monkeypatch):
+    reads = []
+    fetch_zeta_function_by_name = db.fetch_zeta_function_by_name
+
+    def count_reads(name: str) -> dict:
+        reads.append(name)
+        return fetch_zeta_function_by_name(name)
+
+    monkeypatch.setattr(db, "fetch_zeta_function_by_name", count_reads)
+    return reads
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/zeta/run/zinvoked", {"json": {"a": 1}}),
+    ("/zeta/run/zinvoked/raw", {"content": b'{"a": 1}', "headers": {"content-type": "application/json"}}),
+])
+def test_warm_invocation_reads_the_metadata_once(client, metadata_reads, path, body):
+    # Cold start: read again once routed to the new runner
+    assert client.post(path, **body).status_code == 200
+    assert len(metadata_reads) > 1
+    metadata_reads.clear()
+    response = client.post(path, **body)
+    assert response.status_code == 200
+    assert response.json() == {"status": "Success", "response": {"invoked": True}}
+    assert metadata_reads == ["zinvoked"]
+
+
+def test_unknown_zeta(client, metadata_reads):
+    assert client.post("/zeta/run/unknown", json={}).status_code == 404
+    assert client.post("/zeta/run/unknown/raw", content=b"").status_code == 404
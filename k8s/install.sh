@@ -39,6 +39,16 @@ do
   sleep 5
 done
 
+# Runner concurrency metrics, for the concurrency HPA
+if [ "${APP_RUNNER_AUTOSCALING_MODE:-resource}" = "concurrency" ]; then
+    echo
+    echo "> deploying metrics"
+    (
+        cd "$PWD/manifests/metrics" || exit 1
+        ./init.sh
+    )
+fi
+
 # Deploying zeta services
 export SPRING_DATASOURCE_URL="jdbc:postgresql://db-rw.zeta.svc.cluster.local:5432/zeta"
 export SPRING_DATASOURCE_USERNAME="$(kubectl get secret -n zeta db-app -o jsonpath='{.data.username}' | base64 --decode)"
@@ -58,6 +68,11 @@ export APP_OBJECT_STORAGE_BUCKET="zeta"
 
 export APP_RUNNER_VERSION="0.0.1"
 export APP_RUNNER_BASE_IMAGE="registry.zeta.svc.cluster.local:5000/zeta-base-runner-python:0.0.1"
+# resource: CPU / memory HPA, concurrency: HPA on the runners /metrics (requires the Prometheus adapter rules)
+export APP_RUNNER_AUTOSCALING_MODE="${APP_RUNNER_AUTOSCALING_MODE:-resource}"
+export APP_RUNNER_AUTOSCALING_TARGET_INFLIGHT="4"
+export APP_RUNNER_AUTOSCALING_TARGET_REQUEST_RATE="20"
+export APP_RUNNER_AUTOSCALING_TARGET_QUEUE_SECONDS="100m"
 export APP_NAMESPACE="zeta"
 export APP_IMAGE_ENGINE_URL="http://zeta-image-engine.zeta.svc.cluster.local:6969"
 
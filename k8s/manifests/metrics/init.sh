@@ -0,0 +1,15 @@
+#!/bin/sh
+
+helm repo add prometheus-community https://prometheus-community.github.io/helm-charts
+helm repo update
+
+# Scrapes the pods annotated with prometheus.io/scrape, the runners serve /metrics
+helm install prometheus prometheus-community/prometheus \
+  --set alertmanager.enabled=false \
+  --set prometheus-pushgateway.enabled=false \
+  -n zeta
+
+# Serves the runner metrics on the custom metrics API, for the concurrency HPA
+helm install prometheus-adapter prometheus-community/prometheus-adapter \
+  -f prometheus-adapter-values.yaml \
+  -n zeta
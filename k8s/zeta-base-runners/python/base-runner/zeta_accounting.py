@@ -0,0 +1,51 @@
+"""
+Per-invocation resource accounting: wall time, CPU time and peak RSS delta.
+
+The usage is returned to the caller in the `X-Zeta-Usage` response header, as compact JSON:
+`{"wallTimeMs": float, "cpuTimeMs": float, "peakRssDeltaKb": int}`
+- `wallTimeMs`: elapsed time of the call
+- `cpuTimeMs`: CPU time of the thread running the call, specific to the call for sync handlers.
+  Coroutine handlers share the event loop thread: the CPU time of the whole process during the call is reported,
+  the server and the concurrent invocations included (a process-level approximation)
+- `peakRssDeltaKb`: how much the call raised the peak RSS of the process (`ru_maxrss`), a process-level
+  approximation: `0` unless the process goes over its previous high-water mark, which a previous call of the same
+  worker may have set, and the concurrent calls of the process are counted in.
+  It is specific to the call for a child forked per call (`fork` mode, batches of 1).
+"""
+from contextlib import contextmanager
+import resource
+import time
+
+USAGE_HEADER = "X-Zeta-Usage"
+
+
+def max_rss_kb() -> int:
+    # High-water mark of the process since it started, in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+@contextmanager
+def account(cpu_clock=time.thread_time):
+    """
+    Measure the enclosed block, see the module docstring for what is measured.
+    `cpu_clock` defaults to the current thread CPU time,
+    use `time.process_time` when the block shares its thread (coroutines on the event loop).
+    """
+    usage = {}
+    wall_start, cpu_start, rss_start = time.perf_counter(), cpu_clock(), max_rss_kb()
+    try:
+        yield usage
+    finally:
+        usage["wallTimeMs"] = round((time.perf_counter() - wall_start) * 1000, 3)
+        usage["cpuTimeMs"] = round((cpu_clock() - cpu_start) * 1000, 3)
+        usage["peakRssDeltaKb"] = max_rss_kb() - rss_start
+
+
+def run_accounted(func, *args):
+    """
+    Call `func(*args)` in the current thread and return `(result, usage)`.
+    Defined at module level so it can be offloaded to the handler pool.
+    """
+    with account() as usage:
+        result = func(*args)
+    return result, usage
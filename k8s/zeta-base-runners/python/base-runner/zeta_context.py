@@ -0,0 +1,154 @@
+"""
+Runner-managed context, for the warm state handlers keep across invocations.
+
+Each invocation gets a `Context` (see `zeta_types`) with its `zetaName`, `invocationId` and `deadline`.
+The context also gives access to state living as long as the runner worker process:
+- `context.cache`: a bounded LRU scratch cache, for parsed configs, compiled regexes...
+- `context.once(key, factory)`: runs `factory()` once per worker process and keeps its result, for client pools...
+- `zetaInit(context)`: optional function of the user module, run once per worker process before its first invocation
+
+Worker processes don't share this state: each uvicorn worker (and each `pool` worker) has its own.
+
+Environment variables:
+- `ZETA_NAME`: name of the zeta, set by the deployment
+- `ZETA_CONTEXT_CACHE_SIZE`: entries kept in the scratch cache (default `128`)
+"""
+from collections import OrderedDict
+import importlib
+import threading
+import logging
+import uuid
+import time
+import os
+
+ZETA_NAME = os.environ.get("ZETA_NAME", "")
+CACHE_SIZE = int(os.environ.get("ZETA_CONTEXT_CACHE_SIZE", 128))
+INVOCATION_ID_HEADER = "X-Zeta-Invocation-Id"
+USER_MODULE = "user.zeta"
+INIT_HOOK = "zetaInit"
+logger = logging.getLogger(__name__)
+_MISSING = object()
+
+
+class ScratchCache:
+    """
+    Thread safe LRU cache, holding at most `max_entries`.
+    """
+    def __init__(self, max_entries: int = CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._entries.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_set(self, key, factory):
+        """
+        Cached value of `key`, computed by `factory()` on a miss.
+        Concurrent misses may both call `factory`, the last one wins.
+        """
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            self.set(key, value)
+        return value
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __contains__(self, key) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+_cache = ScratchCache()
+_once_values = {}
+_once_lock = threading.RLock()
+_initialized = False
+
+
+def scratch_cache() -> ScratchCache:
+    return _cache
+
+
+def once(key, factory):
+    """
+    Result of `factory()`, called the first time `key` is asked for in this process. Never evicted.
+    """
+    value = _once_values.get(key, _MISSING)
+    if value is not _MISSING:
+        return value
+    with _once_lock:
+        value = _once_values.get(key, _MISSING)
+        if value is _MISSING:
+            value = factory()
+            _once_values[key] = value
+        return value
+
+
+def is_initialized() -> bool:
+    return _initialized
+
+
+def initialize(context):
+    """
+    Run the `zetaInit(context)` hook of the user module, once per process.
+    A failing hook is run again on the next invocation.
+    """
+    global _initialized
+    if _initialized:
+        return
+    with _once_lock:
+        if _initialized:
+            return
+        init_hook = getattr(importlib.import_module(USER_MODULE), INIT_HOOK, None)
+        if init_hook is not None:
+            started = time.perf_counter()
+            init_hook(context)
+            logger.info(f"{INIT_HOOK} ran in {(time.perf_counter() - started) * 1000:.1f} ms")
+        _initialized = True
+
+
+def call_handler(handler, event, context):
+    """
+    Initialize the process if needed, then call the (sync) handler.
+    Defined at module level so it can be offloaded to the handler pool, initializing its workers.
+    """
+    initialize(context)
+    return handler(event, context)
+
+
+def new_invocation_id(headers) -> str:
+    """
+    Invocation id forwarded by the caller in the `X-Zeta-Invocation-Id` header, or a new one.
+    """
+    return headers.get(INVOCATION_ID_HEADER) or uuid.uuid4().hex
+
+
+def invocation_deadline(timeout: float):
+    """
+    Epoch time the invocation must be done by, `None` without timeout.
+    Wall clock based, so it holds in the pool worker processes.
+    """
+    return time.time() + timeout if timeout else None
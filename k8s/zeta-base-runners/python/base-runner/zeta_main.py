@@ -1,40 +1,147 @@
+import time
+IMPORT_STARTED = time.perf_counter()
 from user.zeta import zetaHandler
-from fastapi import FastAPI, Request
-from pathlib import Path
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request, Response
+from starlette.concurrency import run_in_threadpool
 from zeta_types import *
+from zeta_workers import get_handler_pool, handler_timeout
+import zeta_logging
+import zeta_accounting
+import zeta_context
+import zeta_metrics
+import zeta_compression
+import asyncio
+import orjson
+import inspect
 import logging
-import json
 import os
 
-app = FastAPI()
 logger = logging.getLogger(__name__)
 os.makedirs('./log', exist_ok=True)
-logging.basicConfig(
-    filename='./log/zeta.log',
-    encoding='utf-8',
-    level=logging.DEBUG,
-    format= '[%(asctime)s] {%(pathname)s:%(lineno)d} %(levelname)s - %(message)s',
-    datefmt='%H:%M:%S'
-)
+zeta_logging.setup_logging('./log/zeta.log')
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    ready_in = time.perf_counter() - IMPORT_STARTED
+    boot_timestamp = float(os.environ.get("ZETA_BOOT_TIMESTAMP", 0))
+    since_boot = f", {(time.time() - boot_timestamp) * 1000:.1f} ms since boot" if boot_timestamp else ""
+    logger.info(f"Runner ready: {ready_in * 1000:.1f} ms from import{since_boot}")
+    # Warm the worker up before its first request,
+    # the pool workers initialize on their first call, the zygote once before forking any child
+    if get_handler_pool(preload=preload_zygote, initializer=init_pool_worker) is None or inspect.iscoroutinefunction(zetaHandler):
+        try:
+            await run_in_threadpool(zeta_context.initialize, Context(zetaName=zeta_context.ZETA_NAME))
+        except Exception:
+            logger.exception(f"{zeta_context.INIT_HOOK} failed, retrying on the first invocation")
+    yield
+
+app = FastAPI(lifespan=lifespan)
+
+
+def preload_zygote():
+    """
+    Initialize the zygote, in `fork` mode: the children it forks inherit its warm state.
+    """
+    zeta_logging.setup_logging('./log/zeta.log', threaded=False)
+    zeta_context.initialize(Context(zetaName=zeta_context.ZETA_NAME))
+
+
+def init_pool_worker():
+    """
+    Set up a `pool` worker process, forked without the log listener thread of the runner process.
+    """
+    zeta_logging.setup_logging('./log/zeta.log', threaded=False)
+
+
+def usage_headers(usage: dict) -> dict:
+    if not usage:
+        return {}
+    return {zeta_accounting.USAGE_HEADER: orjson.dumps(usage).decode()}
+
+async def encode_response(
+    request: Request,
+    content: bytes,
+    headers: dict,
+    status_code: int = 200,
+    media_type: str = None
+) -> Response:
+    """
+    Compress the body as negotiated on `Accept-Encoding`, unless the handler set its own `content-encoding`.
+    """
+    if not any(name.lower() == "content-encoding" for name in headers):
+        encoding = zeta_compression.negotiate(request.headers.get("accept-encoding"), len(content))
+        if encoding is not None:
+            content = await run_in_threadpool(zeta_compression.compress, content, encoding)
+            headers["content-encoding"] = encoding
+    headers["vary"] = "Accept-Encoding"
+    return Response(content=content, status_code=status_code, headers=headers, media_type=media_type)
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Concurrency metrics of the pod, in the Prometheus text format, see `zeta_metrics`.
+    """
+    return Response(content=zeta_metrics.render(), media_type=zeta_metrics.CONTENT_TYPE)
 
 @app.post("/")
 async def post(request: Request):
-    logger.info(request.client)
+    zeta_metrics.request_started()
+    request.state.queue_seconds = 0.0
+    try:
+        return await invoke(request)
+    finally:
+        zeta_metrics.request_finished(request.state.queue_seconds)
+
+async def invoke(request: Request):
+    logger.debug("request from %s", request.client)
     
     # Initialize event and context
     event = {
         "queryParams": dict(request.query_params),
         "body": await request.json()
     }
-    context = {}
-    logger.info(f"event: {event}")
-    logger.info(f"context: {context}")
+    # Per invocation view over the warm state of the worker
+    context = Context(
+        zetaName=zeta_context.ZETA_NAME,
+        invocationId=zeta_context.new_invocation_id(request.headers),
+        deadline=zeta_context.invocation_deadline(handler_timeout())
+    )
+    zeta_logging.log_payload(logger, "event", event)
+    zeta_logging.log_payload(logger, "context", context)
     
     # Create response
     response = {}
+    usage = {}
     try:
-        data = ZetaHandlerResponse.model_validate(zetaHandler(event, context))
-        logger.info("Handler data successfully validated on handler response schema")
+        # Coroutine handlers are awaited on the event loop,
+        # sync handlers run on the thread pool (or the handler pool) to keep the loop free
+        dispatched = time.perf_counter()
+        handler_pool = get_handler_pool()
+        if inspect.iscoroutinefunction(zetaHandler):
+            if not zeta_context.is_initialized():
+                await run_in_threadpool(zeta_context.initialize, context)
+            with zeta_accounting.account(time.process_time) as usage:
+                result = await asyncio.wait_for(zetaHandler(event, context), timeout=handler_timeout())
+        elif handler_pool is None:
+            result, usage = await run_in_threadpool(
+                zeta_accounting.run_accounted, zeta_context.call_handler, zetaHandler, event, context
+            )
+        else:
+            result, usage = await asyncio.get_running_loop().run_in_executor(
+                handler_pool, zeta_accounting.run_accounted, zeta_context.call_handler, zetaHandler, event, context
+            )
+        # Waiting for a thread / worker / child, and the dispatch to it
+        request.state.queue_seconds = time.perf_counter() - dispatched - usage.get("wallTimeMs", 0) / 1000
+        if inspect.isawaitable(result):
+            result = await result
+        data = ZetaHandlerResponse.model_validate(result)
+        logger.debug("Handler data successfully validated on handler response schema")
+        # Raw bytes bodies are passed through untouched
+        if isinstance(data.body, (bytes, bytearray)):
+            headers = {"content-type": "application/octet-stream", **data.headers, **usage_headers(usage)}
+            return await encode_response(request, bytes(data.body), headers, status_code=data.statusCode)
         response = {
             "status": "SUCCESS",
             "data": data.body
@@ -46,5 +153,6 @@ async def post(request: Request):
             "status": "ERROR",
             "message":  err
         }
-    return response
+    # Encode the envelope once, with orjson
+    return await encode_response(request, orjson.dumps(response), usage_headers(usage), media_type="application/json")
 
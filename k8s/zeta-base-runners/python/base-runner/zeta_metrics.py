@@ -0,0 +1,115 @@
+"""
+Concurrency metrics of the runner, served on `GET /metrics` in the Prometheus text format, for the HPA
+to scale on the actual request concurrency rather than on CPU (see the `concurrency` autoscaling of the zeta runner):
+- `zeta_inflight_requests` (gauge): invocations being served by the pod, including the queued ones
+- `zeta_requests_total` (counter): invocations served, its rate is the request rate
+- `zeta_queue_seconds_total` (counter): time the invocations waited before their handler ran
+  (for a thread, a `pool` worker or a forked child), its rate over the request rate is the average queue time
+
+Each uvicorn worker process keeps its counters in its own memory-mapped file, in `ZETA_METRICS_DIR`
+(default `/tmp/zeta-metrics`): a scrape answered by any worker sums the counters of all of them.
+The counters are only updated from the event loop of their worker.
+"""
+import struct
+import mmap
+import os
+
+METRICS_DIR = os.environ.get("ZETA_METRICS_DIR", "/tmp/zeta-metrics")
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# inflight, requests, queue seconds
+_LAYOUT = struct.Struct("<qqd")
+_INFLIGHT, _REQUESTS, _QUEUE_SECONDS = range(3)
+_values = None
+_mapped = None
+
+
+def _worker_values() -> list:
+    """
+    Counters of this worker process, mapped to its metrics file on first use.
+    """
+    global _values, _mapped
+    if _values is None:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        with open(os.path.join(METRICS_DIR, f"{os.getpid()}.metrics"), "w+b") as metrics_file:
+            metrics_file.write(b"\0" * _LAYOUT.size)
+            metrics_file.flush()
+            _mapped = mmap.mmap(metrics_file.fileno(), _LAYOUT.size)
+        _values = [0, 0, 0.0]
+    return _values
+
+
+def _write():
+    _LAYOUT.pack_into(_mapped, 0, *_values)
+
+
+def request_started():
+    values = _worker_values()
+    values[_INFLIGHT] += 1
+    _write()
+
+
+def request_finished(queue_seconds: float):
+    """
+    Attributes
+    ---
+    - queue_seconds: float
+        Time the invocation waited before its handler ran
+    """
+    values = _worker_values()
+    values[_INFLIGHT] -= 1
+    values[_REQUESTS] += 1
+    values[_QUEUE_SECONDS] += max(0.0, queue_seconds)
+    _write()
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def collect() -> tuple:
+    """
+    Counters summed over the live worker processes: `(inflight, requests, queue_seconds)`.
+    The files of the dead workers are removed.
+    """
+    _worker_values()
+    totals = [0, 0, 0.0]
+    for entry in os.listdir(METRICS_DIR):
+        pid, _, extension = entry.partition(".")
+        path = os.path.join(METRICS_DIR, entry)
+        if extension != "metrics" or not pid.isdigit():
+            continue
+        if not _is_alive(int(pid)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path, "rb") as metrics_file:
+                values = _LAYOUT.unpack(metrics_file.read(_LAYOUT.size))
+        except (OSError, struct.error):
+            continue
+        for index, value in enumerate(values):
+            totals[index] += value
+    return tuple(totals)
+
+
+def render() -> str:
+    inflight, requests, queue_seconds = collect()
+    return (
+        "# HELP zeta_inflight_requests Invocations being served, including the queued ones.\n"
+        "# TYPE zeta_inflight_requests gauge\n"
+        f"zeta_inflight_requests {inflight}\n"
+        "# HELP zeta_requests_total Invocations served.\n"
+        "# TYPE zeta_requests_total counter\n"
+        f"zeta_requests_total {requests}\n"
+        "# HELP zeta_queue_seconds_total Time the invocations waited before their handler ran.\n"
+        "# TYPE zeta_queue_seconds_total counter\n"
+        f"zeta_queue_seconds_total {queue_seconds:.6f}\n"
+    )
@@ -0,0 +1,19 @@
+"""
+Production entrypoint of the runner: serves `zeta_main:app` with the configured worker model.
+Imports are kept to the minimum, the app is only imported by the uvicorn worker(s).
+"""
+import time
+import os
+# Boot timestamp, used by the workers to log their import-to-ready time
+os.environ.setdefault("ZETA_BOOT_TIMESTAMP", str(time.time()))
+from zeta_workers import uvicorn_worker_count  # noqa: E402
+import uvicorn  # noqa: E402
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "zeta_main:app",
+        host="0.0.0.0",
+        port=int(os.environ.get("ZETA_PORT", 6969)),
+        workers=uvicorn_worker_count(),
+    )
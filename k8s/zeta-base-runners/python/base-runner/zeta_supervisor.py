@@ -0,0 +1,126 @@
+"""
+Supervised handler pool: an `Executor` running each call in a worker process that can be killed.
+
+- Calls running longer than `timeout` seconds raise `InvocationTimeoutError`
+- Workers whose RSS goes over `memory_limit_mb` raise `MemoryLimitExceededError`
+
+In both cases, and if the worker dies, the worker is killed and replaced by a fresh one,
+so capacity is never lost to hung invocations.
+
+Workers are forked from a process running threads (the log listener...) that don't exist in the worker:
+`initializer` runs first in each worker, to set it up on its own.
+"""
+from concurrent.futures import Executor, ThreadPoolExecutor
+import multiprocessing
+import queue
+import time
+import os
+
+POLL_INTERVAL = 0.05
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+
+
+class InvocationTimeoutError(Exception):
+    pass
+
+
+class MemoryLimitExceededError(Exception):
+    pass
+
+
+class WorkerCrashedError(Exception):
+    pass
+
+
+def _worker_main(connection, initializer=None):
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            task = connection.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        func, args = task
+        try:
+            connection.send((True, func(*args)))
+        except Exception as e:
+            try:
+                connection.send((False, e))
+            except Exception:
+                # Unpicklable exception
+                connection.send((False, RuntimeError(repr(e))))
+
+
+class _Worker:
+    def __init__(self, context, initializer=None):
+        self.connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_worker_main, args=(child_connection, initializer), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def rss_bytes(self) -> int:
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as f:
+                return int(f.read().split()[1]) * PAGE_SIZE
+        except (OSError, ValueError, IndexError):
+            return 0
+
+    def kill(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+class SupervisedPool(Executor):
+    def __init__(self, max_workers: int, timeout: float = None, memory_limit_mb: int = None, initializer=None):
+        self.timeout = timeout
+        self._initializer = initializer
+        self.memory_limit = memory_limit_mb * 1024 * 1024 if memory_limit_mb else None
+        self._context = multiprocessing.get_context()
+        self._idle_workers = queue.Queue()
+        for _ in range(max_workers):
+            self._idle_workers.put(_Worker(self._context, self._initializer))
+        # One dispatch thread per worker process
+        self._dispatcher = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="zeta-supervisor")
+
+    def submit(self, fn, /, *args, **kwargs):
+        if kwargs:
+            raise TypeError("SupervisedPool.submit doesn't support keyword arguments")
+        return self._dispatcher.submit(self._execute, fn, args)
+
+    def _execute(self, func, args):
+        worker = self._idle_workers.get()
+        try:
+            worker.connection.send((func, args))
+            deadline = None if self.timeout is None else time.monotonic() + self.timeout
+            while not worker.connection.poll(POLL_INTERVAL):
+                if not worker.process.is_alive():
+                    raise WorkerCrashedError(f"Handler worker died (exit code {worker.process.exitcode})")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise InvocationTimeoutError(f"Handler timed out after {self.timeout}s")
+                if self.memory_limit is not None and worker.rss_bytes() > self.memory_limit:
+                    raise MemoryLimitExceededError(
+                        f"Handler exceeded its memory limit of {self.memory_limit // (1024 * 1024)}MB"
+                    )
+            ok, value = worker.connection.recv()
+            if self.memory_limit is not None and worker.rss_bytes() > self.memory_limit:
+                # Don't keep a bloated worker around
+                worker.kill()
+                worker = _Worker(self._context, self._initializer)
+        except (InvocationTimeoutError, MemoryLimitExceededError, WorkerCrashedError, EOFError, OSError):
+            # Recycle the worker
+            worker.kill()
+            worker = _Worker(self._context, self._initializer)
+            raise
+        finally:
+            self._idle_workers.put(worker)
+        if not ok:
+            raise value
+        return value
+
+    def shutdown(self, wait=True, *, cancel_futures=False):
+        self._dispatcher.shutdown(wait=wait, cancel_futures=cancel_futures)
+        while not self._idle_workers.empty():
+            self._idle_workers.get().kill()
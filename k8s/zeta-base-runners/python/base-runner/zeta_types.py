@@ -1,14 +1,44 @@
 from pydantic import BaseModel
-from typing import Any
+from typing import Any, Optional
+import zeta_context
+import time
 
 class Event(BaseModel):
     queryParams: dict
     body: Any
-    
+
 class Context(BaseModel):
+    """
+    Invocation context, backed by the runner warm state, see `zeta_context`.
+    """
     zetaName: str
+    invocationId: str = ""
+    # Epoch time the invocation must be done by, None without timeout
+    deadline: Optional[float] = None
+
+    def remainingTime(self) -> Optional[float]:
+        """
+        Seconds left before the invocation times out, None without timeout.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.time())
+
+    @property
+    def cache(self) -> zeta_context.ScratchCache:
+        """
+        Bounded LRU scratch cache, living as long as the runner worker process.
+        """
+        return zeta_context.scratch_cache()
+
+    def once(self, key, factory):
+        """
+        Result of `factory()`, called once per runner worker process.
+        """
+        return zeta_context.once(key, factory)
 
 class ZetaHandlerResponse(BaseModel):
     statusCode: int
     headers: dict[str, str]
-    body: str
\ No newline at end of file
+    # str, raw bytes (returned untouched), or any JSON serializable structure
+    body: Any
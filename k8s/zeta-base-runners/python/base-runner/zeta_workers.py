@@ -0,0 +1,125 @@
+"""
+Worker model of the runner, configured through environment variables:
+- `ZETA_WORKER_MODE`
+  - `process` (default): `ZETA_WORKERS` uvicorn worker processes, each running the handler in-process
+  - `pool`: a single uvicorn process, sync handlers are offloaded to a pool of `ZETA_WORKERS` processes
+  - `fork`: a single uvicorn process, sync handlers run in a child forked per call from a zygote process
+    that has loaded the handler, at most `ZETA_WORKERS` at once (see `zeta_zygote.py`)
+- `ZETA_WORKERS`: number of workers, defaults to the container CPU quota
+- `ZETA_FORK_BATCH_SIZE`: calls queued together that share a forked child, in `fork` mode (default `1`)
+- `ZETA_TIMEOUT_SECONDS` / `ZETA_MEMORY_LIMIT_MB`: hard limits of a sync handler call.
+  Setting any of them implies the `pool` mode (unless in `fork` mode), the workers being killed
+  and replaced when a limit is hit.
+"""
+from zeta_supervisor import SupervisedPool
+from zeta_zygote import ZygotePool
+import math
+import os
+
+WORKER_MODE_PROCESS = "process"
+WORKER_MODE_POOL = "pool"
+WORKER_MODE_FORK = "fork"
+WORKER_MODES = (WORKER_MODE_PROCESS, WORKER_MODE_POOL, WORKER_MODE_FORK)
+_handler_pool = None
+
+
+def cpu_quota() -> int:
+    """
+    Number of CPUs the container is allowed to use, from the cgroup CPU quota (v2, then v1).
+    Falls back to the CPUs available to the process.
+    """
+    try:
+        available = len(os.sched_getaffinity(0))
+    except AttributeError:
+        available = os.cpu_count() or 1
+    quota, period = None, None
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            raw_quota, raw_period = f.read().split()
+        if raw_quota != "max":
+            quota, period = int(raw_quota), int(raw_period)
+    except (OSError, ValueError):
+        try:
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = int(f.read())
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = int(f.read())
+        except (OSError, ValueError):
+            pass
+    if quota is None or period is None or quota <= 0 or period <= 0:
+        return available
+    return max(1, min(available, math.ceil(quota / period)))
+
+
+def worker_count() -> int:
+    workers = os.environ.get("ZETA_WORKERS")
+    if workers:
+        return max(1, int(workers))
+    return cpu_quota()
+
+
+def handler_timeout():
+    timeout = os.environ.get("ZETA_TIMEOUT_SECONDS")
+    return float(timeout) if timeout else None
+
+
+def handler_memory_limit_mb():
+    memory_limit = os.environ.get("ZETA_MEMORY_LIMIT_MB")
+    return int(memory_limit) if memory_limit else None
+
+
+def worker_mode() -> str:
+    mode = os.environ.get("ZETA_WORKER_MODE", WORKER_MODE_PROCESS).lower()
+    if mode not in WORKER_MODES:
+        raise ValueError(f"Unknown ZETA_WORKER_MODE '{mode}', expected one of {WORKER_MODES}")
+    # Limits can only be enforced on handlers running in the pool, or in forked children
+    if mode != WORKER_MODE_FORK and (handler_timeout() is not None or handler_memory_limit_mb() is not None):
+        return WORKER_MODE_POOL
+    return mode
+
+
+def fork_batch_size() -> int:
+    return max(1, int(os.environ.get("ZETA_FORK_BATCH_SIZE", 1)))
+
+
+def uvicorn_worker_count() -> int:
+    """
+    Number of uvicorn worker processes to start.
+    """
+    if worker_mode() in (WORKER_MODE_POOL, WORKER_MODE_FORK):
+        return 1
+    return worker_count()
+
+
+def get_handler_pool(preload=None, initializer=None):
+    """
+    Return the executor sync handlers are offloaded to, or `None` if in `process` mode:
+    the supervised process pool in `pool` mode, the zygote in `fork` mode.
+
+    Attributes
+    ---
+    - preload: callable
+        Run once by the zygote, before forking any child, when it is started
+    - initializer: callable
+        Run first by each pool worker process, when it is started
+    """
+    global _handler_pool
+    mode = worker_mode()
+    if mode == WORKER_MODE_PROCESS:
+        return None
+    if _handler_pool is None and mode == WORKER_MODE_FORK:
+        _handler_pool = ZygotePool(
+            max_workers=worker_count(),
+            preload=preload,
+            timeout=handler_timeout(),
+            memory_limit_mb=handler_memory_limit_mb(),
+            batch_size=fork_batch_size()
+        )
+    elif _handler_pool is None:
+        _handler_pool = SupervisedPool(
+            max_workers=worker_count(),
+            timeout=handler_timeout(),
+            memory_limit_mb=handler_memory_limit_mb(),
+            initializer=initializer
+        )
+    return _handler_pool
@@ -0,0 +1,59 @@
+package com.schrodi.zeta_runner.config;
+
+import org.springframework.boot.context.properties.ConfigurationProperties;
+import org.springframework.context.annotation.Configuration;
+
+/**
+ * HPA of the zeta runners
+ * <p>
+ * {@code resource} scales on CPU and memory utilization, {@code concurrency} on the
+ * in-flight requests, request rate and queue time served by the runners on {@code /metrics}
+ * (requires a Prometheus adapter exposing them on the custom metrics API)
+ */
+@Configuration
+@ConfigurationProperties("app.runner.autoscaling")
+public class AutoscalingConfig {
+    public static final String MODE_RESOURCE = "resource";
+    public static final String MODE_CONCURRENCY = "concurrency";
+
+    private String mode = MODE_RESOURCE;
+    private String targetInflight = "4";
+    private String targetRequestRate = "20";
+    private String targetQueueSeconds = "100m";
+
+    public String getMode() {
+        return mode;
+    }
+
+    public void setMode(String mode) {
+        this.mode = mode;
+    }
+
+    public String getTargetInflight() {
+        return targetInflight;
+    }
+
+    public void setTargetInflight(String targetInflight) {
+        this.targetInflight = targetInflight;
+    }
+
+    public String getTargetRequestRate() {
+        return targetRequestRate;
+    }
+
+    public void setTargetRequestRate(String targetRequestRate) {
+        this.targetRequestRate = targetRequestRate;
+    }
+
+    public String getTargetQueueSeconds() {
+        return targetQueueSeconds;
+    }
+
+    public void setTargetQueueSeconds(String targetQueueSeconds) {
+        this.targetQueueSeconds = targetQueueSeconds;
+    }
+
+    public boolean isConcurrency() {
+        return MODE_CONCURRENCY.equalsIgnoreCase(mode);
+    }
+}
@@ -1,6 +1,7 @@
 package com.schrodi.zeta_runner.model;
 
 import io.kubernetes.client.openapi.models.V2HorizontalPodAutoscaler;
+import io.kubernetes.client.openapi.models.V2MetricTarget;
 
 import java.time.Instant;
 import java.util.List;
@@ -31,7 +32,8 @@ public record ZetaDRHPA(
 
     public record Metric(
             String type,
-            Resource resource
+            Resource resource,
+            Pods pods
     ) {}
 
     public record Resource(
@@ -39,11 +41,25 @@ public record ZetaDRHPA(
             Target target
     ) {}
 
+    public record Pods(
+            String name,
+            Target target
+    ) {}
+
     public record Target(
             String type,
-            Integer averageUtilization
+            Integer averageUtilization,
+            String averageValue
     ) {}
 
+    private static Target from(V2MetricTarget target) {
+        return new Target(
+                target.getType(),
+                target.getAverageUtilization(),
+                target.getAverageValue() == null ? null : target.getAverageValue().toSuffixedString()
+        );
+    }
+
     public static ZetaDRHPA from(V2HorizontalPodAutoscaler hpa) {
         return new ZetaDRHPA(
                 new Metadata(
@@ -67,14 +83,13 @@ public record ZetaDRHPA(
                                                 ? null
                                                 : new Resource(
                                                 metric.getResource().getName(),
-                                                new Target(
-                                                        metric.getResource()
-                                                                .getTarget()
-                                                                .getType(),
-                                                        metric.getResource()
-                                                                .getTarget()
-                                                                .getAverageUtilization()
-                                                )
+                                                from(metric.getResource().getTarget())
+                                        ),
+                                        metric.getPods() == null
+                                                ? null
+                                                : new Pods(
+                                                metric.getPods().getMetric().getName(),
+                                                from(metric.getPods().getTarget())
                                         )
                                 ))
                                 .toList()
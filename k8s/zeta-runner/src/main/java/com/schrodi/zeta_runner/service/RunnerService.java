@@ -8,6 +8,7 @@ import java.util.ArrayList;
 import java.util.List;
 
 import com.schrodi.zeta_runner.client.ImageEngineClient;
+import com.schrodi.zeta_runner.config.AutoscalingConfig;
 import com.schrodi.zeta_runner.config.RegistryConfig;
 import com.schrodi.zeta_runner.dto.ZetaRunnerResponse;
 import com.schrodi.zeta_runner.exceptions.ZetaResourceNotFoundException;
@@ -48,6 +49,7 @@ public class RunnerService {
 
     private final MinioConfig minioConfig;
     private final RegistryConfig registryConfig;
+    private final AutoscalingConfig autoscalingConfig;
     private final ResourceLoader resourceLoader;
     private final CoreV1Api coreV1Api;
     private final AppsV1Api appsV1Api;
@@ -57,6 +59,7 @@ public class RunnerService {
     public RunnerService(
             MinioConfig minioConfig,
             RegistryConfig registryConfig,
+            AutoscalingConfig autoscalingConfig,
             ResourceLoader resourceLoader,
             CoreV1Api coreV1Api,
             AppsV1Api appsV1Api,
@@ -65,6 +68,7 @@ public class RunnerService {
     ) {
         this.minioConfig = minioConfig;
         this.registryConfig = registryConfig;
+        this.autoscalingConfig = autoscalingConfig;
         this.resourceLoader = resourceLoader;
         this.coreV1Api = coreV1Api;
         this.appsV1Api = appsV1Api;
@@ -328,14 +332,27 @@ public class RunnerService {
 
     /**
      * Returns JSON HPA manifest
+     * <p>
+     * Scales on the runner concurrency metrics in the {@code concurrency} autoscaling mode,
+     * on CPU and memory otherwise
      * @param zeta Zeta name
      */
     private String getHpa(String zeta) throws IOException {
+        if (!autoscalingConfig.isConcurrency()) {
+            return resourceLoader
+                    .getResource("classpath:k8s/hpa.json")
+                    .getContentAsString(Charset.defaultCharset())
+                    .replaceAll("%ZETA_NAMESPACE%", NAMESPACE)
+                    .replaceAll("%ZETA_NAME%", zeta);
+        }
         return resourceLoader
-                .getResource("classpath:k8s/hpa.json")
+                .getResource("classpath:k8s/hpa-concurrency.json")
                 .getContentAsString(Charset.defaultCharset())
                 .replaceAll("%ZETA_NAMESPACE%", NAMESPACE)
-                .replaceAll("%ZETA_NAME%", zeta);
+                .replaceAll("%ZETA_NAME%", zeta)
+                .replaceAll("%TARGET_INFLIGHT%", autoscalingConfig.getTargetInflight())
+                .replaceAll("%TARGET_REQUEST_RATE%", autoscalingConfig.getTargetRequestRate())
+                .replaceAll("%TARGET_QUEUE_SECONDS%", autoscalingConfig.getTargetQueueSeconds());
     }
 
     /**